@@ -1,6 +1,6 @@
 # dags/celec_ml_pipeline.py
 # Airflow DAG for CELEC Flow Prediction ML Pipeline
-# Este workflow orquesta el pipeline completo de ML sin modificar los scripts existentes
+# Este workflow orquesta el pipeline completo de ML: reentrenamiento incremental diario y reajuste completo semanal
 
 from datetime import datetime, timedelta
 from airflow import DAG
@@ -58,27 +58,31 @@ def check_environment():
     print("✅ Ambiente verificado correctamente")
 
 def validate_data():
-    """Valida que los datos estén disponibles y sean válidos"""
-    import pandas as pd
+    """Valida los datos de entrada de forma incremental (solo particiones nuevas del almacén)"""
+    import sys
     from pathlib import Path
-    
+
     print("🔍 Validando datos de entrada...")
-    
-    data_file = Path("data/raw/620883808_retrospective_data.csv")
-    if not data_file.exists():
-        raise Exception(f"❌ Archivo de datos no encontrado: {data_file}")
-    
-    # Cargar y validar datos
-    df = pd.read_csv(data_file)
-    print(f"📊 Datos cargados: {len(df)} registros")
-    
-    # Validaciones básicas
-    if len(df) < 1000:
-        raise Exception(f"❌ Insuficientes registros de datos: {len(df)}")
-    
-    if df.isnull().sum().sum() > len(df) * 0.1:  # Más del 10% nulos
-        print("⚠️ Advertencia: Alto porcentaje de valores faltantes")
-    
+
+    sys.path.insert(0, os.getcwd())
+    from src.data import raw_store
+    from src.data.validation import validate_series, print_report
+
+    comid = 620883808
+    data_file = Path(f"data/raw/{comid}_retrospective_data.csv")
+    if not raw_store.has_series(comid):
+        if not data_file.exists():
+            raise Exception(f"❌ Archivo de datos no encontrado: {data_file}")
+        # Primera ejecución: se construye el almacén desde el CSV existente
+        raw_store.csv_to_store(data_file, comid)
+
+    report = validate_series(comid)
+    print_report(report)
+
+    if not report["ok"]:
+        errors = [i["message"] for i in report["issues"] if i["severity"] == "error"]
+        raise Exception(f"❌ Validación fallida: {'; '.join(errors)}")
+
     print("✅ Datos validados correctamente")
 
 def notify_completion(**context):
@@ -122,30 +126,54 @@ download_data_task = BashOperator(
     dag=dag,
 )
 
-# 4. Ejecutar modelo básico (preservando funcionalidad existente)
+# 4. Reentrenamiento diario incremental (árboles nuevos con warm start). El reajuste completo lo hace el DAG
+#    semanal; --refit-days 8 deja el reajuste diario solo como respaldo si la corrida semanal falla
 run_basic_model_task = BashOperator(
     task_id='run_basic_model',
     bash_command='''
     cd {{ params.project_dir }}
-    echo "🤖 Ejecutando modelo básico..."
-    python src/models/data_analysis.py
-    echo "✅ Modelo básico completado"
+    echo "🤖 Reentrenando modelo (incremental)..."
+    python src/models/incremental.py --mlflow --refit-days 8
+    echo "✅ Modelo actualizado"
     ''',
     params={'project_dir': '/c/Users/david/Downloads/CELEC_forecast-develop'},
     dag=dag,
 )
 
-# 5. Ejecutar modelo con MLflow (script existente sin modificar)
+# 5. Reajuste completo semanal, en su propio DAG: incremental.py --mode full reescribe trained_model.pkl y
+#    training_state.json (el modelo desplegado); run_with_mlflow.py queda como evaluación y reporte en MLflow
+weekly_dag = DAG(
+    'celec_flow_weekly_full_refit',
+    default_args=default_args,
+    description='Weekly full CELEC model refit with MLflow tracking',
+    schedule_interval='0 7 * * 0',  # Domingos a las 7 AM (después del pipeline diario)
+    tags=['ml', 'hydrology', 'celec', 'production'],
+    max_active_runs=1,
+)
+
+full_refit_task = BashOperator(
+    task_id='full_refit',
+    bash_command='''
+    cd {{ params.project_dir }}
+    echo "🔁 Reajuste completo del modelo desplegado..."
+    python src/models/incremental.py --mode full --mlflow
+    test -f models/trained_model.pkl || { echo "❌ No se generó models/trained_model.pkl"; exit 1; }
+    echo "✅ Reajuste completo terminado"
+    ''',
+    params={'project_dir': '/c/Users/david/Downloads/CELEC_forecast-develop'},
+    dag=weekly_dag,
+)
+
 run_mlflow_model_task = BashOperator(
     task_id='run_mlflow_model',
     bash_command='''
     cd {{ params.project_dir }}
-    echo "🔬 Ejecutando modelo con MLflow tracking completo..."
+    echo "🔬 Evaluando el modelo con MLflow tracking completo..."
     python run_with_mlflow.py
-    echo "✅ Modelo MLflow completado"
+    echo "✅ Evaluación MLflow completada"
     ''',
     params={'project_dir': '/c/Users/david/Downloads/CELEC_forecast-develop'},
-    dag=dag,
+    dag=weekly_dag,
 )
 
 # 6. Validar resultados del modelo
@@ -155,15 +183,15 @@ validate_results_task = BashOperator(
     cd {{ params.project_dir }}
     echo "🔍 Validando resultados del modelo..."
     
-    # Verificar que los archivos de salida existen
-    if [ -f "data/processed/model_predictions.csv" ]; then
-        echo "✅ Predicciones generadas correctamente"
+    # Verificar que los archivos de salida del reentrenamiento incremental existen
+    if [ -f "data/processed/incremental_holdout.csv" ]; then
+        echo "✅ Holdout móvil generado correctamente"
     else
-        echo "❌ Error: No se generaron predicciones"
+        echo "❌ Error: No se generó el holdout móvil"
         exit 1
     fi
     
-    if [ -f "data/processed/feature_importance.csv" ]; then
+    if [ -f "data/processed/feature_importance_incremental.csv" ]; then
         echo "✅ Feature importance generada correctamente"
     else
         echo "⚠️ Advertencia: Feature importance no encontrada"
@@ -194,9 +222,10 @@ generate_report_task = BashOperator(
     echo "=================================" >> reports/pipeline_report.txt
     echo "" >> reports/pipeline_report.txt
     
-    if [ -f "data/processed/model_predictions.csv" ]; then
+    if [ -f "data/processed/incremental_holdout.csv" ]; then
         echo "✅ Modelo ejecutado exitosamente" >> reports/pipeline_report.txt
-        echo "📊 Predicciones generadas: $(wc -l < data/processed/model_predictions.csv) registros" >> reports/pipeline_report.txt
+        holdout_days=$(($(wc -l < data/processed/incremental_holdout.csv) - 1))
+        echo "📊 Holdout móvil: ${holdout_days} días predichos" >> reports/pipeline_report.txt
     fi
     
     if [ -f "models/trained_model.pkl" ]; then
@@ -221,8 +250,8 @@ notify_completion_task = PythonOperator(
 
 # ===== DEFINIR DEPENDENCIAS =====
 check_env_task >> validate_data_task >> download_data_task
-download_data_task >> run_basic_model_task >> run_mlflow_model_task
-run_mlflow_model_task >> validate_results_task >> generate_report_task
+download_data_task >> run_basic_model_task
+run_basic_model_task >> validate_results_task >> generate_report_task
 generate_report_task >> notify_completion_task
 
 # Configuración de alertas por email (opcional)
@@ -242,5 +271,23 @@ email_on_failure = EmailOperator(
 )
 
 # Conectar email de fallo a todas las tareas críticas
-for task in [run_basic_model_task, run_mlflow_model_task, validate_results_task]:
-    task >> email_on_failure
\ No newline at end of file
+for task in [run_basic_model_task, validate_results_task]:
+    task >> email_on_failure
+
+weekly_email_on_failure = EmailOperator(
+    task_id='send_email_on_failure',
+    to=['admin@celec.gov.ec'],
+    subject='🚨 CELEC Weekly Refit Failed',
+    html_content='''
+    <h3>CELEC Weekly Full Refit Failed</h3>
+    <p>El reajuste completo semanal o su evaluación con MLflow ha fallado.</p>
+    <p>DAG: {{ dag.dag_id }}</p>
+    <p>Execution Time: {{ ds }}</p>
+    <p>Por favor revisar los logs en Airflow UI.</p>
+    ''',
+    dag=weekly_dag,
+    trigger_rule='one_failed',
+)
+full_refit_task >> run_mlflow_model_task
+for task in [full_refit_task, run_mlflow_model_task]:
+    task >> weekly_email_on_failure
\ No newline at end of file
@@ -9,6 +9,7 @@ from pathlib import Path
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+import time
 
 # MLflow imports (ahora funcionan con Python 3.11)
 import mlflow
@@ -16,13 +17,24 @@ import mlflow.sklearn
 from mlflow.tracking import MlflowClient
 
 # Importar funciones del modelo principal
+from src.features.gaps import fill_gaps, print_report as print_gap_report
 from src.models.data_analysis import (
-    load_retrospective_data, create_features, train_test_split_temporal,
-    prepare_ml_data, train_model, evaluate_model, save_results, create_plots
+    load_retrospective_data, build_features, add_exogenous_features, add_climatology_features,
+    prepare_dataset, train_model, evaluate_model, save_results, create_plots,
+    pruning_selection, keep_exogenous, profile_model, load_model_params, PRUNED_SUFFIX
 )
+from src.models.engines import DEFAULT_ENGINE, ENGINES
 
-def main_with_full_mlflow():
-    """Ejecuta el modelo con MLflow UI completo"""
+def main_with_full_mlflow(prune=None, engine=DEFAULT_ENGINE):
+    """Ejecuta el modelo con MLflow UI completo
+
+    prune: dict opcional (top_k o cumulative, y source, p. ej. runs:/<id>/feature_importance.csv)
+    para entrenar solo con las features más importantes de una ejecución previa.
+    engine: motor de src/models/engines.py (random_forest, hist_gradient_boosting o una línea base).
+    """
+    spec, exogenous = pruning_selection(**prune, engine=engine) if prune else (None, None)
+    # Con poda la importancia se guarda aparte para no reemplazar la de referencia
+    suffix = PRUNED_SUFFIX if prune else ""
     
     print("Ejecutando modelo CELEC con MLflow completo")
     print("=" * 60)
@@ -40,34 +52,45 @@ def main_with_full_mlflow():
         mlflow.log_param("data_start_date", str(df['time'].min()))
         mlflow.log_param("data_end_date", str(df['time'].max()))
         
+        # 1b. Malla diaria regular (misma entrada que data_analysis.py: el almacén de features la reutiliza)
+        df, gap_report = fill_gaps(df)
+        print_gap_report(gap_report)
+        mlflow.log_metric("gaps_filled_steps", gap_report["filled_steps"])
+        mlflow.log_metric("gaps_masked_steps", gap_report["masked_steps"])
+        series = df
+
         # 2. Crear features
-        df = create_features(df)
+        df = build_features(df, spec=spec)
+        df = add_exogenous_features(df)
+        df = add_climatology_features(df, test_size=0.3, series=series)
+        if prune:
+            df = keep_exogenous(df, exogenous)
+            mlflow.log_params({f"prune_{k}": v for k, v in prune.items() if v is not None})
+        mlflow.log_param("forecast_features", any(col.startswith("fc_") for col in df.columns))
         features_count = len([col for col in df.columns if col not in ['time', 'caudal']])
         mlflow.log_param("features_created", features_count)
         
-        # 3. División temporal 70/30
-        train_df, test_df = train_test_split_temporal(df, test_size=0.3)
-        mlflow.log_param("train_size", len(train_df))
-        mlflow.log_param("test_size", len(test_df))
+        # 3. Dataset float32 y división temporal 70/30 (vistas, sin copias)
+        dataset = prepare_dataset(df)
+        train_ds, test_ds = dataset.split_temporal(test_size=0.3)
+        mlflow.log_param("train_size", len(train_ds))
+        mlflow.log_param("test_size", len(test_ds))
         mlflow.log_param("test_split_ratio", 0.3)
+        mlflow.log_metric("dataset_mb", (dataset.X.nbytes + dataset.y.nbytes) / 1024 ** 2)
         
-        # 4. Preparar datos para ML
-        X_train, y_train, feature_names = prepare_ml_data(train_df)
-        X_test, y_test, _ = prepare_ml_data(test_df)
-        
-        # 5. Entrenar modelo
-        model = train_model(X_train, y_train)
+        # 4. Entrenar modelo
+        start = time.perf_counter()
+        params = load_model_params(engine=engine)
+        model = train_model(train_ds, params=params, engine=engine)
+        train_s = time.perf_counter() - start
         
-        # Log model parameters
-        mlflow.log_param("model_type", "RandomForest")
-        mlflow.log_param("n_estimators", 100)
-        mlflow.log_param("max_depth", 20)
-        mlflow.log_param("min_samples_split", 5)
-        mlflow.log_param("min_samples_leaf", 2)
-        mlflow.log_param("random_state", 42)
+        # Log model parameters (los usados realmente: por defecto o de la última búsqueda)
+        mlflow.log_param("model_type", engine)
+        mlflow.log_params(params)
         
-        # 6. Evaluar modelo
-        y_pred, importance_df = evaluate_model(model, X_test, y_test, feature_names)
+        # 5. Evaluar modelo
+        y_pred, importance_df = evaluate_model(model, test_ds)
+        y_test = test_ds.y
         
         # Log metrics
         mae = mean_absolute_error(y_test, y_pred)
@@ -79,23 +102,26 @@ def main_with_full_mlflow():
         mlflow.log_metric("mse", mse)
         mlflow.log_metric("rmse", rmse)
         mlflow.log_metric("r2_score", r2)
+        # Perfil del modelo: base de comparación para ejecuciones con poda de features
+        profile = profile_model(model, test_ds.X, y_test, train_s)
+        mlflow.log_metrics({k: profile[k] for k in ("train_s", "model_mb", "latency_ms")})
         
-        # 7. Guardar resultados
-        results_df = save_results(test_df, y_pred, importance_df)
+        # 6. Guardar resultados
+        results_df = save_results(test_ds.frame(), y_pred, importance_df, suffix)
         
-        # 8. Crear gráficos
+        # 7. Crear gráficos
         create_plots(results_df, importance_df)
         
-        # 9. Log model usando MLflow sklearn
+        # 8. Log model usando MLflow sklearn
         mlflow.sklearn.log_model(
             model, 
-            "random_forest_model",
+            f"{engine}_model",
             registered_model_name="CELEC_Flow_Predictor"
         )
         
-        # 10. Log artifacts
+        # 9. Log artifacts
         mlflow.log_artifact("data/processed/model_predictions.csv")
-        mlflow.log_artifact("data/processed/feature_importance.csv")
+        mlflow.log_artifact(f"data/processed/feature_importance{suffix}.csv")
         
         # Log all figures
         for fig_file in Path("reports/figures").glob("*.png"):
@@ -117,4 +143,14 @@ def main_with_full_mlflow():
     print("   Luego abre: http://localhost:5000")
 
 if __name__ == "__main__":
-    main_with_full_mlflow()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Entrenamiento con registro completo en MLflow")
+    parser.add_argument("--top-k", type=int, help="Podar a las k features más importantes")
+    parser.add_argument("--cumulative", type=float, help="Podar a la fracción acumulada de importancia (0-1]")
+    parser.add_argument("--importance", help="feature_importance.csv previo o URI runs:/<id>/feature_importance.csv")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default=DEFAULT_ENGINE, help="Motor del modelo")
+    args = parser.parse_args()
+    prune = None
+    if args.top_k is not None or args.cumulative is not None:
+        prune = {"top_k": args.top_k, "cumulative": args.cumulative, "source": args.importance}
+    main_with_full_mlflow(prune, engine=args.engine)
\ No newline at end of file
@@ -0,0 +1,47 @@
+# scripts/benchmarks/bench_backtest.py
+# Backtesting walk-forward: pliegues en serie vs pool de procesos con la matriz compartida
+# Con menos núcleos que procesos solo se mide el costo del pool (arranque de procesos y copia a memoria compartida)
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.models.backtest import backtest
+from src.models.data_analysis import create_features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del backtesting walk-forward")
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--cores", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * args.years, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, len(times))
+    dataset = FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+    timings = {}
+    for cores in args.cores:
+        start = time.perf_counter()
+        metrics, _ = backtest(dataset, n_folds=args.folds, cores=cores)
+        timings[cores] = (time.perf_counter() - start, metrics["mae"].mean())
+
+    print(f"\n{len(dataset)} filas, {args.folds} pliegues, {os.cpu_count()} núcleos disponibles")
+    print(f"  {'núcleos':>8} {'tiempo (s)':>11} {'aceleración':>12} {'MAE medio':>10}")
+    base = timings[args.cores[0]][0]
+    for cores, (elapsed, mae) in timings.items():
+        print(f"  {cores:>8} {elapsed:11.2f} {base / elapsed:12.2f} {mae:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
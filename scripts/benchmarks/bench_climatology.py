@@ -0,0 +1,68 @@
+# scripts/benchmarks/bench_climatology.py
+# Percentiles por día del año: recálculo con pandas en cada análisis vs índice climatológico precalculado
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.climatology import PERCENTILES, WINDOW, ClimatologyIndex
+
+
+def pandas_percentiles(df):
+    """Recálculo directo: percentiles de la ventana circular de ±WINDOW//2 días para cada día del año"""
+    doy = df["time"].dt.dayofyear.to_numpy() - 1
+    values = df["caudal"].to_numpy()
+    rows = []
+    for day in range(366):
+        distance = np.abs(doy - day)
+        sample = values[np.minimum(distance, 366 - distance) <= WINDOW // 2]
+        rows.append(np.percentile(sample, PERCENTILES))
+    return np.array(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice climatológico")
+    parser.add_argument("--years", type=int, default=85)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1940-01-01", periods=365 * args.years, freq="D")
+    values = np.exp(rng.normal(5 + np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365), 0.5))
+    df = pd.DataFrame({"time": times, "caudal": values})
+
+    start = time.perf_counter()
+    exact = pandas_percentiles(df)
+    pandas_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ClimatologyIndex()
+    index.update(times.to_numpy(), values)
+    table = index.tables["percentiles"]
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.update(times[-1:].to_numpy() + np.timedelta64(1, "D"), values[-1:])
+    index.tables
+    update_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pct = index.percentile(times.to_numpy(), values)
+    index.flags(times.to_numpy(), values)
+    lookup_s = time.perf_counter() - start
+
+    error = np.abs(table[:, 1:-1] / exact[:, 1:-1] - 1).max()
+    print(f"{len(df)} días; percentiles {PERCENTILES} por día del año (ventana {WINDOW} días)")
+    print(f"  Recálculo directo de percentiles:        {pandas_s:8.3f} s")
+    print(f"  Construcción del índice:                 {build_s:8.3f} s (error relativo p5-p95 <= {error:.1%})")
+    print(f"  Actualización con un día nuevo:          {update_s:8.3f} s")
+    print(f"  Percentil + banderas de {len(pct)} valores: {lookup_s:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# scripts/benchmarks/bench_engines.py
+# Motores de modelo sobre los mismos datos: tiempo de entrenamiento, latencia de predicción, tamaño serializado
+# y error (Random Forest, gradient boosting por histogramas y las líneas base de persistencia y climatología)
+# Usa la serie del almacén si existe; si no, una serie sintética estacional con ruido
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features, profile_model, train_model
+from src.models.engines import ENGINES
+
+COMID = 620883808
+
+
+def synthetic_series(years):
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * years, freq="D")
+    seasonal = 300 + 200 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365)
+    noise = np.convolve(rng.normal(0, 40, len(times)), np.ones(5) / 5, mode="same")
+    return pd.DataFrame({"time": times, "caudal": seasonal + noise})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de modelo")
+    parser.add_argument("--years", type=int, default=30, help="Años de la serie sintética")
+    parser.add_argument("--engines", nargs="+", choices=tuple(ENGINES), default=list(ENGINES))
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    df = raw_store.read_series(COMID) if raw_store.has_series(COMID) else synthetic_series(args.years)
+    df["caudal"] = df["caudal"].astype("float64")
+    train, test = FeatureDataset.from_frame(create_features(df)).split_temporal(0.3)
+
+    profiles = {}
+    for engine in args.engines:
+        start = time.perf_counter()
+        model = train_model(train, n_jobs=args.n_jobs, engine=engine)
+        profiles[engine] = profile_model(model, test.X, test.y, time.perf_counter() - start)
+
+    print(f"\n{len(train)} filas de entrenamiento, {len(test)} de prueba, {train.X.shape[1]} features, "
+          f"{os.cpu_count()} núcleos disponibles")
+    table = pd.DataFrame(profiles).T[["train_s", "latency_ms", "model_mb", "mae", "rmse"]]
+    table.columns = ["entrenamiento (s)", "ms / 1000 filas", "modelo (MB)", "MAE", "RMSE"]
+    print(table.to_string(float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
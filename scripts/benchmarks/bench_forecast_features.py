@@ -0,0 +1,63 @@
+# scripts/benchmarks/bench_forecast_features.py
+# Features de pronóstico sobre años de emisiones diarias: consulta as_of por fila vs tabla resumida + searchsorted
+# La consulta por fila se mide sobre una muestra de días y se extrapola
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import forecast_archive
+from src.features import forecast
+
+COMID = 620883808
+
+
+def make_forecast(issue, rng):
+    valid = pd.date_range(issue, periods=15 * 8, freq="3h")
+    base = rng.gamma(2.0, 50.0) + np.arange(len(valid)) / 8
+    return pd.DataFrame({"datetime": valid.strftime("%Y-%m-%d %H:%M:%S"), "flow_median": base,
+                         "flow_uncertainty_upper": base * 1.2, "flow_uncertainty_lower": base * 0.8})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de features de pronóstico con cruce as-of")
+    parser.add_argument("--years", type=int, default=3, help="Años de emisiones diarias archivadas")
+    parser.add_argument("--sample", type=int, default=50, help="Días medidos con as_of por fila")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        issues = pd.date_range("2022-01-01", periods=365 * args.years, freq="D")
+        for issue in issues:
+            forecast_archive.append_forecast(make_forecast(issue, rng), COMID, issue, root=root)
+        days = pd.date_range(issues[0], issues[-1], freq="D")
+
+        start = time.perf_counter()
+        for day in days[1::max(1, len(days) // args.sample)][:args.sample]:
+            forecast.summarize_issues(forecast_archive.as_of(COMID, day - forecast.LATENCY, root=root))
+        per_row = (time.perf_counter() - start) / args.sample
+
+        start = time.perf_counter()
+        forecast.forecast_table(COMID, root=root)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        frame = pd.DataFrame({"time": days, "caudal": 1.0})
+        forecast.add_forecast_features(frame, COMID, root=root)
+        join_s = time.perf_counter() - start
+
+    print(f"{len(issues)} emisiones diarias, {len(days)} filas a cruzar")
+    print(f"  as_of + resumen por fila (extrapolado):      {per_row * len(days):8.2f} s")
+    print(f"  Tabla resumida (primera construcción):       {build_s:8.2f} s")
+    print(f"  Cruce as-of con la tabla ya construida:      {join_s:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
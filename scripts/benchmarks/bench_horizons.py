@@ -0,0 +1,78 @@
+# scripts/benchmarks/bench_horizons.py
+# Pronóstico directo de 1 a N días: un Random Forest multi-salida (un ajuste, un predict) frente a N bosques
+# independientes, uno por horizonte; se compara tiempo de ajuste, latencia, tamaño y MAE por horizonte
+
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.features.horizons import add_horizon_targets, horizon_columns
+from src.models.data_analysis import create_features, train_model
+
+
+def size_mb(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell() / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pronóstico multi-horizonte")
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--horizons", type=int, default=15)
+    parser.add_argument("--trees", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * args.years, freq="D")
+    seasonal = 300 + 200 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365)
+    noise = np.convolve(rng.normal(0, 40, len(times)), np.ones(5) / 5, mode="same")
+    series = pd.DataFrame({"time": times, "caudal": seasonal + noise})
+    horizons = tuple(range(1, args.horizons + 1))
+    df = add_horizon_targets(create_features(series), series, horizons=horizons)
+    train, test = FeatureDataset.from_frame(df, target_cols=horizon_columns(horizons=horizons)).split_temporal(0.3)
+    params = {"n_estimators": args.trees}
+
+    start = time.perf_counter()
+    joint = train_model(train, params=params)
+    joint_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    joint_pred = joint.predict(test.X)
+    joint_predict = time.perf_counter() - start
+
+    start = time.perf_counter()
+    separate = [train_model(train.X, train.y[:, j], params=params) for j in range(len(horizons))]
+    separate_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    separate_pred = np.column_stack([model.predict(test.X) for model in separate])
+    separate_predict = time.perf_counter() - start
+
+    print(f"\n{len(train)} filas de entrenamiento, {len(test)} de prueba, {len(horizons)} horizontes, "
+          f"{args.trees} árboles, {os.cpu_count()} núcleos disponibles")
+    print(f"  {'':<22} {'ajuste (s)':>11} {'predict (s)':>12} {'modelo (MB)':>12} {'MAE medio':>10}")
+    for label, fit_s, predict_s, mb, pred in (
+            ("multi-salida (1)", joint_fit, joint_predict, size_mb(joint), joint_pred),
+            (f"por horizonte ({len(horizons)})", separate_fit, separate_predict,
+             sum(size_mb(m) for m in separate), separate_pred)):
+        print(f"  {label:<22} {fit_s:11.2f} {predict_s:12.3f} {mb:12.1f} "
+              f"{mean_absolute_error(test.y, pred):10.3f}")
+    print(f"  Aceleración del ajuste: {separate_fit / joint_fit:.1f}x")
+    print("  MAE por horizonte (multi-salida / por horizonte):")
+    for j, k in enumerate(horizons):
+        print(f"    h{k:<3} {mean_absolute_error(test.y[:, j], joint_pred[:, j]):8.3f} "
+              f"{mean_absolute_error(test.y[:, j], separate_pred[:, j]):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# scripts/benchmarks/bench_incremental.py
+# Reentrenamiento diario: reajuste completo del bosque vs actualización incremental (warm start sobre una
+# ventana reciente, retirando los árboles más antiguos) durante una semana simulada de datos nuevos
+# El error se mide sobre el año siguiente al último día de entrenamiento
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features, train_model
+from src.models.engines import RF_PARAMS
+from src.models.incremental import ADD_TREES, WINDOW_DAYS, retrain
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del reentrenamiento incremental")
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--days", type=int, default=6, help="Actualizaciones diarias tras el reajuste completo")
+    parser.add_argument("--add-trees", type=int, default=ADD_TREES)
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * args.years, freq="D")
+    seasonal = 300 + 200 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365)
+    noise = np.convolve(rng.normal(0, 40, len(times)), np.ones(5) / 5, mode="same")
+    dataset = FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": seasonal + noise})))
+    end = len(dataset) - 365 - args.days
+    holdout = dataset.rows(end + args.days, len(dataset))
+
+    model, state, summary = retrain(dataset.rows(0, end), mode="full", today=dataset.time[end - 1])
+    rows = [("completo", 0, summary["train_s"], summary["train_s"],
+             mean_absolute_error(holdout.y, model.predict(holdout.X)))]
+    for day in range(1, args.days + 1):
+        train = dataset.rows(0, end + day)
+        today = pd.Timestamp(train.time[-1])
+        model, state, summary = retrain(train, model, state, mode="incremental", today=today,
+                                        add_trees=args.add_trees, window_days=args.window_days)
+        start = time.perf_counter()
+        full = train_model(train)
+        full_s = time.perf_counter() - start
+        rows.append((f"día {day}", day, summary["train_s"], full_s,
+                     mean_absolute_error(holdout.y, model.predict(holdout.X)),
+                     mean_absolute_error(holdout.y, full.predict(holdout.X))))
+
+    print(f"\n{end} filas de entrenamiento iniciales, {args.days} actualizaciones de {args.add_trees} árboles "
+          f"sobre {args.window_days} días (bosque de {RF_PARAMS['n_estimators']}), {os.cpu_count()} núcleos")
+    print(f"  {'':<10} {'incremental (s)':>16} {'completo (s)':>13} {'MAE incr.':>10} {'MAE compl.':>11}")
+    for label, _, incremental_s, full_s, mae, *full_mae in rows:
+        full_mae = f"{full_mae[0]:11.3f}" if full_mae else f"{mae:11.3f}"
+        print(f"  {label:<10} {incremental_s:16.2f} {full_s:13.2f} {mae:10.3f} {full_mae}")
+    daily = rows[1:]
+    print(f"  Costo diario medio: {np.mean([r[2] for r in daily]):.2f} s vs {np.mean([r[3] for r in daily]):.2f} s "
+          f"({np.mean([r[3] for r in daily]) / np.mean([r[2] for r in daily]):.1f}x menos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# scripts/benchmarks/bench_parallel_features.py
+# Escalado del cálculo de features en panel: ruta serie vs pool de procesos con memoria compartida
+# Eficiencia = aceleración / procesos; con más procesos que núcleos la eficiencia cae por debajo de 1/procesos
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.panel import build_panel_dataset
+from src.features.parallel import build_panel_parallel
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de features en panel multiproceso")
+    parser.add_argument("--reaches", type=int, default=200, help="Número de tramos")
+    parser.add_argument("--years", type=int, default=85)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1940-01-01", periods=365 * args.years, freq="D").to_numpy()
+    values = rng.gamma(2.0, 50.0, (len(times), args.reaches))
+    comids = np.arange(args.reaches) + 620000000
+
+    serial, serial_s = timed(build_panel_dataset, times, values, comids)
+    print(f"{args.reaches} tramos x {args.years} años ({len(times)} días), {os.cpu_count()} núcleos disponibles")
+    print(f"  {serial.memory_report('Panel')}")
+    print(f"  {'Ruta':<22} {'tiempo (s)':>10} {'aceleración':>12} {'eficiencia':>11}")
+    print(f"  {'serie':<22} {serial_s:10.2f} {1.0:12.2f} {1.0:11.2f}")
+    for workers in args.workers:
+        dataset, parallel_s = timed(build_panel_parallel, times, values, comids, workers=workers)
+        if not np.array_equal(dataset.X, serial.X):
+            raise AssertionError("La ruta multiproceso no coincide con la ruta serie")
+        speedup = serial_s / parallel_s
+        print(f"  {f'{workers} procesos':<22} {parallel_s:10.2f} {speedup:12.2f} {speedup / workers:11.2f}")
+        del dataset
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# scripts/benchmarks/bench_pruning.py
+# Poda de features por importancia: modelo completo vs modelo con top-k / importancia acumulada
+# Usa la serie del almacén si existe; si no, una serie sintética estacional con ruido
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+from src.features.dataset import FeatureDataset
+from src.features.selection import prune_spec, select_features, print_pruning_report
+from src.models.data_analysis import create_features, evaluate_model, profile_model, train_model
+
+COMID = 620883808
+
+
+def synthetic_series(years):
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * years, freq="D")
+    doy = times.dayofyear.to_numpy()
+    seasonal = 300 + 200 * np.sin(2 * np.pi * doy / 365)
+    noise = np.convolve(rng.normal(0, 40, len(times)), np.ones(5) / 5, mode="same")
+    return pd.DataFrame({"time": times, "caudal": seasonal + noise})
+
+
+def run(df, spec=None):
+    dataset = FeatureDataset.from_frame(create_features(df, spec))
+    train, test = dataset.split_temporal(0.3)
+    start = time.perf_counter()
+    model = train_model(train)
+    train_s = time.perf_counter() - start
+    _, importance = evaluate_model(model, test)
+    return profile_model(model, test.X, test.y, train_s), importance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de poda de features por importancia")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--cumulative", type=float, default=None, help="Fracción acumulada (reemplaza a --top-k)")
+    parser.add_argument("--years", type=int, default=30, help="Años de la serie sintética")
+    args = parser.parse_args()
+
+    df = raw_store.read_series(COMID) if raw_store.has_series(COMID) else synthetic_series(args.years)
+    df["caudal"] = df["caudal"].astype("float64")
+    before, importance = run(df)
+    top_k, cumulative = (None, args.cumulative) if args.cumulative else (args.top_k, None)
+    spec, _ = prune_spec(select_features(importance, top_k=top_k, cumulative=cumulative))
+    after, _ = run(df, spec)
+    print(f"\nSerie de {len(df)} días; selección: {spec['features']}")
+    print_pruning_report(before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# scripts/benchmarks/bench_raw_store.py
+# Compara el tiempo de carga del CSV crudo (read_csv + to_datetime) contra el almacén Parquet
+# y el formato binario memmap (binary_series)
+# Usa el CSV real si existe; si no, genera una serie sintética diaria de 85 años
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store, binary_series
+
+COMID = 620883808
+REPEATS = 5
+
+
+def best_of(func, repeats=REPEATS):
+    """Mejor tiempo (s) de varias ejecuciones"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_csv(path):
+    """Ruta de carga actual: parseo de texto + to_datetime"""
+    df = pd.read_csv(path)
+    df['time'] = pd.to_datetime(df['time'])
+    return df
+
+
+def main():
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    csv_path = Path("data/raw") / f"{COMID}_retrospective_data.csv"
+    if not csv_path.exists():
+        times = pd.date_range("1940-01-01", "2025-01-01", freq="D")
+        flows = np.round(np.random.gamma(2.0, 50.0, len(times)), 3)
+        csv_path = root / f"{COMID}_retrospective_data.csv"
+        pd.DataFrame({"time": times.strftime("%Y-%m-%d"), str(COMID): flows}).to_csv(csv_path, index=False)
+
+    raw_store.csv_to_store(csv_path, COMID, root=root)
+    store_bytes = sum(p.stat().st_size for p in raw_store.series_dir(COMID, root=root).rglob("*.parquet"))
+    rows = len(load_csv(csv_path))
+    bin_path = binary_series.csv_to_binary(csv_path, COMID, root / "binary" / f"{COMID}.f32")
+
+    results = [
+        ("CSV read_csv + to_datetime", best_of(lambda: load_csv(csv_path))),
+        ("Parquet serie completa", best_of(lambda: raw_store.read_series(COMID, root=root))),
+        ("Parquet últimos 5 años", best_of(lambda: raw_store.read_series(COMID, start="2020-01-01", root=root))),
+        ("Parquet solo caudal", best_of(lambda: raw_store.read_series(COMID, columns=["caudal"], root=root))),
+        ("Binario memmap (frame)", best_of(lambda: binary_series.load_frame(path=bin_path))),
+        ("Binario memmap últimos 5 años", best_of(lambda: binary_series.load_frame(path=bin_path,
+                                                                                  start="2020-01-01"))),
+    ]
+
+    print(f"Serie: {rows} registros | CSV {csv_path.stat().st_size / 1e6:.2f} MB | "
+          f"Parquet {store_bytes / 1e6:.2f} MB | Binario {bin_path.stat().st_size / 1e6:.2f} MB")
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"  {name:<30} {seconds * 1000:8.2f} ms  ({baseline / seconds:5.1f}x)")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# scripts/benchmarks/bench_tuning.py
+# Búsqueda de hiperparámetros: successive halving vs evaluar todos los candidatos con el recurso completo
+# (una búsqueda de una sola ronda); se compara tiempo, árboles entrenados y MAE del mejor candidato
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features
+from src.models.tuning import search
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda de hiperparámetros")
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=18)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--resource", choices=("n_estimators", "fraction"), default="n_estimators")
+    parser.add_argument("--cores", type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("1990-01-01", periods=365 * args.years, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, len(times))
+    dataset = FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+    runs = {}
+    for label, min_resource in (("halving", None), ("completa", 1.0 if args.resource == "fraction" else 100)):
+        start = time.perf_counter()
+        best, trials = search(dataset, n_candidates=args.candidates, resource=args.resource,
+                              min_resource=min_resource, n_folds=args.folds, cores=args.cores)
+        final = trials[trials["rung"] == trials["rung"].max()]["mae"].min()
+        runs[label] = (time.perf_counter() - start, len(trials) * args.folds, trials["fit_s"].sum(), final, best)
+
+    print(f"\n{len(dataset)} filas, {args.candidates} candidatos, {args.folds} pliegues, "
+          f"recurso {args.resource}, {os.cpu_count()} núcleos disponibles")
+    print(f"  {'búsqueda':>9} {'tiempo (s)':>11} {'modelos':>8} {'ajuste (s)':>11} {'MAE mejor':>10}")
+    for label, (elapsed, models, fit_s, mae, _) in runs.items():
+        print(f"  {label:>9} {elapsed:11.2f} {models:8d} {fit_s:11.2f} {mae:10.3f}")
+    print(f"  Aceleración: {runs['completa'][0] / runs['halving'][0]:.2f}x  "
+          f"(mismo ganador: {runs['halving'][4] == runs['completa'][4]})")
+
+
+if __name__ == "__main__":
+    main()
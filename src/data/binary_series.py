@@ -0,0 +1,126 @@
+# src/data/binary_series.py
+# Formato binario compacto para series diarias regulares: cabecera fija + arreglo float32 por COMID
+# Se abre con numpy.memmap: lectura sin copia y caché de páginas del SO compartida entre procesos
+
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BINARY_DIR = Path("data/raw/binary")
+MAGIC = b"CELECTS1"
+VERSION = 1
+HEADER_SIZE = 64
+# magic, versión, comid, inicio (ns desde epoch), frecuencia (ns), longitud
+HEADER_FORMAT = "<8sHqqqq"
+DTYPE = np.dtype("<f4")
+
+
+def binary_path(comid, directory=None):
+    """Ruta del archivo binario de un COMID"""
+    return Path(directory or BINARY_DIR) / f"{comid}.f32"
+
+
+def _freq_ns(freq):
+    """Frecuencia fija ("D", "1h", Timedelta) en nanosegundos"""
+    if isinstance(freq, (pd.Timedelta, np.timedelta64)):
+        return pd.Timedelta(freq).as_unit("ns").value
+    grid = pd.date_range("2000-01-01", periods=2, freq=freq)
+    return (grid[1] - grid[0]).as_unit("ns").value
+
+
+def _pack_header(comid, start, freq, length):
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, int(comid), pd.Timestamp(start).as_unit("ns").value,
+                         _freq_ns(freq), int(length))
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def read_header(path):
+    """Lee la cabecera: comid, inicio, frecuencia y longitud de la serie"""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    magic, version, comid, start_ns, freq_ns, length = struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Archivo binario no reconocido: {path}")
+    return {
+        "comid": comid,
+        "start": pd.Timestamp(start_ns),
+        "freq": pd.Timedelta(freq_ns),
+        "length": length,
+    }
+
+
+def write_series(path, start, values, comid=0, freq="D"):
+    """Escribe una serie regular (inicio + frecuencia + valores float32) de forma atómica"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    values = np.ascontiguousarray(values, dtype=DTYPE)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_pack_header(comid, start, freq, len(values)))
+        values.tofile(f)
+    tmp_path.replace(path)
+    return path
+
+
+def append_values(path, values):
+    """Anexa valores al final de la serie y actualiza la longitud en la cabecera (O(nuevos))"""
+    header = read_header(path)
+    values = np.ascontiguousarray(values, dtype=DTYPE)
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + header["length"] * DTYPE.itemsize)
+        values.tofile(f)
+        f.truncate()
+        f.seek(0)
+        f.write(_pack_header(header["comid"], header["start"], header["freq"], header["length"] + len(values)))
+    return header["length"] + len(values)
+
+
+def frame_to_binary(df, comid, path=None, freq="D"):
+    """Convierte un DataFrame (time, caudal) a la malla regular (huecos como NaN) y lo escribe"""
+    times = pd.to_datetime(df["time"])
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    series = pd.Series(df["caudal"].to_numpy(dtype="float64"), index=times)
+    series = series[~series.index.duplicated(keep="last")].sort_index()
+    grid = pd.date_range(series.index[0], series.index[-1], freq=freq)
+    values = series.reindex(grid).to_numpy(dtype=DTYPE)
+    return write_series(path or binary_path(comid), grid[0], values, comid=comid, freq=freq)
+
+
+def csv_to_binary(csv_path, comid, path=None):
+    """Convierte el CSV retrospectivo existente (time, <comid>) al formato binario"""
+    df = pd.read_csv(csv_path)
+    df = df.rename(columns={df.columns[0]: "time", df.columns[1]: "caudal"})
+    return frame_to_binary(df, comid, path)
+
+
+def open_series(path):
+    """Abre la serie como memmap de solo lectura; devuelve (cabecera, arreglo float32)"""
+    header = read_header(path)
+    values = np.memmap(path, dtype=DTYPE, mode="r", offset=HEADER_SIZE, shape=(header["length"],))
+    return header, values
+
+
+def load_frame(comid=None, path=None, start=None, end=None):
+    """DataFrame (time, caudal) respaldado por el memmap, con la forma que espera create_features
+
+    El rango [start, end] se resuelve por aritmética de índices sobre el eje regular, sin copiar.
+    """
+    header, values = open_series(path or binary_path(comid))
+    first, step = header["start"], header["freq"]
+    lo = 0 if start is None else max(0, int(np.ceil((pd.Timestamp(start) - first) / step)))
+    hi = header["length"] if end is None else min(header["length"], int((pd.Timestamp(end) - first) // step) + 1)
+    hi = max(lo, hi)
+    times = pd.date_range(first + lo * step, periods=hi - lo, freq=step)
+    caudal = pd.Series(values[lo:hi], copy=False)
+    return pd.DataFrame({"time": times, "caudal": caudal}, copy=False)
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["620883808"]:
+        comid = int(arg)
+        out = csv_to_binary(Path("data/raw") / f"{comid}_retrospective_data.csv", comid)
+        print(f"COMID {comid}: {read_header(out)['length']} días -> {out}")
@@ -0,0 +1,153 @@
+# src/data/bulk_download.py
+# Descarga concurrente de múltiples COMIDs sobre una sesión HTTP keep-alive compartida
+# Incluye limitación de tasa por host, reintentos con backoff exponencial y reporte de progreso
+# Opcionalmente usa la caché HTTP en disco (http_cache) con solicitudes condicionales
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HostRateLimiter:
+    """Limita la tasa de solicitudes por host (intervalo mínimo entre solicitudes)"""
+
+    def __init__(self, rate_per_host=None):
+        self.interval = 1.0 / rate_per_host if rate_per_host else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """Reserva el siguiente turno del host y duerme hasta que llegue"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HttpClient:
+    """Sesión keep-alive compartida entre hilos con rate limit por host y reintentos"""
+
+    def __init__(self, pool_size=16, rate_per_host=None, retries=3, backoff=0.5,
+                 max_backoff=30.0, retry_statuses=RETRY_STATUSES, cache=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.limiter = HostRateLimiter(rate_per_host)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+        self.cache = cache
+        self.stats = {"requests": 0, "retries": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key, value=1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _sleep_before_retry(self, attempt, response=None):
+        """Espera con backoff exponencial + jitter, respetando Retry-After si existe"""
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = min(self.max_backoff, float(retry_after))
+        time.sleep(delay * (0.5 + random.random() / 2))
+        self._count("retries")
+
+    def request(self, method, url, **kwargs):
+        """Ejecuta una solicitud (GET pasa por la caché si está configurada)"""
+        if self.cache is not None and method == "GET":
+            return self.cache.fetch(self._send, url, **kwargs)
+        return self._send(method, url, **kwargs)
+
+    def _send(self, method, url, **kwargs):
+        """Envía a la red con rate limit y reintentos ante errores transitorios"""
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(host)
+            self._count("requests")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+            if response.status_code in self.retry_statuses and attempt < self.retries:
+                response.close()
+                self._sleep_before_retry(attempt, response)
+                continue
+            if not kwargs.get("stream"):
+                self._count("bytes", len(response.content or b""))
+            return response
+
+    def get(self, url, **kwargs):
+        """GET con la misma firma que requests.get"""
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_bulk(tasks, max_workers=8, label="descargas", progress_every=10):
+    """Ejecuta tareas (clave, callable) con concurrencia acotada y devuelve un resumen"""
+    tasks = list(tasks)
+    total = len(tasks)
+    summary = {"total": total, "ok": [], "failed": {}, "elapsed_s": 0.0}
+    start = time.perf_counter()
+    print(f"Iniciando {total} {label} con {max_workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func): key for key, func in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                summary["failed"][key] = str(e)
+            else:
+                if result is False:
+                    summary["failed"][key] = "respuesta no válida"
+                else:
+                    summary["ok"].append(key)
+            if done % progress_every == 0 or done == total:
+                elapsed = time.perf_counter() - start
+                print(f"  [{done}/{total}] {len(summary['failed'])} fallidas, {elapsed:.1f}s")
+
+    summary["elapsed_s"] = time.perf_counter() - start
+    return summary
+
+
+def print_summary(summary, client=None):
+    """Muestra el resumen final de una descarga masiva"""
+    print(f"Resumen: {len(summary['ok'])}/{summary['total']} exitosas en {summary['elapsed_s']:.1f}s")
+    if client is not None:
+        stats = client.stats
+        print(f"  Solicitudes HTTP: {stats['requests']} (reintentos: {stats['retries']}), "
+              f"{stats['bytes'] / 1e6:.2f} MB")
+        if client.cache is not None:
+            cache = client.cache.stats
+            print(f"  Caché: {cache['hits']} aciertos, {cache['revalidated']} revalidadas (304), "
+                  f"{cache['misses']} descargas, {cache['evicted']} desalojadas")
+    for key, error in summary["failed"].items():
+        print(f"  ⚠️ {key}: {error}")
@@ -0,0 +1,176 @@
+# src/data/celec_download.py
+# Ingesta de telemetría observada CELEC (SARDOM pointValues) por punto de medición (mrid)
+# Divide backfills largos en ventanas (día/semana) descargadas en paralelo, fusiona, deduplica
+# y persiste en el mismo almacén Parquet que las series GeoGLOWS (dataset "celec")
+
+import argparse
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data.bulk_download import HttpClient, run_bulk, print_summary
+from src.data.http_cache import HttpCache
+from src.data import raw_store
+
+CELEC_API_URL = os.environ.get("CELEC_API_URL", "https://generacioncsr.celec.gob.ec:8443/ords/csr")
+POINT_VALUES_URL = CELEC_API_URL + "/sardomcsr/pointValues"
+DATASET = "celec"
+
+# El portal expresa "fecha" en hora local de Ecuador continental (UTC-5)
+LOCAL_OFFSET = pd.Timedelta(hours=-5)
+RESOLUTION = pd.Timedelta(hours=1)
+
+HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Origin": "https://generacioncsr.celec.gob.ec",
+    "Referer": "https://generacioncsr.celec.gob.ec/",
+}
+
+TIME_FIELDS = ("fecha", "fechahora", "time", "timestamp")
+VALUE_FIELDS = ("valor", "value")
+
+
+def split_windows(start, end, window="1D"):
+    """Divide [start, end) en ventanas consecutivas del tamaño indicado"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    edges = list(pd.date_range(start, end, freq=pd.Timedelta(window)))
+    if not edges or edges[-1] < end:
+        edges.append(end)
+    return [(a, b) for a, b in zip(edges[:-1], edges[1:]) if a < b]
+
+
+def window_params(mrid, start, end, resolution=RESOLUTION):
+    """Parámetros de pointValues para una ventana (fechaFin inclusiva = fin - resolución)"""
+    fmt = "%Y-%m-%dT%H:%M:%S.000Z"
+    return {
+        "mrid": mrid,
+        "fechaInicio": start.strftime(fmt),
+        "fechaFin": (end - resolution).strftime(fmt),
+        "fecha": (start + LOCAL_OFFSET).strftime("%d/%m/%Y %H:%M:%S"),
+    }
+
+
+def _pick_field(record, candidates, explicit=None):
+    """Elige el campo del registro por nombre explícito o por coincidencia con candidatos"""
+    if explicit:
+        return explicit
+    lowered = {key.lower(): key for key in record}
+    for name in candidates:
+        if name in lowered:
+            return lowered[name]
+    for key in record:
+        if any(name in key.lower() for name in candidates):
+            return key
+    raise KeyError(f"No se encontró campo {candidates} en {sorted(record)}")
+
+
+def parse_point_values(payload, time_field=None, value_field=None):
+    """Convierte la respuesta JSON (ORDS items o lista) a DataFrame (time, valor) en UTC naive"""
+    items = payload.get("items", []) if isinstance(payload, dict) else payload
+    if not items:
+        return pd.DataFrame({"time": pd.Series(dtype="datetime64[ns]"), "valor": pd.Series(dtype="float64")})
+    time_key = _pick_field(items[0], TIME_FIELDS, time_field)
+    value_key = _pick_field(items[0], VALUE_FIELDS, value_field)
+    df = pd.DataFrame.from_records(items, columns=[time_key, value_key])
+    times = pd.to_datetime(df[time_key], utc=True).dt.tz_convert(None)
+    return pd.DataFrame({"time": times, "valor": pd.to_numeric(df[value_key], errors="coerce")})
+
+
+def fetch_window(client, mrid, start, end, time_field=None, value_field=None):
+    """Descarga una ventana, siguiendo la paginación ORDS (hasMore/offset) si existe"""
+    params = window_params(mrid, start, end)
+    frames = []
+    offset = 0
+    while True:
+        page_params = dict(params, offset=offset) if offset else params
+        response = client.get(POINT_VALUES_URL, params=page_params, headers=HEADERS, timeout=60)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code} en ventana {start} - {end}")
+        payload = response.json()
+        frame = parse_point_values(payload, time_field, value_field)
+        frames.append(frame)
+        if not (isinstance(payload, dict) and payload.get("hasMore")) or frame.empty:
+            break
+        offset += len(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_windows(frames):
+    """Fusiona ventanas, descarta duplicados (última lectura gana) y ordena por tiempo"""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame({"time": pd.Series(dtype="datetime64[ns]"), "valor": pd.Series(dtype="float64")})
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates(subset="time", keep="last").sort_values("time").reset_index(drop=True)
+
+
+def backfill_point(mrid, start=None, end=None, window="1D", max_workers=8, rate_per_host=None,
+                   client=None, use_cache=True, time_field=None, value_field=None, persist=True):
+    """Descarga [start, end) de un mrid en ventanas paralelas y lo persiste en el almacén
+
+    Si no se indica start se continúa desde el último dato guardado del mrid. Si alguna ventana falla
+    solo se persiste el tramo contiguo anterior a la primera fallida: la próxima ejecución continúa desde
+    el último dato guardado y vuelve a pedir esa ventana (no quedan huecos permanentes).
+    """
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.utcnow().tz_localize(None).floor("h")
+    if start is None:
+        last = raw_store.last_time(mrid, dataset=DATASET)
+        if last is None:
+            raise ValueError(f"mrid {mrid} sin datos previos: indique start")
+        start = last + RESOLUTION
+    windows = split_windows(start, end, window)
+
+    own_client = client is None
+    client = client or HttpClient(pool_size=max_workers, rate_per_host=rate_per_host,
+                                  cache=HttpCache() if use_cache else None)
+    results = {}
+    lock = threading.Lock()
+
+    def task(a, b):
+        frame = fetch_window(client, mrid, a, b, time_field, value_field)
+        with lock:
+            results[a] = frame
+        return True
+
+    tasks = [(f"{mrid} {a:%Y-%m-%d %H:%M}", lambda a=a, b=b: task(a, b)) for a, b in windows]
+    try:
+        summary = run_bulk(tasks, max_workers=max_workers, label=f"ventanas CELEC mrid={mrid}")
+        print_summary(summary, client)
+    finally:
+        if own_client:
+            client.close()
+
+    df = merge_windows(results[k] for k in sorted(results))
+    summary["rows"] = len(df)
+    first_failed = next((a for a, _ in windows if a not in results), None)
+    summary["resume_from"] = first_failed
+    if first_failed is not None:
+        df = df[df["time"] < first_failed].reset_index(drop=True)
+        print(f"mrid {mrid}: ventana {first_failed} fallida; se persiste solo hasta ese instante")
+    if persist and len(df):
+        years = raw_store.write_series(df, mrid, dataset=DATASET)
+        print(f"mrid {mrid}: {len(df)} registros persistidos (años {years[0]}-{years[-1]})")
+    return df, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill de telemetría CELEC (SARDOM pointValues)")
+    parser.add_argument("mrids", nargs="+", type=int, help="Puntos de medición (p. ej. 30031)")
+    parser.add_argument("--start", default=None, help="Inicio UTC (por defecto: último dato guardado)")
+    parser.add_argument("--end", default=None, help="Fin UTC exclusivo (por defecto: ahora)")
+    parser.add_argument("--window", default="1D", help="Tamaño de ventana (1D, 7D, ...)")
+    parser.add_argument("--workers", type=int, default=8, help="Ventanas concurrentes")
+    parser.add_argument("--rate", type=float, default=None, help="Máx. solicitudes/s por host")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché HTTP en disco")
+    args = parser.parse_args()
+
+    for mrid in args.mrids:
+        backfill_point(mrid, start=args.start, end=args.end, window=args.window, max_workers=args.workers,
+                       rate_per_host=args.rate, use_cache=not args.no_cache)
@@ -1,63 +1,250 @@
-# src/download_retrospective.py  
+# src/download_retrospective.py
 # Descarga datos históricos desde la API de GeoGLOWS para el COMID 620883808
 # Obtiene serie temporal completa 1940-2025 para entrenamiento del modelo predictivo
+# Soporta sincronización incremental: solo se descarga y anexa la cola faltante
+# El CSV crudo se mantiene por compatibilidad; el almacén Parquet (raw_store) se actualiza en paralelo
 
+import argparse
+import json
+import os
+import sys
+import threading
 import requests
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data.bulk_download import HttpClient, run_bulk, print_summary
+from src.data.http_cache import HttpCache
+from src.data.streaming import CHUNK_SIZE, ingest_csv_stream
+from src.data import raw_store
+
 BASE_DIR = Path("data/raw")
 BASE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Estado de sincronización por COMID (último timestamp, filas y bytes confirmados)
+SYNC_STATE_PATH = BASE_DIR / "sync_state.json"
+
+GEOGLOWS_API_URL = os.environ.get("GEOGLOWS_API_URL", "https://geoglows.ecmwf.int/api/v2")
+RETROSPECTIVE_URL = GEOGLOWS_API_URL + "/retrospective/{comid}"
+
+# Serializa lectura-modificación-escritura del estado entre hilos de descarga
+_STATE_LOCK = threading.Lock()
+
+def retrospective_path(comid):
+    """Ruta del CSV crudo retrospectivo de un COMID"""
+    return BASE_DIR / f"{comid}_retrospective_data.csv"
+
+def load_sync_state(path=None):
+    """Lee el estado de sincronización (dict por COMID); vacío si no existe"""
+    path = Path(path or SYNC_STATE_PATH)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_sync_state(state, path=None):
+    """Escribe el estado de sincronización de forma atómica (tmp + replace)"""
+    path = Path(path or SYNC_STATE_PATH)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _read_header(path):
+    """Lee la cabecera del CSV existente como lista de columnas"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readline().rstrip("\r\n").split(",")
+
+def _read_last_timestamp(path, block_size=4096):
+    """Obtiene el último timestamp del CSV leyendo solo el final del archivo"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - block_size))
+        lines = f.read().decode("utf-8").splitlines()
+    # La primera línea puede estar truncada; la última no vacía es la válida
+    for line in reversed(lines[1:] if len(lines) > 1 else lines):
+        if line.strip():
+            value = line.split(",")[0]
+            try:
+                return pd.Timestamp(value)
+            except ValueError:
+                return None
+    return None
+
+def _recover_partial_append(path, entry):
+    """Recorta bytes de un anexado interrumpido que no llegó a confirmarse en el estado"""
+    committed = entry.get("bytes")
+    if committed is not None and path.exists() and path.stat().st_size > committed:
+        print(f"Recortando anexado incompleto en {path.name} ({path.stat().st_size - committed} bytes)")
+        with open(path, "r+b") as f:
+            f.truncate(committed)
+
+def open_retrospective_stream(comid, start_date=None, session=None, timeout=120):
+    """Abre la descarga retrospectiva en streaming (opcionalmente desde start_date); None si falla"""
+    url = RETROSPECTIVE_URL.format(comid=comid)
+    params = {"format": "csv"}
+    if start_date is not None:
+        params["start_date"] = pd.Timestamp(start_date).strftime("%Y%m%d")
+    getter = session.get if session is not None else requests.get
+    response = getter(url, params=params, headers={"accept": "text/csv"}, timeout=timeout, stream=True)
+    if response.status_code != 200:
+        print(f"Error al descargar. Código HTTP: {response.status_code}")
+        response.close()
+        return None
+    return response
+
+def _write_full(response, output_path):
+    """Escribe la serie completa en streaming de forma atómica; devuelve (bytes, stats)"""
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        header, stats = ingest_csv_stream(response.iter_content(CHUNK_SIZE), f)
+    if header is None:
+        tmp_path.unlink()
+        return None, stats
+    os.replace(tmp_path, output_path)
+    return output_path.stat().st_size, stats
+
+def _append_stream(response, output_path, after, collect=None):
+    """Anexa en streaming solo las filas posteriores a after, con fsync; devuelve (bytes, stats)"""
+    expected_header = _read_header(output_path)
+    with open(output_path, "ab") as f:
+        header, stats = ingest_csv_stream(response.iter_content(CHUNK_SIZE), f, after=after,
+                                          write_header=False, expected_header=expected_header,
+                                          collect=collect)
+        f.flush()
+        os.fsync(f.fileno())
+    return output_path.stat().st_size, stats
+
+def sync_retrospective_data(comid, nombre, full=False, session=None, state_path=None, update_store=True):
+    """Sincroniza incrementalmente la serie de un COMID: pide solo la cola faltante y la anexa
+
+    Con update_store también se actualiza el almacén columnar (solo los años tocados).
+    """
+    output_path = retrospective_path(comid)
+    state = load_sync_state(state_path)
+    entry = state.get(str(comid), {})
+
+    if full or not output_path.exists():
+        print(f"Descarga completa para {nombre} (COMID: {comid})...")
+        response = open_retrospective_stream(comid, session=session)
+        if response is None:
+            return False
+        with response:
+            size, stats = _write_full(response, output_path)
+        if size is None:
+            print("Respuesta vacía")
+            return False
+        rows = stats.rows
+        last_time = stats.last_time
+        print(f"Datos guardados en: {output_path}")
+        print(f"Registros descargados: {rows}")
+        stats.report()
+        if update_store:
+            raw_store.csv_to_store(output_path, comid)
+    else:
+        _recover_partial_append(output_path, entry)
+        last_time = pd.Timestamp(entry["last_time"]) if entry.get("last_time") else _read_last_timestamp(output_path)
+        if last_time is None:
+            return sync_retrospective_data(comid, nombre, full=True, session=session,
+                                           state_path=state_path, update_store=update_store)
+
+        print(f"Sincronización incremental para {nombre} (COMID: {comid}) desde {last_time.date()}...")
+        start = last_time + pd.Timedelta(days=1)
+        try:
+            response = open_retrospective_stream(comid, start_date=start, session=session)
+        except requests.RequestException as e:
+            print(f"Consulta incremental fallida ({e}); se usa descarga completa")
+            response = None
+        if response is None:
+            # Respaldo: descarga completa y se filtra la cola localmente al vuelo
+            response = open_retrospective_stream(comid, session=session)
+            if response is None:
+                return False
+
+        new_rows = [] if update_store else None
+        with response:
+            size, stats = _append_stream(response, output_path, last_time, collect=new_rows)
+
+        if not stats.rows:
+            print(f"Sin registros nuevos para {nombre}; archivo sin cambios")
+            rows = entry.get("rows")
+        else:
+            rows = entry["rows"] + stats.rows if entry.get("rows") is not None else None
+            last_time = stats.last_time
+            print(f"Registros anexados: {stats.rows} -> {output_path}")
+            stats.report()
+            if update_store and raw_store.has_series(comid):
+                times, flows = zip(*new_rows)
+                raw_store.write_series(pd.DataFrame({"time": times, "caudal": flows}), comid)
+
+        if update_store and not raw_store.has_series(comid):
+            raw_store.csv_to_store(output_path, comid)
+
+    with _STATE_LOCK:
+        state = load_sync_state(state_path)
+        state[str(comid)] = {
+            "last_time": last_time.isoformat() if last_time is not None else None,
+            "rows": rows,
+            "bytes": size,
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        save_sync_state(state, state_path)
+    return True
+
+def sync_many_retrospective(segmentos, full=False, max_workers=8, rate_per_host=None, client=None,
+                            use_cache=True):
+    """Sincroniza varios COMIDs en paralelo sobre una sesión keep-alive compartida"""
+    own_client = client is None
+    client = client or HttpClient(pool_size=max_workers, rate_per_host=rate_per_host,
+                                  cache=HttpCache() if use_cache else None)
+    tasks = [
+        (comid, lambda c=comid, n=nombre: sync_retrospective_data(c, n, full=full, session=client))
+        for nombre, comid in segmentos
+    ]
+    try:
+        summary = run_bulk(tasks, max_workers=max_workers, label="series retrospectivas")
+        print_summary(summary, client)
+    finally:
+        if own_client:
+            client.close()
+    return summary
+
 def download_retrospective_data(comid, nombre):
     """Descarga datos retrospectivos diarios desde endpoint v2 de GeoGLOWS"""
     print(f"Descargando datos retrospectivos para {nombre} (COMID: {comid})...")
-    
-    # URL de GeoGLOWS para datos retrospectivos
-    url = f"https://geoglows.ecmwf.int/api/v2/retrospective/{comid}"
-    
+
     try:
-        response = requests.get(url, headers={"accept": "text/csv"}, timeout=120)
-        
-        if response.status_code == 200 and response.content:
-            # Leer datos
-            df = pd.read_csv(pd.io.common.StringIO(response.text))
-            
-            # Guardar archivo
-            filename = f"{comid}_retrospective_data.csv"
-            output_path = BASE_DIR / filename
-            df.to_csv(output_path, index=False)
-            
-            print(f"Datos guardados en: {output_path}")
-            print(f"Registros descargados: {len(df)}")
-            
-            # Mostrar info básica
-            if len(df.columns) >= 2:
-                time_col = df.columns[0]
-                flow_col = df.columns[1] 
-                print(f"Período: {df[time_col].min()} a {df[time_col].max()}")
-                print(f"Caudal promedio: {df[flow_col].mean():.2f} m³/s")
-                print(f"Rango: {df[flow_col].min():.2f} - {df[flow_col].max():.2f} m³/s")
-            
-            return True
-            
-        else:
-            print(f"Error al descargar. Código HTTP: {response.status_code}")
-            return False
-            
+        return sync_retrospective_data(comid, nombre, full=True)
     except Exception as e:
         print(f"Error durante la descarga: {e}")
         return False
 
 if __name__ == "__main__":
-    # Descargar para COMID 620883808
-    comid = 620883808
-    nombre = "rio_620883808"
-    
-    success = download_retrospective_data(comid, nombre)
-    
+    parser = argparse.ArgumentParser(description="Descarga/sincroniza datos retrospectivos GeoGLOWS")
+    parser.add_argument("--full", action="store_true", help="Forzar descarga completa 1940-hoy")
+    parser.add_argument("--workers", type=int, default=8, help="Descargas concurrentes")
+    parser.add_argument("--rate", type=float, default=None, help="Máx. solicitudes/s por host")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché HTTP en disco")
+    args = parser.parse_args()
+
+    # Segmentos a descargar (nombre, COMID)
+    segmentos = [
+        ("rio_620883808", 620883808)
+    ]
+
+    summary = sync_many_retrospective(segmentos, full=args.full, max_workers=args.workers,
+                                      rate_per_host=args.rate, use_cache=not args.no_cache)
+    success = not summary["failed"]
+
     if success:
         print(f"\nDescarga completada exitosamente!")
     else:
-        print(f"\nFalló la descarga")
\ No newline at end of file
+        print(f"\nFalló la descarga")
@@ -0,0 +1,181 @@
+# src/data/forecast_archive.py
+# Archivo consolidado de pronósticos GeoGLOWS en formato largo (comid, issue_time, valid_time, stat, value)
+# Un Parquet por COMID y mes de emisión, un row group por emisión, más un índice ordenado por fecha de emisión
+# Las consultas as-of localizan la emisión por bisección en el índice y leen un único row group
+
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+
+ARCHIVE = "forecasts"
+INDEX_FILE = "_index.json"
+SCHEMA = pa.schema([
+    ("issue_time", pa.timestamp("ns")),
+    ("valid_time", pa.timestamp("ns")),
+    ("stat", pa.dictionary(pa.int8(), pa.string())),
+    ("value", pa.float32()),
+])
+FILENAME_RE = re.compile(r"(?P<nombre>.+)_forecast_direct_(?P<date>\d{8})\.csv$")
+
+_LOCK = threading.Lock()
+
+
+def archive_dir(comid, root=None):
+    """Directorio del archivo de pronósticos de un COMID"""
+    return Path(root or raw_store.STORE_DIR) / ARCHIVE / f"comid={comid}"
+
+
+def _load_index(comid, root=None):
+    path = archive_dir(comid, root) / INDEX_FILE
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["issues"]
+
+
+def _save_index(comid, entries, root=None):
+    path = archive_dir(comid, root) / INDEX_FILE
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"issues": entries}, f)
+    os.replace(tmp_path, path)
+
+
+def to_long(df, issue_time):
+    """Convierte un pronóstico ancho (tiempo, stat1, stat2, ...) a formato largo"""
+    time_col = df.columns[0]
+    long = df.melt(id_vars=[time_col], var_name="stat", value_name="value")
+    valid = pd.to_datetime(long[time_col], utc=True).dt.tz_convert(None)
+    return pd.DataFrame({
+        "issue_time": pd.Timestamp(issue_time),
+        "valid_time": valid.astype("datetime64[ns]"),
+        "stat": long["stat"].astype(str),
+        "value": pd.to_numeric(long["value"], errors="coerce").astype("float32"),
+    }).sort_values(["valid_time", "stat"]).reset_index(drop=True)
+
+
+def _naive(value):
+    """Timestamp sin zona horaria (UTC) para claves de índice comparables"""
+    value = pd.Timestamp(value)
+    return value.tz_convert(None) if value.tzinfo is not None else value
+
+
+def _month_file(issue_time):
+    return f"month={pd.Timestamp(issue_time):%Y%m}.parquet"
+
+
+def append_forecast(df, comid, issue_time, root=None):
+    """Agrega (o reemplaza) una emisión: reescribe solo el archivo de su mes y actualiza el índice"""
+    issue_time = _naive(issue_time)
+    long = to_long(df, issue_time)
+    base = archive_dir(comid, root)
+    base.mkdir(parents=True, exist_ok=True)
+    filename = _month_file(issue_time)
+    path = base / filename
+
+    with _LOCK:
+        groups = {}
+        if path.exists():
+            pf = pq.ParquetFile(path)
+            for rg in range(pf.num_row_groups):
+                table = pf.read_row_group(rg)
+                groups[pd.Timestamp(table["issue_time"][0].as_py())] = table
+        groups[issue_time] = pa.Table.from_pandas(long, schema=SCHEMA, preserve_index=False)
+
+        tmp_path = path.with_suffix(".tmp")
+        issues = sorted(groups)
+        with pq.ParquetWriter(tmp_path, SCHEMA, compression=raw_store.COMPRESSION) as writer:
+            for issue in issues:
+                writer.write_table(groups[issue], row_group_size=max(1, groups[issue].num_rows))
+        os.replace(tmp_path, path)
+
+        entries = [e for e in _load_index(comid, root) if e[1] != filename]
+        entries += [[issue.isoformat(), filename, rg] for rg, issue in enumerate(issues)]
+        entries.sort(key=lambda e: e[0])
+        _save_index(comid, entries, root)
+    return len(long)
+
+
+def parse_filename(path):
+    """Extrae (nombre, fecha de emisión) de rio_<comid>_forecast_direct_YYYYMMDD.csv"""
+    match = FILENAME_RE.search(Path(path).name)
+    if not match:
+        raise ValueError(f"Nombre de archivo de pronóstico no reconocido: {path}")
+    return match.group("nombre"), pd.Timestamp(match.group("date"))
+
+
+def comid_from_nombre(nombre):
+    """COMID a partir del nombre de segmento (rio_620883808 -> 620883808)"""
+    return int(re.search(r"(\d+)$", nombre).group(1))
+
+
+def ingest_forecast_csv(path, comid=None, issue_time=None, root=None):
+    """Agrega al archivo un CSV diario de pronóstico descargado"""
+    nombre, file_date = parse_filename(path)
+    comid = comid if comid is not None else comid_from_nombre(nombre)
+    return append_forecast(pd.read_csv(path), comid, issue_time or file_date, root)
+
+
+def import_directory(directory, root=None):
+    """Importa todos los CSV diarios existentes (migración desde data/raw/geoglows)"""
+    count = 0
+    for path in sorted(Path(directory).glob("*_forecast_direct_*.csv")):
+        ingest_forecast_csv(path, root=root)
+        count += 1
+    print(f"Pronósticos importados al archivo: {count}")
+    return count
+
+
+def issues(comid, root=None):
+    """Fechas de emisión archivadas (ordenadas)"""
+    return [pd.Timestamp(e[0]) for e in _load_index(comid, root)]
+
+
+def _read_entry(comid, entry, root=None, stats=None):
+    table = pq.ParquetFile(archive_dir(comid, root) / entry[1]).read_row_group(entry[2])
+    df = table.to_pandas()
+    df["stat"] = df["stat"].astype(str)
+    if stats is not None:
+        df = df[df["stat"].isin(list(stats))]
+    return df.reset_index(drop=True)
+
+
+def read_issue(comid, issue_time, root=None, stats=None):
+    """Lee una emisión exacta; None si no está archivada"""
+    key = _naive(issue_time).isoformat()
+    for entry in _load_index(comid, root):
+        if entry[0] == key:
+            return _read_entry(comid, entry, root, stats)
+    return None
+
+
+def as_of(comid, cutoff, valid_time=None, stats=None, inclusive=True, root=None):
+    """Última emisión con issue_time <= cutoff (o < si inclusive=False), opcionalmente para un valid_time"""
+    entries = _load_index(comid, root)
+    keys = [e[0] for e in entries]
+    cutoff_key = _naive(cutoff).isoformat()
+    pos = bisect.bisect_right(keys, cutoff_key) if inclusive else bisect.bisect_left(keys, cutoff_key)
+    if pos == 0:
+        return None
+    df = _read_entry(comid, entries[pos - 1], root, stats)
+    if valid_time is not None:
+        df = df[df["valid_time"] == pd.Timestamp(valid_time)].reset_index(drop=True)
+    return df
+
+
+if __name__ == "__main__":
+    import_directory(Path("data/raw/geoglows"))
@@ -1,33 +1,77 @@
 # src/geoglows_download.py
-# Descarga pronósticos actuales de caudales desde GeoGLOWS para el COMID 620883808  
+# Descarga pronósticos actuales de caudales desde GeoGLOWS para el COMID 620883808
 # Obtiene predicciones a 15 días con intervalos de confianza para análisis operativo
 
-import io
+import os
+import sys
+import argparse
 import requests
-import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data.bulk_download import HttpClient, run_bulk, print_summary
+from src.data.http_cache import HttpCache
+from src.data.streaming import CHUNK_SIZE, stream_to_file
+from src.data import forecast_archive
+
 BASE = Path("data/raw/geoglows")
 BASE.mkdir(parents=True, exist_ok=True)
 
-def download_direct_forecast(comid, nombre):
-    """Descarga pronósticos directos desde API v2 con marca temporal para trazabilidad"""
-    url = f"https://geoglows.ecmwf.int/api/v2/forecast/{comid}"
+GEOGLOWS_API_URL = os.environ.get("GEOGLOWS_API_URL", "https://geoglows.ecmwf.int/api/v2")
+FORECAST_URL = GEOGLOWS_API_URL + "/forecast/{comid}"
+
+def download_direct_forecast(comid, nombre, session=None, archive=True):
+    """Descarga pronósticos directos desde API v2 con marca temporal para trazabilidad
+
+    Con archive=True la emisión también se agrega al archivo consolidado (forecast_archive).
+    """
+    url = FORECAST_URL.format(comid=comid)
     today = datetime.now().strftime("%Y%m%d")
-    resp = requests.get(url, headers={"accept": "text/csv"}, timeout=60)
-    if resp.status_code == 200 and resp.content:
-        df = pd.read_csv(io.StringIO(resp.content.decode("utf-8")))
-        out = BASE / f"{nombre}_forecast_direct_{today}.csv"
-        df.to_csv(out, index=False)
-        print(f"[{nombre}] forecast descargado (directo) -> {out.name}")
-    else:
+    getter = session.get if session is not None else requests.get
+    with getter(url, headers={"accept": "text/csv"}, timeout=60, stream=True) as resp:
+        if resp.status_code == 200:
+            # El cuerpo va directo a disco por bloques, sin decodificar ni re-serializar
+            out = BASE / f"{nombre}_forecast_direct_{today}.csv"
+            size, lines = stream_to_file(resp.iter_content(CHUNK_SIZE), out)
+            if size:
+                print(f"[{nombre}] forecast descargado (directo) -> {out.name} ({max(lines - 1, 0)} filas)")
+                if archive:
+                    forecast_archive.ingest_forecast_csv(out, comid=comid)
+                return True
+            out.unlink()
         print(f"⚠️ {nombre} fallo al descargar directo, estado HTTP: {resp.status_code}")
+        return False
+
+def download_many_forecasts(segmentos, max_workers=8, rate_per_host=None, client=None, use_cache=True):
+    """Descarga pronósticos de varios segmentos en paralelo con sesión compartida"""
+    own_client = client is None
+    client = client or HttpClient(pool_size=max_workers, rate_per_host=rate_per_host,
+                                  cache=HttpCache() if use_cache else None)
+    tasks = [
+        (nombre, lambda c=comid, n=nombre: download_direct_forecast(c, n, session=client))
+        for nombre, comid in segmentos
+    ]
+    try:
+        summary = run_bulk(tasks, max_workers=max_workers, label="pronósticos")
+        print_summary(summary, client)
+    finally:
+        if own_client:
+            client.close()
+    return summary
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Descarga pronósticos GeoGLOWS a 15 días")
+    parser.add_argument("--workers", type=int, default=8, help="Descargas concurrentes")
+    parser.add_argument("--rate", type=float, default=None, help="Máx. solicitudes/s por host")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché HTTP en disco")
+    args = parser.parse_args()
+
     segmentos = [
         ("rio_620883808", 620883808)
     ]
 
-    for nombre, comid in segmentos:
-        download_direct_forecast(comid, nombre)
+    download_many_forecasts(segmentos, max_workers=args.workers, rate_per_host=args.rate, use_cache=not args.no_cache)
@@ -0,0 +1,211 @@
+# src/data/http_cache.py
+# Caché HTTP en disco compartido por los descargadores (GeoGLOWS, CELEC)
+# Guarda validadores ETag/Last-Modified, envía solicitudes condicionales y sirve 304 desde la copia local
+# Política TTL por endpoint y desalojo LRU acotado por tamaño total en disco
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHE_DIR = Path("data/cache/http")
+MAX_BYTES = 512 * 1024 * 1024
+CHUNK_SIZE = 1 << 16
+
+# (patrón regex sobre la URL, TTL en segundos): dentro del TTL no se consulta la red;
+# vencido el TTL se revalida con solicitud condicional
+DEFAULT_TTLS = [
+    (r"/retrospective/", 24 * 3600),
+    (r"/forecast/", 3 * 3600),
+    (r"sardomcsr/pointValues", 10 * 60),
+]
+
+
+class CachedResponse:
+    """Respuesta servida desde el cuerpo guardado en disco (misma interfaz que requests.Response)"""
+
+    def __init__(self, path, url, headers, status_code=200, from_cache=True):
+        self.path = Path(path)
+        self.url = url
+        self.headers = dict(headers)
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size or CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    @property
+    def content(self):
+        return self.path.read_bytes()
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HttpCache:
+    """Caché de respuestas GET en disco con revalidación condicional, TTL por endpoint y LRU"""
+
+    def __init__(self, directory=None, max_bytes=MAX_BYTES, ttls=None, default_ttl=0):
+        self.directory = Path(directory or CACHE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.json"
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def key(url, params=None):
+        """Clave estable de la solicitud (URL + parámetros ordenados)"""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"GET {url}?{query}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url):
+        """TTL de la primera política cuyo patrón coincide con la URL"""
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def _body_path(self, key):
+        return self.directory / f"{key}.body"
+
+    def _touch(self, key, refreshed=False):
+        """Actualiza el acceso LRU (y la frescura si se revalidó) y devuelve la entrada"""
+        with self._lock:
+            entry = self._index[key]
+            now = time.time()
+            entry["last_access"] = now
+            if refreshed:
+                entry["stored_at"] = now
+            self._save_index()
+            return dict(entry)
+
+    def _respond(self, key, entry):
+        return CachedResponse(self._body_path(key), entry["url"], entry["headers"])
+
+    def _store(self, key, url, response):
+        """Guarda el cuerpo en streaming y registra validadores; aplica desalojo LRU"""
+        body_path = self._body_path(key)
+        tmp_path = body_path.with_suffix(f".{threading.get_ident()}.tmp")
+        size = 0
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    size += len(chunk)
+        response.close()
+        os.replace(tmp_path, body_path)
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() in ("content-type", "etag", "last-modified")}
+        now = time.time()
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": headers,
+            "size": size,
+            "stored_at": now,
+            "last_access": now,
+        }
+        with self._lock:
+            self._index[key] = entry
+            self._evict(keep=key)
+            self._save_index()
+        return entry
+
+    def _evict(self, keep=None):
+        """Desaloja las entradas menos usadas hasta respetar max_bytes (requiere el lock)"""
+        total = sum(e["size"] for e in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index.pop(key)["size"]
+            self._body_path(key).unlink(missing_ok=True)
+            self.stats["evicted"] += 1
+
+    def fetch(self, send, url, params=None, headers=None, **kwargs):
+        """GET con caché: fresco -> disco; vencido -> condicional (304 -> disco); si no, red"""
+        key = self.key(url, params)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and not self._body_path(key).exists():
+                self._index.pop(key)
+                entry = None
+        ttl = self.ttl_for(url)
+
+        if entry is not None and time.time() - entry["stored_at"] < ttl:
+            self._count("hits")
+            return self._respond(key, self._touch(key))
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        kwargs["stream"] = True
+        response = send("GET", url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self._count("revalidated")
+            return self._respond(key, self._touch(key, refreshed=True))
+
+        self._count("misses")
+        no_store = "no-store" in response.headers.get("Cache-Control", "")
+        has_validators = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if response.status_code == 200 and not no_store and (has_validators or ttl > 0):
+            entry = self._store(key, url, response)
+            return CachedResponse(self._body_path(key), url, entry["headers"], from_cache=False)
+        return response
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        with self._lock:
+            for key in list(self._index):
+                self._body_path(key).unlink(missing_ok=True)
+            self._index = {}
+            self._save_index()
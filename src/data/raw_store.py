@@ -0,0 +1,193 @@
+# src/data/raw_store.py
+# Almacén columnar Parquet de series crudas, particionado por COMID y año (layout hive)
+# Columnas tipadas (timestamp + float32) comprimidas con zstd; lecturas con proyección y filtro de fechas
+
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = Path("data/raw/store")
+DATASET = "retrospective"
+COMPRESSION = "zstd"
+PART_FILE = "part-0.parquet"
+
+# Columna de valor por dataset (GeoGLOWS simulado: caudal; telemetría CELEC: valor)
+VALUE_COLUMNS = {"retrospective": "caudal", "celec": "valor"}
+
+
+def value_column(dataset=DATASET):
+    """Nombre de la columna de valor de un dataset"""
+    return VALUE_COLUMNS.get(dataset, "caudal")
+
+
+def schema(dataset=DATASET):
+    """Esquema Arrow tipado (time timestamp[ns], valor float32) de un dataset"""
+    return pa.schema([("time", pa.timestamp("ns")), (value_column(dataset), pa.float32())])
+
+
+def series_dir(comid, dataset=DATASET, root=None):
+    """Directorio de particiones de un COMID"""
+    return Path(root or STORE_DIR) / dataset / f"comid={comid}"
+
+
+def has_series(comid, dataset=DATASET, root=None):
+    """Indica si el almacén tiene particiones para el COMID"""
+    path = series_dir(comid, dataset, root)
+    return path.exists() and any(path.glob(f"year=*/{PART_FILE}"))
+
+
+def last_time(comid, dataset=DATASET, root=None):
+    """Último timestamp guardado; lee solo la columna time del año más reciente"""
+    base = series_dir(comid, dataset, root)
+    years = sorted(int(p.parent.name.split("=", 1)[1]) for p in base.glob(f"year=*/{PART_FILE}"))
+    if not years:
+        return None
+    table = pq.read_table(base / f"year={years[-1]}" / PART_FILE, columns=["time"])
+    return pd.Timestamp(pc.max(table["time"]).as_py())
+
+
+def _normalize(times, values, value_col="caudal"):
+    """Convierte tiempos a datetime64 naive (UTC) y valores a float32"""
+    times = pd.to_datetime(pd.Series(times), utc=True).dt.tz_convert(None).astype("datetime64[ns]")
+    values = pd.to_numeric(pd.Series(values), errors="coerce").astype("float32")
+    return pd.DataFrame({"time": times.to_numpy(), value_col: values.to_numpy()})
+
+
+def _write_partition(df, path, dataset=DATASET):
+    """Escribe una partición anual de forma atómica (tmp + replace)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, schema=schema(dataset), preserve_index=False)
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+
+
+def write_series(df, comid, dataset=DATASET, root=None, merge=True):
+    """Escribe un DataFrame (time, valor) por año; con merge fusiona con los años ya guardados"""
+    value_col = value_column(dataset)
+    df = _normalize(df["time"], df[value_col], value_col)
+    base = series_dir(comid, dataset, root)
+    years = []
+    for year, part in df.groupby(df["time"].dt.year):
+        path = base / f"year={year}" / PART_FILE
+        if merge and path.exists():
+            existing = pq.read_table(path).to_pandas()
+            part = pd.concat([existing, part], ignore_index=True)
+        part = part.drop_duplicates(subset="time", keep="last").sort_values("time")
+        _write_partition(part.reset_index(drop=True), path, dataset)
+        years.append(int(year))
+    return years
+
+
+def csv_to_store(csv_path, comid, dataset=DATASET, root=None, block_size=1 << 20):
+    """Convierte un CSV crudo (time, <comid>) al almacén en streaming, reemplazando la serie"""
+    final_dir = series_dir(comid, dataset, root)
+    tmp_dir = final_dir.with_name(final_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    reader = pv.open_csv(csv_path, read_options=pv.ReadOptions(block_size=block_size))
+    time_col, flow_col = reader.schema.names[:2]
+    pending = {}
+    rows = 0
+
+    def flush(year):
+        part = pd.concat(pending.pop(year), ignore_index=True)
+        part = part.drop_duplicates(subset="time", keep="last").sort_values("time")
+        _write_partition(part.reset_index(drop=True), tmp_dir / f"year={year}" / PART_FILE, dataset)
+
+    for batch in reader:
+        chunk = _normalize(batch.column(time_col).to_pandas(), batch.column(flow_col).to_pandas(),
+                           value_column(dataset))
+        rows += len(chunk)
+        for year, part in chunk.groupby(chunk["time"].dt.year):
+            pending.setdefault(int(year), []).append(part)
+        # El CSV está ordenado: los años anteriores al mínimo del bloque ya están completos
+        min_year = int(chunk["time"].dt.year.min()) if len(chunk) else None
+        for year in [y for y in pending if min_year is not None and y < min_year]:
+            flush(year)
+    for year in list(pending):
+        flush(year)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    tmp_dir.parent.mkdir(parents=True, exist_ok=True)
+    if tmp_dir.exists():
+        os.replace(tmp_dir, final_dir)
+    return rows
+
+
+def _ts(value):
+    """Escalar Arrow timestamp[ns] para comparar con la columna time"""
+    return pa.scalar(pd.Timestamp(value).to_pydatetime(), pa.timestamp("ns"))
+
+
+def _time_filter(start=None, end=None):
+    """Construye el filtro de poda por partición anual y rango de fechas"""
+    expr = None
+    if start is not None:
+        start = pd.Timestamp(start)
+        expr = (ds.field("year") >= start.year) & (ds.field("time") >= _ts(start))
+    if end is not None:
+        end = pd.Timestamp(end)
+        cond = (ds.field("year") <= end.year) & (ds.field("time") <= _ts(end))
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read_series(comid, columns=None, start=None, end=None, dataset=DATASET, root=None):
+    """Lee la serie de un COMID leyendo solo las columnas y años/fechas solicitados"""
+    partitioning = ds.partitioning(pa.schema([("year", pa.int32())]), flavor="hive")
+    dset = ds.dataset(series_dir(comid, dataset, root), format="parquet", partitioning=partitioning)
+    columns = list(columns or ["time", value_column(dataset)])
+    table = dset.to_table(columns=columns, filter=_time_filter(start, end))
+    df = table.to_pandas()
+    if "time" in df.columns:
+        df = df.sort_values("time")
+    return df.reset_index(drop=True)
+
+
+def read_many(comids=None, columns=None, start=None, end=None, dataset=DATASET, root=None):
+    """Lee varios COMIDs en formato largo (comid, time, valor) en una sola consulta"""
+    partitioning = ds.partitioning(pa.schema([("comid", pa.int64()), ("year", pa.int32())]), flavor="hive")
+    base = Path(root or STORE_DIR) / dataset
+    paths = [str(p) for p in base.glob(f"comid=*/year=*/{PART_FILE}")]
+    dset = ds.dataset(paths, format="parquet", partitioning=partitioning, partition_base_dir=str(base))
+    expr = _time_filter(start, end)
+    if comids is not None:
+        cond = ds.field("comid").isin([int(c) for c in comids])
+        expr = cond if expr is None else expr & cond
+    columns = ["comid"] + list(columns or ["time", value_column(dataset)])
+    df = dset.to_table(columns=columns, filter=expr).to_pandas()
+    sort_cols = [c for c in ("comid", "time") if c in df.columns]
+    return df.sort_values(sort_cols).reset_index(drop=True)
+
+
+def export_csv(comid, path, start=None, end=None, dataset=DATASET, root=None):
+    """Exporta la serie al formato CSV original (time, <comid>) por compatibilidad"""
+    df = read_series(comid, start=start, end=end, dataset=dataset, root=root)
+    df = df.rename(columns={value_column(dataset): str(comid)})
+    df.to_csv(path, index=False)
+    return Path(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convierte CSV crudos al almacén Parquet (o exporta a CSV)")
+    parser.add_argument("comids", nargs="*", type=int, default=[620883808])
+    parser.add_argument("--export-csv", action="store_true", help="Exportar del almacén al CSV original")
+    args = parser.parse_args()
+
+    for comid in args.comids:
+        csv_path = Path("data/raw") / f"{comid}_retrospective_data.csv"
+        if args.export_csv:
+            print(f"CSV exportado: {export_csv(comid, csv_path)}")
+        else:
+            rows = csv_to_store(csv_path, comid)
+            print(f"COMID {comid}: {rows} registros -> {series_dir(comid)}")
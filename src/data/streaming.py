@@ -0,0 +1,135 @@
+# src/data/streaming.py
+# Ingesta de CSV en streaming: escribe el cuerpo HTTP a disco por bloques
+# Calcula estadísticas resumen en la misma pasada, con memoria constante
+
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 16
+
+
+def _parse_time(value):
+    """Convierte el texto de la columna de tiempo a datetime (ISO 8601)"""
+    return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+
+
+class StreamingCsvStats:
+    """Estadísticas de una serie (tiempo, caudal) acumuladas fila a fila"""
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.nulls = 0
+        self.first_time = None
+        self.last_time = None
+        self.flow_sum = 0.0
+        self.flow_count = 0
+        self.flow_min = math.inf
+        self.flow_max = -math.inf
+
+    def add(self, time_value, flow_text):
+        """Registra una fila aceptada"""
+        self.rows += 1
+        if self.first_time is None:
+            self.first_time = time_value
+        self.last_time = time_value
+        try:
+            flow = float(flow_text)
+        except ValueError:
+            flow = math.nan
+        if math.isnan(flow):
+            self.nulls += 1
+            return
+        self.flow_sum += flow
+        self.flow_count += 1
+        self.flow_min = min(self.flow_min, flow)
+        self.flow_max = max(self.flow_max, flow)
+
+    @property
+    def flow_mean(self):
+        return self.flow_sum / self.flow_count if self.flow_count else math.nan
+
+    def report(self):
+        """Muestra info básica de la serie ingerida"""
+        if not self.rows:
+            return
+        print(f"Período: {self.first_time} a {self.last_time}")
+        if self.flow_count:
+            print(f"Caudal promedio: {self.flow_mean:.2f} m³/s")
+            print(f"Rango: {self.flow_min:.2f} - {self.flow_max:.2f} m³/s")
+
+
+def iter_lines(chunks):
+    """Reagrupa bloques de bytes en líneas de texto sin cargar el cuerpo completo"""
+    tail = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = tail + chunk
+        lines = data.split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if tail.strip():
+        yield tail.rstrip(b"\r").decode("utf-8")
+
+
+def ingest_csv_stream(chunks, out, after=None, write_header=True, expected_header=None, collect=None):
+    """Copia un CSV (tiempo, caudal, ...) de chunks a out filtrando filas <= after y duplicadas
+
+    Devuelve (header, stats). Las filas se aceptan solo si su tiempo es estrictamente
+    mayor que el último aceptado, lo que deduplica y descarta la historia ya guardada.
+    Si se pasa una lista en collect, se le agregan las filas aceptadas como (tiempo, caudal).
+    """
+    lines = iter_lines(chunks)
+    header = next(lines, None)
+    if header is None:
+        return None, StreamingCsvStats()
+    if expected_header is not None and header.split(",") != list(expected_header):
+        raise ValueError(f"Cabecera inesperada: {header!r}")
+    if write_header:
+        out.write((header + "\n").encode("utf-8"))
+
+    stats = StreamingCsvStats()
+    last = after
+    buffer = []
+    for line in lines:
+        if not line.strip():
+            continue
+        parts = line.split(",", 2)
+        time_value = _parse_time(parts[0])
+        if last is not None and (last.tzinfo is None) != (time_value.tzinfo is None):
+            last = last.replace(tzinfo=time_value.tzinfo)
+        if last is not None and time_value <= last:
+            stats.skipped += 1
+            continue
+        last = time_value
+        flow_text = parts[1] if len(parts) > 1 else ""
+        stats.add(time_value, flow_text)
+        if collect is not None:
+            collect.append((time_value, flow_text))
+        buffer.append(line)
+        if len(buffer) >= 4096:
+            out.write(("\n".join(buffer) + "\n").encode("utf-8"))
+            buffer.clear()
+    if buffer:
+        out.write(("\n".join(buffer) + "\n").encode("utf-8"))
+    return header.split(","), stats
+
+
+def stream_to_file(chunks, path):
+    """Escribe bloques a path de forma atómica (tmp + replace); devuelve (bytes, líneas)"""
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    size = 0
+    newlines = 0
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                size += len(chunk)
+                newlines += chunk.count(b"\n")
+    os.replace(tmp_path, path)
+    return size, newlines
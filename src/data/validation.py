@@ -0,0 +1,221 @@
+# src/data/validation.py
+# Validación incremental del almacén crudo guiada por metadatos
+# Cada partición (COMID/año) tiene un resumen en un manifiesto sidecar (filas, fechas, nulos, caudal, hash)
+# Solo se releen las particiones nuevas o modificadas; los totales y las fronteras salen del manifiesto
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.data import raw_store
+
+MANIFEST_FILE = "_manifest.json"
+
+DEFAULT_RULES = {
+    "min_rows": 1000,
+    "max_null_fraction": 0.1,
+    "flatline_min_run": 7,
+    "freq": "D",
+}
+
+
+def manifest_path(comid, dataset=raw_store.DATASET, root=None):
+    return raw_store.series_dir(comid, dataset, root) / MANIFEST_FILE
+
+
+def load_manifest(comid, dataset=raw_store.DATASET, root=None):
+    """Manifiesto de particiones validadas (dict por nombre de partición)"""
+    path = manifest_path(comid, dataset, root)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, comid, dataset=raw_store.DATASET, root=None):
+    path = manifest_path(comid, dataset, root)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _step(freq):
+    """Paso esperado del índice regular ("D" -> 1 día)"""
+    return pd.Timedelta(freq if freq[0].isdigit() else "1" + freq)
+
+
+def _edge_runs(values):
+    """Longitud de la racha de valores iguales al inicio y al final (para unir particiones)"""
+    if len(values) == 0:
+        return 0, 0
+    same = np.r_[False, values[1:] == values[:-1]]
+    breaks = np.flatnonzero(~same)
+    head = (breaks[1] if len(breaks) > 1 else len(values))
+    tail = len(values) - breaks[-1]
+    return int(head), int(tail)
+
+
+def _flatline_runs(values, min_run):
+    """Rachas de valores idénticos consecutivos de longitud >= min_run (vectorizado)"""
+    if len(values) < 2:
+        return []
+    same = values[1:] == values[:-1]
+    padded = np.r_[False, same, False].astype(np.int8)
+    starts = np.flatnonzero(np.diff(padded) == 1)
+    ends = np.flatnonzero(np.diff(padded) == -1)
+    lengths = ends - starts + 1
+    keep = lengths >= min_run
+    return [(int(s), int(n)) for s, n in zip(starts[keep], lengths[keep])]
+
+
+def summarize_partition(path, value_col, rules):
+    """Resume y valida una partición con operaciones vectorizadas"""
+    table = pq.read_table(path, columns=["time", value_col])
+    times = table["time"].to_numpy().astype("datetime64[ns]")
+    values = table[value_col].to_numpy(zero_copy_only=False).astype("float64")
+    step = _step(rules["freq"]).to_timedelta64()
+
+    deltas = np.diff(times)
+    gap_idx = np.flatnonzero(deltas > step)
+    finite = values[~np.isnan(values)]
+    runs = _flatline_runs(values, rules["flatline_min_run"])
+    head_run, tail_run = _edge_runs(values)
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": _file_hash(path),
+        "rows": int(len(values)),
+        "min_time": str(pd.Timestamp(times[0])) if len(times) else None,
+        "max_time": str(pd.Timestamp(times[-1])) if len(times) else None,
+        "nulls": int(np.isnan(values).sum()),
+        "min": float(finite.min()) if len(finite) else None,
+        "max": float(finite.max()) if len(finite) else None,
+        "mean": float(finite.mean()) if len(finite) else None,
+        "sum": float(finite.sum()),
+        "negatives": int((finite < 0).sum()),
+        "duplicates": int((deltas <= np.timedelta64(0, "ns")).sum()),
+        "gaps": [[str(pd.Timestamp(times[i])), str(pd.Timestamp(times[i + 1]))] for i in gap_idx[:20]],
+        "gap_count": int(len(gap_idx)),
+        "missing_steps": int(((deltas[gap_idx] // step) - 1).sum()) if len(gap_idx) else 0,
+        "flatlines": [[str(pd.Timestamp(times[s])), n] for s, n in runs[:20]],
+        "head_value": float(values[0]) if len(values) else None,
+        "head_run": head_run,
+        "tail_value": float(values[-1]) if len(values) else None,
+        "tail_run": tail_run,
+    }
+
+
+def _is_current(entry, path):
+    if entry is None:
+        return False
+    stat = os.stat(path)
+    return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+
+def validate_series(comid, dataset=raw_store.DATASET, root=None, rules=None, force=False):
+    """Valida incrementalmente un COMID: resume particiones nuevas/modificadas y agrega desde el manifiesto"""
+    rules = dict(DEFAULT_RULES, **(rules or {}))
+    value_col = raw_store.value_column(dataset)
+    base = raw_store.series_dir(comid, dataset, root)
+    manifest = load_manifest(comid, dataset, root)
+    files = sorted(base.glob(f"year=*/{raw_store.PART_FILE}"), key=lambda p: int(p.parent.name.split("=")[1]))
+
+    checked, skipped = [], []
+    current = {}
+    for path in files:
+        name = path.parent.name
+        entry = manifest.get(name)
+        if force or not _is_current(entry, path):
+            entry = summarize_partition(path, value_col, rules)
+            checked.append(name)
+        else:
+            skipped.append(name)
+        current[name] = entry
+    if checked or set(manifest) != set(current):
+        save_manifest(current, comid, dataset, root)
+
+    return _build_report(comid, current, rules, checked, skipped)
+
+
+def _build_report(comid, manifest, rules, checked, skipped):
+    """Agrega totales y revisa fronteras entre particiones usando solo los resúmenes"""
+    entries = [manifest[k] for k in sorted(manifest, key=lambda k: int(k.split("=")[1]))]
+    entries = [e for e in entries if e["rows"]]
+    rows = sum(e["rows"] for e in entries)
+    nulls = sum(e["nulls"] for e in entries)
+    valid = rows - nulls
+    issues = []
+
+    def issue(severity, message):
+        issues.append({"severity": severity, "message": message})
+
+    if rows < rules["min_rows"]:
+        issue("error", f"Insuficientes registros de datos: {rows}")
+    if rows and nulls > rows * rules["max_null_fraction"]:
+        issue("warning", f"Alto porcentaje de valores faltantes: {nulls}/{rows}")
+    for e in entries:
+        if e["negatives"]:
+            issue("error", f"{e['negatives']} caudales negativos entre {e['min_time']} y {e['max_time']}")
+        if e["duplicates"]:
+            issue("error", f"{e['duplicates']} marcas de tiempo duplicadas/desordenadas en {e['min_time'][:4]}")
+        for start, end in e["gaps"]:
+            issue("warning", f"Hueco en el índice diario: {start} -> {end}")
+        for start, length in e["flatlines"]:
+            issue("warning", f"Sensor plano {length} pasos desde {start}")
+
+    step = _step(rules["freq"])
+    run_value, run_length = None, 0
+    for prev, nxt in zip(entries[:-1], entries[1:]):
+        if pd.Timestamp(nxt["min_time"]) - pd.Timestamp(prev["max_time"]) > step:
+            issue("warning", f"Hueco entre particiones: {prev['max_time']} -> {nxt['min_time']}")
+    # Rachas planas que cruzan fronteras de partición
+    for e in entries:
+        if run_value is not None and e["head_value"] == run_value:
+            joined = run_length + e["head_run"]
+            if joined >= rules["flatline_min_run"] and run_length < rules["flatline_min_run"] \
+                    and e["head_run"] < rules["flatline_min_run"]:
+                issue("warning", f"Sensor plano {joined} pasos hasta {e['min_time']}")
+            run_length = joined if e["head_run"] == e["rows"] else e["tail_run"]
+        else:
+            run_length = e["tail_run"]
+        run_value = e["tail_value"]
+
+    return {
+        "comid": comid,
+        "ok": not any(i["severity"] == "error" for i in issues),
+        "rows": rows,
+        "nulls": nulls,
+        "min_time": entries[0]["min_time"] if entries else None,
+        "max_time": entries[-1]["max_time"] if entries else None,
+        "mean": (sum(e["sum"] for e in entries) / valid) if valid else None,
+        "min": min((e["min"] for e in entries if e["min"] is not None), default=None),
+        "max": max((e["max"] for e in entries if e["max"] is not None), default=None),
+        "partitions_checked": checked,
+        "partitions_skipped": skipped,
+        "issues": issues,
+    }
+
+
+def print_report(report):
+    """Muestra el reporte de validación"""
+    print(f"📊 COMID {report['comid']}: {report['rows']} registros "
+          f"({report['min_time']} a {report['max_time']}), {report['nulls']} nulos")
+    print(f"   Particiones validadas: {len(report['partitions_checked'])}, "
+          f"sin cambios: {len(report['partitions_skipped'])}")
+    for item in report["issues"]:
+        icon = "❌" if item["severity"] == "error" else "⚠️"
+        print(f"   {icon} {item['message']}")
@@ -0,0 +1,115 @@
+# src/features/baseflow.py
+# Separación de flujo base / flujo rápido con el filtro digital de Lyne–Hollick
+# Cada pasada recorre el eje temporal una vez y avanza todos los tramos de una matriz tiempo x tramo (n, m)
+# (o una serie (n,)) en el mismo paso. La restricción 0 <= rápido <= caudal se aplica en cada paso y el valor
+# acotado alimenta la recursión, como en el filtro original (un filtro lineal acotado al final no lo es)
+
+import numpy as np
+
+ALPHA = 0.925
+# Piso para el logaritmo de la recesión (m³/s): flujo base nulo no produce -inf
+FLOOR = 1e-6
+DEFAULT_BASEFLOW = {"alpha": ALPHA, "passes": 1, "bfi_windows": [30, 90], "recession": [7]}
+
+
+def _pass(values, alpha, reverse=False):
+    """Una pasada del filtro: devuelve el flujo base de `values` en la dirección indicada"""
+    series = values[::-1] if reverse else values
+    flow = series.reshape(len(series), -1)
+    diff = np.zeros_like(flow)
+    diff[1:] = flow[1:] - flow[:-1]
+    # Huecos: sin incremento a través de un NaN; el estado del filtro continúa tras el hueco
+    diff[np.isnan(diff)] = 0.0
+    diff *= (1 + alpha) / 2
+    upper = np.where(np.isnan(flow), np.inf, flow)
+    quick = np.zeros_like(flow)
+    state = np.zeros(flow.shape[1])
+    for t in range(1, len(flow)):
+        state *= alpha
+        state += diff[t]
+        np.clip(state, 0.0, upper[t], out=state)
+        quick[t] = state
+    base = (flow - quick).reshape(series.shape)
+    return base[::-1] if reverse else base
+
+
+def lyne_hollick(values, alpha=ALPHA, passes=1):
+    """Flujo base por pasadas alternas adelante/atrás (1 = solo hacia adelante, causal)
+
+    Con más de una pasada el resultado de cada día depende de días posteriores: útil para análisis,
+    no como feature de pronóstico.
+    """
+    values = np.asarray(values, dtype="float64")
+    base = values
+    for p in range(passes):
+        base = _pass(base, alpha, reverse=p % 2 == 1)
+    return base
+
+
+def _prefix(values):
+    """Sumas prefijas (con NaN como 0) y conteo prefijo de faltantes, compartidas por todas las ventanas"""
+    missing = np.isnan(values)
+    zero = np.zeros((1,) + values.shape[1:])
+    total = np.concatenate((zero, np.cumsum(np.where(missing, 0.0, values), axis=0)), axis=0)
+    gaps = np.concatenate((zero.astype(np.int32), np.cumsum(missing, axis=0, dtype=np.int32)), axis=0)
+    return total, gaps
+
+
+def _window_sum(prefix, w):
+    """Suma móvil de w valores terminando en cada fila (NaN si falta historia o algún valor)"""
+    total, gaps = prefix
+    out = np.full((len(total) - 1,) + total.shape[1:], np.nan)
+    out[w - 1:] = total[w:] - total[:-w]
+    out[w - 1:][(gaps[w:] - gaps[:-w]) > 0] = np.nan
+    return out
+
+
+def baseflow_columns(target, config):
+    """Nombres de columnas de la familia de flujo base"""
+    return ([f"{target}_baseflow_lag_1", f"{target}_quickflow_lag_1"]
+            + [f"{target}_bfi_{w}" for w in config["bfi_windows"]]
+            + [f"{target}_recession_{k}" for k in config["recession"]])
+
+
+def baseflow_span(config):
+    """Días de historia que necesita la familia (todas las features usan datos hasta t-1)"""
+    return max(baseflow_windows(config)) + 1
+
+
+def baseflow_features(values, config):
+    """Columnas (en el orden de baseflow_columns) calculadas con datos hasta el día anterior
+
+    - flujo base y rápido del día anterior
+    - índice de flujo base (BFI) en ventanas: suma de flujo base / suma de caudal
+    - tasa de recesión del flujo base en k días: (log b[t-1] - log b[t-1-k]) / k
+    """
+    values = np.asarray(values, dtype="float64")
+    base = lyne_hollick(values, config["alpha"], config["passes"])
+    previous = np.full_like(values, np.nan)
+    previous[1:] = values[:-1]
+    base_prev = np.full_like(values, np.nan)
+    base_prev[1:] = base[:-1]
+
+    columns = [base_prev, previous - base_prev]
+    flow_prefix, base_prefix = _prefix(previous), _prefix(base_prev)
+    # Solo los datos faltantes producen NaN (misma regla que la máscara de filas válidas del plan)
+    for w in config["bfi_windows"]:
+        flow = _window_sum(flow_prefix, w)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bfi = np.where(flow > 0, _window_sum(base_prefix, w) / flow, 1.0)
+        bfi[np.isnan(flow)] = np.nan
+        columns.append(bfi)
+    log_base = np.log(np.maximum(base_prev, FLOOR))
+    gaps = flow_prefix[1]
+    for k in config["recession"]:
+        rate = np.full_like(values, np.nan)
+        rate[k:] = (log_base[k:] - log_base[:-k]) / k
+        # Como las demás ventanas: NaN si falta algún día entre t-1-k y t-1
+        rate[k:][(gaps[k + 1:] - gaps[:-k - 1]) > 0] = np.nan
+        columns.append(rate)
+    return columns
+
+
+def baseflow_windows(config):
+    """Ventanas (terminando en t-1) que deben estar completas para cada columna de la familia"""
+    return [1, 1] + list(config["bfi_windows"]) + [k + 1 for k in config["recession"]]
@@ -0,0 +1,223 @@
+# src/features/climatology.py
+# Índice climatológico por COMID: distribución del caudal por día del año, suavizada en una ventana circular
+# Se guarda de forma compacta como histogramas logarítmicos por día (conteos enteros) más sumas para media y
+# desviación, de modo que agregar días nuevos es una suma; de ahí se derivan tablas (CDF, percentiles, media,
+# desviación) que permiten consultar percentil, anomalía estandarizada y banderas de sequía/crecida en O(1)
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+from src.features.spec import calendar_parts
+
+CLIMATOLOGY_DIR = Path("data/features/climatology")
+DAYS = 366
+# Bordes logarítmicos fijos (m³/s): el bin 0 recoge valores <= LOW y el último los > HIGH
+LOW, HIGH, BINS = 1e-3, 1e6, 512
+LOG_LOW = np.log(LOW)
+LOG_STEP = (np.log(HIGH) - LOG_LOW) / (BINS - 2)
+WINDOW = 15
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+DROUGHT, FLOOD = 10, 90
+
+
+def _doy(times):
+    return calendar_parts(np.asarray(times, dtype="datetime64[ns]"))["dayofyear"] - 1
+
+
+def _bins(values):
+    """Bin de cada valor por aritmética logarítmica (sin búsqueda); los NaN caen en el bin 0"""
+    values = np.where(np.isnan(values), LOW, values)
+    position = (np.log(np.maximum(values, LOW)) - LOG_LOW) / LOG_STEP
+    index = np.clip(np.floor(position).astype(np.int64) + 1, 0, BINS - 1)
+    index[values <= LOW] = 0
+    return index, position - (index - 1)
+
+
+def _smooth(table, window):
+    """Suma circular de ±window//2 días del año a lo largo del eje 0"""
+    half = window // 2
+    padded = np.concatenate((table[-half:], table, table[:half]), axis=0) if half else table
+    total = np.concatenate((np.zeros((1,) + table.shape[1:]), np.cumsum(padded, axis=0)), axis=0)
+    return total[2 * half + 1:] - total[:-2 * half - 1]
+
+
+class ClimatologyIndex:
+    """Histogramas y sumas por día del año; tablas derivadas recalculadas solo tras una actualización"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.counts = np.zeros((DAYS, BINS), dtype=np.int32)
+        self.n = np.zeros(DAYS)
+        self.s1 = np.zeros(DAYS)
+        self.s2 = np.zeros(DAYS)
+        self.last_time = None
+        self._tables = None
+
+    def update(self, times, values):
+        """Incorpora observaciones posteriores a last_time (las anteriores ya están contadas y se ignoran)"""
+        times = np.asarray(times, dtype="datetime64[ns]")
+        values = np.asarray(values, dtype="float64")
+        keep = ~np.isnan(values)
+        if self.last_time is not None:
+            keep &= times > np.datetime64(self.last_time, "ns")
+        times, values = times[keep], values[keep]
+        if len(values) == 0:
+            return 0
+        doy = _doy(times)
+        index, _ = _bins(values)
+        np.add.at(self.counts, (doy, index), 1)
+        self.n += np.bincount(doy, minlength=DAYS)
+        self.s1 += np.bincount(doy, weights=values, minlength=DAYS)
+        self.s2 += np.bincount(doy, weights=values * values, minlength=DAYS)
+        self.last_time = pd.Timestamp(times.max())
+        self._tables = None
+        return len(values)
+
+    @property
+    def tables(self):
+        """CDF acumulada por bin, media, desviación y percentiles por día del año (suavizados)"""
+        if self._tables is None:
+            counts = _smooth(self.counts.astype(np.float64), self.window)
+            total = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+            cdf = np.concatenate((np.zeros((DAYS, 1)), np.cumsum(counts, axis=1)), axis=1) / total
+            n = np.maximum(_smooth(self.n, self.window), 1)
+            mean = _smooth(self.s1, self.window) / n
+            var = (_smooth(self.s2, self.window) - n * mean * mean) / np.maximum(n - 1, 1)
+            self._tables = {
+                "cdf": cdf,
+                "mass": counts / total,
+                "mean": mean,
+                "std": np.sqrt(np.maximum(var, 0.0)),
+                "percentiles": self._inverse(cdf, PERCENTILES),
+            }
+        return self._tables
+
+    @staticmethod
+    def _inverse(cdf, levels):
+        """Caudal de cada percentil por día: interpolación logarítmica dentro del bin que cruza el nivel"""
+        out = np.empty((DAYS, len(levels)))
+        for j, level in enumerate(levels):
+            q = level / 100
+            index = np.clip((cdf[:, 1:] < q).sum(axis=1), 0, BINS - 1)
+            lo, hi = cdf[np.arange(DAYS), index], cdf[np.arange(DAYS), index + 1]
+            frac = np.where(hi > lo, (q - lo) / np.where(hi > lo, hi - lo, 1), 0.5)
+            out[:, j] = np.exp(LOG_LOW + (index - 1 + frac) * LOG_STEP)
+            out[index == 0, j] = LOW
+        return out
+
+    def percentile(self, times, values):
+        """Percentil climatológico (0-100) de cada valor en su día del año; NaN para valores faltantes"""
+        values = np.asarray(values, dtype="float64")
+        doy = _doy(times)
+        index, frac = _bins(values)
+        frac = np.where((index == 0) | (index == BINS - 1), 0.5, np.clip(frac, 0.0, 1.0))
+        tables = self.tables
+        result = 100 * (tables["cdf"][doy, index] + frac * tables["mass"][doy, index])
+        return np.where(np.isnan(values), np.nan, result)
+
+    def anomaly(self, times, values):
+        """Anomalía estandarizada (valor - media del día) / desviación del día"""
+        doy = _doy(times)
+        tables = self.tables
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (np.asarray(values, dtype="float64") - tables["mean"][doy]) / tables["std"][doy]
+
+    def threshold(self, times, level):
+        """Caudal del percentil `level` (uno de PERCENTILES) para cada fecha"""
+        return self.tables["percentiles"][_doy(times), PERCENTILES.index(level)]
+
+    def flags(self, times, values, drought=DROUGHT, flood=FLOOD):
+        """Banderas (sequía, crecida): percentil por debajo de `drought` o por encima de `flood`"""
+        pct = self.percentile(times, values)
+        return pct < drought, pct > flood
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        last = np.datetime64(self.last_time, "ns").astype("int64") if self.last_time is not None else -1
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp_path, counts=self.counts, n=self.n, s1=self.s1, s2=self.s2,
+                            window=self.window, last_time=last)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls(int(data["window"]))
+            index.counts = data["counts"]
+            index.n, index.s1, index.s2 = data["n"], data["s1"], data["s2"]
+            last = int(data["last_time"])
+        index.last_time = pd.Timestamp(last) if last >= 0 else None
+        return index
+
+
+def climatology_path(comid, directory=None):
+    return Path(directory or CLIMATOLOGY_DIR) / f"comid={comid}.npz"
+
+
+def update_climatology(comid, end=None, root=None, directory=None, window=WINDOW):
+    """Carga el índice del COMID y le agrega solo los días del almacén posteriores a su último día"""
+    path = climatology_path(comid, directory)
+    index = ClimatologyIndex.load(path) if path.exists() else ClimatologyIndex(window)
+    start = index.last_time + pd.Timedelta(days=1) if index.last_time is not None else None
+    df = raw_store.read_series(comid, start=start, end=end, root=root)
+    added = index.update(df["time"].to_numpy(), df["caudal"].to_numpy(dtype="float64"))
+    index.save(path)
+    print(f"Climatología COMID {comid}: {added} días agregados (hasta {index.last_time})")
+    return index
+
+
+def climatology_columns(target="caudal"):
+    return [f"{target}_clim_mean", f"{target}_clim_p50", f"{target}_pct_lag_1", f"{target}_anom_lag_1",
+            f"{target}_drought_lag_1", f"{target}_flood_lag_1"]
+
+
+def previous_day(times, source_times, source_values):
+    """Valor de la serie fuente en el día t-1 de cada fila, buscado por fecha (NaN si no existe)"""
+    wanted = np.asarray(times, dtype="datetime64[ns]") - np.timedelta64(1, "D")
+    source_times = np.asarray(source_times, dtype="datetime64[ns]")
+    source_values = np.asarray(source_values, dtype="float64")
+    out = np.full(len(wanted), np.nan)
+    if len(source_times):
+        pos = np.minimum(np.searchsorted(source_times, wanted), len(source_times) - 1)
+        found = source_times[pos] == wanted
+        out[found] = source_values[pos[found]]
+    return out
+
+
+def climatology_features(index, times, values, target="caudal", drought=DROUGHT, flood=FLOOD, source=None):
+    """Features de anomalía: las del caudal usan el día anterior; las del día objetivo solo la climatología
+
+    El día anterior se busca por fecha en `source` (times, values) de la serie diaria completa; por
+    defecto en las mismas filas. Así, tras filas descartadas (huecos), no se toma un día semanas anterior.
+    """
+    times = np.asarray(times, dtype="datetime64[ns]")
+    source_times, source_values = source if source is not None else (times, values)
+    previous = previous_day(times, source_times, source_values)
+    prev_times = times - np.timedelta64(1, "D")
+    dry, wet = index.flags(prev_times, previous, drought, flood)
+    missing = np.isnan(previous)
+    doy = _doy(times)
+    tables = index.tables
+    columns = [
+        tables["mean"][doy],
+        tables["percentiles"][doy, PERCENTILES.index(50)],
+        index.percentile(prev_times, previous),
+        index.anomaly(prev_times, previous),
+        np.where(missing, np.nan, dry.astype(float)),
+        np.where(missing, np.nan, wet.astype(float)),
+    ]
+    return pd.DataFrame(dict(zip(climatology_columns(target), columns)))
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["620883808"]:
+        update_climatology(int(arg))
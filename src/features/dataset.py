@@ -0,0 +1,112 @@
+# src/features/dataset.py
+# Dataset respaldado por arreglos para entrenamiento: matriz de features float32 contigua (orden C;
+# el motor en panel la entrega en orden Fortran), vector objetivo, índice temporal y nombres de features
+# Las divisiones temporales son vistas por rango de filas (sin copias); RandomForest usa float32
+# internamente, así que la matriz entra a fit/predict sin conversión
+
+import numpy as np
+import pandas as pd
+
+FEATURE_DTYPE = np.float32
+TARGET = "caudal"
+
+
+def _mb(nbytes):
+    return nbytes / 1024 ** 2
+
+
+class FeatureDataset:
+    """Matriz X (n x f, float32), objetivo y, tiempos y nombres de features; opcionalmente COMID por fila
+
+    Con varios objetivos (p. ej. horizontes de pronóstico) y es una matriz n x k y target_cols sus nombres.
+    """
+
+    def __init__(self, X, y, time, feature_names, comid=None, target=TARGET, target_cols=None):
+        self.X = X
+        self.y = y
+        self.time = time
+        self.feature_names = list(feature_names)
+        self.comid = comid
+        self.target = target
+        self.target_cols = list(target_cols) if target_cols is not None else None
+
+    @classmethod
+    def from_frame(cls, df, target=TARGET, feature_cols=None, comid_col="comid", target_cols=None):
+        """Construye el dataset desde la salida de create_features con una única conversión a float32
+
+        target_cols: columnas objetivo de un modelo multi-salida (y queda n x k, en orden C).
+        """
+        if feature_cols is None:
+            excluded = {"time", target, comid_col, *(target_cols or [])}
+            feature_cols = [c for c in df.columns if c not in excluded]
+        # Una sola pasada float64 -> float32 hacia una matriz en orden C preasignada
+        X = np.empty((len(df), len(feature_cols)), dtype=FEATURE_DTYPE)
+        X[:] = df[feature_cols].to_numpy()
+        if target_cols is None:
+            y = df[target].to_numpy(dtype="float64")
+        else:
+            y = np.ascontiguousarray(df[list(target_cols)].to_numpy(dtype="float64"))
+        time = df["time"].to_numpy(dtype="datetime64[ns]")
+        comid = df[comid_col].to_numpy() if comid_col in df.columns else None
+        return cls(X, y, time, feature_cols, comid, target, target_cols)
+
+    @classmethod
+    def from_plan(cls, plan, times, values):
+        """Construye el dataset directamente desde un FeaturePlan, sin pasar por un DataFrame"""
+        values = np.asarray(values, dtype="float64")
+        matrix = plan.compute(times, values)
+        keep = plan.valid_rows(values, matrix)
+        X = np.ascontiguousarray(matrix[keep], dtype=FEATURE_DTYPE)
+        return cls(X, values[keep], np.asarray(times, dtype="datetime64[ns]")[keep], plan.columns,
+                   target=plan.target)
+
+    @classmethod
+    def concat(cls, datasets):
+        """Une datasets (p. ej. varios COMID) ordenando por tiempo para que las divisiones sigan siendo vistas"""
+        datasets = list(datasets)
+        time = np.concatenate([d.time for d in datasets])
+        order = np.argsort(time, kind="stable")
+        comids = [d.comid if d.comid is not None else np.full(len(d), -1) for d in datasets]
+        X = np.concatenate([d.X for d in datasets])[order]
+        return cls(X, np.concatenate([d.y for d in datasets])[order], time[order], datasets[0].feature_names,
+                   np.concatenate(comids)[order], datasets[0].target, datasets[0].target_cols)
+
+    def __len__(self):
+        return len(self.y)
+
+    def rows(self, start, stop):
+        """Sub-dataset de un rango contiguo de filas (vistas, sin copiar)"""
+        comid = self.comid[start:stop] if self.comid is not None else None
+        return FeatureDataset(self.X[start:stop], self.y[start:stop], self.time[start:stop],
+                              self.feature_names, comid, self.target, self.target_cols)
+
+    def split_temporal(self, test_size=0.3):
+        """División cronológica como train_test_split_temporal (corte en el cuantil de fechas), como vistas"""
+        split_date = pd.Series(self.time).quantile(1 - test_size)
+        cut = int(np.searchsorted(self.time, np.datetime64(split_date, "ns"), side="left"))
+        train, test = self.rows(0, cut), self.rows(cut, len(self))
+        print("División temporal:")
+        print(f"  Entrenamiento: {train.start} a {train.end} ({len(train)} registros)")
+        print(f"  Prueba: {test.start} a {test.end} ({len(test)} registros)")
+        return train, test
+
+    @property
+    def start(self):
+        return pd.Timestamp(self.time[0]) if len(self) else None
+
+    @property
+    def end(self):
+        return pd.Timestamp(self.time[-1]) if len(self) else None
+
+    def frame(self):
+        """DataFrame (time, objetivo) para guardar resultados; con varios objetivos, el primero"""
+        return pd.DataFrame({"time": self.time, self.target: self.y if self.y.ndim == 1 else self.y[:, 0]})
+
+    def memory_report(self, label="Dataset"):
+        """Línea de log con el uso de memoria frente a un DataFrame float64 equivalente"""
+        x_bytes = self.X.nbytes
+        as_frame = len(self) * (len(self.feature_names) + 1) * 8 + self.time.nbytes
+        owner = "propio" if self.X.base is None else "vista"
+        return (f"{label}: {len(self)} filas x {len(self.feature_names)} features | "
+                f"X {_mb(x_bytes):.2f} MB ({self.X.dtype}, {owner}) + y {_mb(self.y.nbytes):.2f} MB | "
+                f"DataFrame float64 equivalente {_mb(as_frame):.2f} MB")
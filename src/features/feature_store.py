@@ -0,0 +1,185 @@
+# src/features/feature_store.py
+# Almacén de matrices de features direccionado por contenido
+# La clave es una huella de los datos crudos + la configuración de features (incluido el código de la función):
+# si nada cambió se devuelve la matriz materializada en Parquet en lugar de recalcularla. La huella de código
+# incluye también los módulos que esas funciones llaman (FEATURE_MODULES) y FEATURE_VERSION, que se incrementa
+# a mano ante cambios de semántica fuera de ellos (p. ej. una dependencia externa)
+# Desalojo LRU acotado por tamaño en disco; se reportan aciertos, fallos y tiempo ahorrado
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+STORE_DIR = Path("data/features")
+MAX_BYTES = 1024 * 1024 * 1024
+COMPRESSION = "zstd"
+FEATURE_VERSION = 1
+# Módulos cuyo código determina los valores de las features (helpers de calendario, caudal base, climatología...)
+FEATURE_MODULES = (
+    "src.features.spec",
+    "src.features.baseflow",
+    "src.features.climatology",
+    "src.features.gaps",
+    "src.features.forecast",
+    "src.features.horizons",
+)
+
+
+def data_fingerprint(df):
+    """Huella de los datos de entrada: columnas, tipos y valores fila a fila"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(modules=FEATURE_MODULES):
+    """Huella del código fuente de los módulos de features (se calcula una vez por proceso)"""
+    digest = hashlib.sha256(str(FEATURE_VERSION).encode("utf-8"))
+    for name in modules:
+        digest.update(inspect.getsource(importlib.import_module(name)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def config_fingerprint(func, config=None):
+    """Huella de la configuración de features, del código de la función que las calcula y de los módulos
+    que esta llama"""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, "__qualname__", repr(func))
+    payload = json.dumps({"source": source, "config": config or {}, "code": code_fingerprint(),
+                          "version": FEATURE_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def feature_key(df, func, config=None):
+    """Clave del almacén: huella de datos + huella de configuración"""
+    combined = f"{data_fingerprint(df)}:{config_fingerprint(func, config)}"
+    return hashlib.sha256(combined.encode("utf-8")).hexdigest()
+
+
+class FeatureStore:
+    """Matrices de features materializadas en Parquet con índice JSON y desalojo LRU por tamaño"""
+
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = Path(directory or STORE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.json"
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "saved_s": 0.0}
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {"entries": {}, "totals": {"hits": 0, "misses": 0, "saved_s": 0.0}}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def _path(self, key):
+        return self.directory / f"{key}.parquet"
+
+    def _count(self, name, saved_s=0.0):
+        """Actualiza contadores del proceso y acumulados entre ejecuciones (requiere el lock)"""
+        self.stats[name] += 1
+        self.stats["saved_s"] += saved_s
+        totals = self._index["totals"]
+        totals[name] += 1
+        totals["saved_s"] += saved_s
+
+    def get(self, key):
+        """Matriz guardada para la clave, o None"""
+        with self._lock:
+            entry = self._index["entries"].get(key)
+            if entry is not None and not self._path(key).exists():
+                self._index["entries"].pop(key)
+                entry = None
+        if entry is None:
+            return None
+        start = time.perf_counter()
+        df = pd.read_parquet(self._path(key))
+        load_s = time.perf_counter() - start
+        with self._lock:
+            entry["last_access"] = time.time()
+            self._count("hits", max(0.0, entry["compute_s"] - load_s))
+            self._save_index()
+        return df
+
+    def put(self, key, df, compute_s=0.0):
+        """Materializa la matriz y aplica desalojo LRU"""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        df.to_parquet(tmp_path, index=False, compression=COMPRESSION)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._index["entries"][key] = {
+                "size": path.stat().st_size,
+                "rows": len(df),
+                "columns": len(df.columns),
+                "compute_s": compute_s,
+                "created": now,
+                "last_access": now,
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def _evict(self, keep=None):
+        """Desaloja las matrices menos usadas hasta respetar max_bytes (requiere el lock)"""
+        entries = self._index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)["size"]
+            self._path(key).unlink(missing_ok=True)
+            self.stats["evicted"] += 1
+
+    def get_or_compute(self, df, func, config=None, **kwargs):
+        """Devuelve func(df) desde el almacén si datos y configuración no cambiaron; si no, lo calcula y guarda
+
+        Los kwargs se pasan a func; lo que altere el resultado debe figurar también en config.
+        """
+        key = feature_key(df, func, config)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        result = func(df, **kwargs)
+        compute_s = time.perf_counter() - start
+        with self._lock:
+            self._count("misses")
+        self.put(key, result, compute_s)
+        return result
+
+    def clear(self):
+        """Elimina todas las matrices"""
+        with self._lock:
+            for key in list(self._index["entries"]):
+                self._path(key).unlink(missing_ok=True)
+            self._index["entries"] = {}
+            self._save_index()
+
+    def print_stats(self):
+        totals = self._index["totals"]
+        print(f"Almacén de features: {self.stats['hits']} aciertos, {self.stats['misses']} fallos, "
+              f"{self.stats['saved_s']:.2f} s ahorrados (acumulado: {totals['hits']} aciertos, "
+              f"{totals['misses']} fallos, {totals['saved_s']:.2f} s)")
@@ -0,0 +1,158 @@
+# src/features/forecast.py
+# Features exógenas a partir de los pronósticos GeoGLOWS archivados (src/data/forecast_archive.py)
+# Cada emisión se resume por día de anticipación (media diaria de los pasos subdiarios de cada estadístico
+# publicado por separado: mediana y bandas de incertidumbre superior/inferior) en una tabla por COMID con
+# una fila por emisión, mantenida de forma incremental. El cruce con las filas de entrenamiento es as-of
+# sobre la fecha de emisión: cada día solo ve emisiones publicadas al menos `latency` antes, de modo que
+# no se filtra información futura
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import forecast_archive
+
+TABLE_FILE = "_features.parquet"
+LEADS = 15
+# Estadísticos del pronóstico GeoGLOWS: nombre corto de la feature -> columna stat del archivo
+STATS = {
+    "median": "flow_median",
+    "upper": "flow_uncertainty_upper",
+    "lower": "flow_uncertainty_lower",
+}
+AGGS = tuple(STATS)
+HORIZONS = tuple(range(1, LEADS + 1))
+# Un pronóstico emitido el día t se usa recién para el día t+1 (la emisión se descarga durante el día)
+LATENCY = pd.Timedelta(days=1)
+DAY_NS = np.int64(86400 * 10 ** 9)
+
+
+def lead_columns(leads=LEADS, aggs=AGGS):
+    """Columnas de la tabla por emisión: <agg>_l<día de anticipación>"""
+    return [f"{agg}_l{lead}" for lead in range(1, leads + 1) for agg in aggs]
+
+
+def feature_columns(horizons=HORIZONS, aggs=AGGS):
+    """Columnas que se agregan al frame de entrenamiento: fc_<agg>_h<k> (k=1 es el día a predecir)"""
+    return [f"fc_{agg}_h{k}" for k in horizons for agg in aggs] + ["fc_age_days"]
+
+
+def summarize_issues(long, leads=LEADS):
+    """Resumen por emisión y día de anticipación desde el formato largo del archivo
+
+    El día de anticipación 1 cubre [emisión, emisión + 1 día); cada estadístico (STATS) se promedia
+    por separado sobre los pasos subdiarios de ese día. Los que falten en la emisión quedan en NaN.
+    """
+    issue = long["issue_time"].to_numpy(dtype="datetime64[ns]")
+    valid = long["valid_time"].to_numpy(dtype="datetime64[ns]")
+    lead = (valid - issue.astype("datetime64[D]")).astype("int64") // DAY_NS + 1
+    names = {stat: agg for agg, stat in STATS.items()}
+    agg = long["stat"].astype(str).map(names).to_numpy()
+    keep = (lead >= 1) & (lead <= leads) & pd.notna(agg)
+    frame = pd.DataFrame({"issue_time": issue[keep], "lead": lead[keep], "agg": agg[keep],
+                          "value": long["value"].to_numpy(dtype="float64")[keep]})
+    summary = frame.groupby(["issue_time", "lead", "agg"])["value"].mean().unstack("agg")
+    table = summary.unstack("lead").swaplevel(axis=1)
+    table = table.reindex(columns=pd.MultiIndex.from_product([range(1, leads + 1), AGGS]))
+    table.columns = [f"{agg}_l{lead}" for lead, agg in table.columns]
+    return table.astype("float32")
+
+
+def _source_versions(comid, entries, root=None):
+    base = forecast_archive.archive_dir(comid, root)
+    return {name: (base / name).stat().st_mtime_ns for name in {e[1] for e in entries}}
+
+
+def forecast_table(comid, root=None):
+    """Tabla de emisiones resumidas (ordenada por issue_time), actualizada solo con lo nuevo o reescrito
+
+    Se guarda junto al archivo del COMID; una emisión se recalcula si su archivo mensual cambió.
+    """
+    entries = forecast_archive._load_index(comid, root)
+    columns = ["issue_time"] + lead_columns() + ["source", "version"]
+    if not entries:
+        return pd.DataFrame(columns=columns)
+    path = forecast_archive.archive_dir(comid, root) / TABLE_FILE
+    versions = _source_versions(comid, entries, root)
+    cached = pd.read_parquet(path) if path.exists() else pd.DataFrame(columns=columns)
+    if not set(columns) <= set(cached.columns):
+        # Tabla con otro esquema de columnas (versión anterior): se recalcula completa
+        cached = pd.DataFrame(columns=columns)
+    current = cached["source"].map(versions) == cached["version"]
+    cached = cached[current.to_numpy(dtype=bool)]
+    known = set(cached["issue_time"])
+
+    pending = {}
+    for key, filename, rg in entries:
+        if pd.Timestamp(key) not in known:
+            pending.setdefault(filename, []).append(rg)
+    if not pending:
+        return cached.reset_index(drop=True)
+
+    parts = [cached]
+    for filename, groups in pending.items():
+        pf = pq.ParquetFile(forecast_archive.archive_dir(comid, root) / filename)
+        long = pf.read_row_groups(groups, columns=["issue_time", "valid_time", "stat", "value"]).to_pandas()
+        table = summarize_issues(long).reset_index()
+        table["source"] = filename
+        table["version"] = versions[filename]
+        parts.append(table)
+    table = pd.concat([p for p in parts if len(p)], ignore_index=True)
+    table = table.drop_duplicates("issue_time", keep="last").sort_values("issue_time").reset_index(drop=True)
+    table.to_parquet(path, index=False)
+    print(f"Tabla de pronósticos COMID {comid}: {sum(map(len, pending.values()))} emisiones nuevas, "
+          f"{len(table)} en total")
+    return table
+
+
+def join_forecast(times, table, horizons=HORIZONS, aggs=AGGS, latency=LATENCY):
+    """Cruce as-of: para cada día, la última emisión con issue_time <= día - latency
+
+    Devuelve (matriz float32, columnas). La columna fc_<agg>_h<k> es el pronóstico de ese agregado
+    para el día + k - 1 según la emisión elegida (NaN si cae fuera de su horizonte o no hay emisión).
+    """
+    times = np.asarray(times, dtype="datetime64[ns]")
+    names = feature_columns(horizons, aggs)
+    out = np.full((len(times), len(names)), np.nan, dtype="float32")
+    if len(table) == 0:
+        return out, names
+    issues = table["issue_time"].to_numpy(dtype="datetime64[ns]")
+    cutoff = times - np.timedelta64(pd.Timedelta(latency).value, "ns")
+    pos = np.searchsorted(issues, cutoff, side="right") - 1
+    has = pos >= 0
+    rows = np.flatnonzero(has)
+    pos = pos[has]
+    # Día de anticipación que corresponde al día de la fila en la emisión elegida
+    age = (times[has].astype("datetime64[D]") - issues[pos].astype("datetime64[D]")).astype("int64")
+    out[rows, -1] = age
+
+    values = table[lead_columns()].to_numpy(dtype="float32").reshape(len(table), LEADS, len(AGGS))
+    agg_idx = [AGGS.index(agg) for agg in aggs]
+    for hi, k in enumerate(horizons):
+        lead = age + k
+        inside = lead <= LEADS
+        block = values[pos[inside], lead[inside] - 1][:, agg_idx]
+        out[rows[inside], hi * len(aggs):(hi + 1) * len(aggs)] = block
+    return out, names
+
+
+def add_forecast_features(df, comid, root=None, horizons=HORIZONS, aggs=AGGS, latency=LATENCY):
+    """Agrega al frame (time, ...) las features del pronóstico mediante el cruce as-of"""
+    table = forecast_table(comid, root)
+    matrix, names = join_forecast(df["time"].to_numpy(), table, horizons, aggs, latency)
+    features = pd.DataFrame(matrix, columns=names, index=df.index)
+    covered = int((~np.isnan(matrix[:, 0])).sum())
+    print(f"Features de pronóstico: {len(table)} emisiones, {covered}/{len(df)} filas con pronóstico")
+    return pd.concat([df, features], axis=1)
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["620883808"]:
+        print(forecast_table(int(arg)).tail())
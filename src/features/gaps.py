@@ -0,0 +1,174 @@
+# src/features/gaps.py
+# Etapa de manejo de huecos previa a create_features
+# Lleva cada serie a un índice diario regular y detecta las rachas de faltantes en una sola pasada vectorizada:
+# los huecos cortos se interpolan, los largos quedan como NaN (enmascarados) para que lags y ventanas
+# móviles no mezclen días que no son consecutivos
+
+import numpy as np
+import pandas as pd
+
+MAX_FILL = 3
+FILL_METHODS = ("linear", "time", "ffill", "nearest")
+
+
+def _neighbors(valid):
+    """Índice del último dato válido anterior y del siguiente para cada celda (T x N)"""
+    length = valid.shape[0]
+    idx = np.arange(length)[:, None]
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, idx, length)[::-1], axis=0)[::-1]
+    return prev, nxt
+
+
+def fill_matrix(values, max_gap=MAX_FILL, method="linear"):
+    """Rellena huecos internos de hasta max_gap pasos en cada columna de una matriz (T x N)
+
+    Devuelve (valores, rellenados, enmascarados). Los NaN anteriores al primer dato o posteriores
+    al último de cada columna no se consideran huecos y se dejan intactos.
+    """
+    values = np.asarray(values, dtype="float64")
+    if values.ndim == 1:
+        out, filled, masked = fill_matrix(values[:, None], max_gap, method)
+        return out[:, 0], filled[:, 0], masked[:, 0]
+
+    valid = ~np.isnan(values)
+    prev, nxt = _neighbors(valid)
+    length = values.shape[0]
+    inside = ~valid & (prev >= 0) & (nxt < length)
+    filled = inside & (nxt - prev - 1 <= max_gap)
+    masked = inside & ~filled
+
+    out = values.copy(order="K")
+    rows, cols = np.nonzero(filled)
+    if method not in ("linear", "time", "ffill", "nearest"):
+        # Métodos de pandas (spline, pchip, ...): se calculan por columna y se aplica la misma máscara
+        estimate = pd.DataFrame(values).interpolate(method=method, limit_area="inside").to_numpy()
+        out[rows, cols] = estimate[rows, cols]
+        return out, filled, masked
+
+    # Solo se evalúan las celdas a rellenar (pocas frente a T x N)
+    lo, hi = prev[rows, cols], nxt[rows, cols]
+    before, after = values[lo, cols], values[hi, cols]
+    if method == "ffill":
+        estimate = before
+    elif method == "nearest":
+        estimate = np.where(rows - lo <= hi - rows, before, after)
+    else:
+        # En un índice regular la interpolación por tiempo equivale a la lineal
+        estimate = before + (after - before) * (rows - lo) / (hi - lo)
+    out[rows, cols] = estimate
+    return out, filled, masked
+
+
+def gap_runs(missing, max_gap=MAX_FILL):
+    """Rachas de celdas faltantes por columna (T x N): columna, fila inicial, longitud y acción"""
+    missing = np.asarray(missing, dtype=bool)
+    if missing.ndim == 1:
+        missing = missing[:, None]
+    padded = np.zeros((missing.shape[0] + 2, missing.shape[1]), dtype=np.int8)
+    padded[1:-1] = missing
+    edges = np.diff(padded, axis=0).T
+    # nonzero sobre (N x T) recorre columna por columna: inicios y fines quedan emparejados
+    column, start = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+    length = end - start
+    return pd.DataFrame({
+        "column": column,
+        "start": start,
+        "length": length,
+        "action": np.where(length <= max_gap, "filled", "masked"),
+    })
+
+
+def _times(column):
+    """Columna de tiempos como datetime64[ns] sin reparsear si ya es fecha"""
+    if not pd.api.types.is_datetime64_any_dtype(column):
+        column = pd.to_datetime(column)
+    return column.to_numpy(dtype="datetime64[ns]")
+
+
+def _step_ns(freq):
+    """Paso de la malla ("D", "1h") en nanosegundos"""
+    grid = pd.date_range("2000-01-01", periods=2, freq=freq)
+    return int((grid[1] - grid[0]).value)
+
+
+def _report(runs, filled, masked):
+    return {
+        "gaps": int(len(runs)),
+        "filled_steps": int(filled.sum()),
+        "masked_steps": int(masked.sum()),
+        "longest_gap": int(runs["length"].max()) if len(runs) else 0,
+        "runs": runs,
+    }
+
+
+def fill_gaps(df, max_gap=MAX_FILL, method="linear", freq="D", value_col="caudal"):
+    """Etapa de huecos para un COMID: malla regular, interpolación de huecos cortos y máscara de largos
+
+    Devuelve (df, reporte). Los huecos largos quedan como NaN: create_features descarta solo las filas
+    cuyo lag o ventana cae dentro del hueco, en lugar de calcular lags sobre días no consecutivos.
+    """
+    panel = pd.DataFrame({"comid": 0, "time": df["time"], value_col: df[value_col]})
+    out, report = fill_gaps_panel(panel, max_gap, method, freq, value_col)
+    report["runs"] = report["runs"].drop(columns="comid")
+    return out.drop(columns="comid"), report
+
+
+def long_to_matrix(df, freq="D", value_col="caudal", comid_col="comid"):
+    """Formato largo (comid, time, valor) -> (malla, comids, matriz tiempo x COMID con NaN donde falta)
+
+    La matriz se arma por dispersión directa en orden Fortran (cada COMID contiguo en memoria);
+    con claves repetidas gana la última lectura.
+    """
+    codes, comids = pd.factorize(df[comid_col], sort=True)
+    times = _times(df["time"]).view("int64")
+    step = _step_ns(freq)
+    origin = times.min()
+    rows = (times - origin) // step
+    length = int(rows.max()) + 1
+    grid = pd.date_range(pd.Timestamp(origin), periods=length, freq=freq)
+
+    keys = codes * length + rows
+    order = np.arange(len(keys))
+    if np.bincount(keys, minlength=length * len(comids)).max() > 1:
+        _, last = np.unique(keys[::-1], return_index=True)
+        order = len(keys) - 1 - last
+    raw = np.full((len(comids), length), np.nan).T
+    raw[rows[order], codes[order]] = df[value_col].to_numpy(dtype="float64")[order]
+    return grid, np.asarray(comids), raw
+
+
+def fill_gaps_panel(df, max_gap=MAX_FILL, method="linear", freq="D", value_col="caudal", comid_col="comid"):
+    """Etapa de huecos para muchos COMID a la vez (formato largo comid, time, valor)
+
+    Pivota a una matriz (tiempo x COMID) sobre una malla común y resuelve todas las series en una sola
+    pasada vectorizada; fuera del rango propio de cada COMID no se generan filas.
+    """
+    grid, comids, raw = long_to_matrix(df, freq, value_col, comid_col)
+    length = len(grid)
+    values, filled, masked = fill_matrix(raw, max_gap, method)
+
+    valid = ~np.isnan(raw)
+    first = valid.argmax(axis=0)
+    last = length - 1 - valid[::-1].argmax(axis=0)
+    # Filas de salida: solo el rango propio de cada COMID (del primer al último dato)
+    steps = np.arange(length)
+    in_span = (steps >= first[:, None]) & (steps <= last[:, None])
+    column, row = np.nonzero(in_span)
+    out = pd.DataFrame({
+        comid_col: comids[column],
+        "time": grid.to_numpy()[row],
+        value_col: values.T[in_span],
+    })
+
+    runs = gap_runs(filled | masked, max_gap)
+    runs.insert(0, comid_col, comids[runs.pop("column").to_numpy()])
+    runs["start"] = grid.to_numpy()[runs["start"].to_numpy()]
+    return out, _report(runs, filled, masked)
+
+
+def print_report(report, label="Huecos"):
+    """Resumen de la etapa de huecos"""
+    print(f"{label}: {report['gaps']} rachas, {report['filled_steps']} pasos interpolados, "
+          f"{report['masked_steps']} pasos enmascarados (máx. {report['longest_gap']})")
@@ -0,0 +1,69 @@
+# src/features/horizons.py
+# Objetivos de pronóstico directo multi-horizonte: para la fila del día t el objetivo <target>_h<k> es el
+# caudal del día t + k. Las medias/desvíos móviles del plan incluyen el día t, así que el día t ya es un dato
+# de la fila y el primer día a pronosticar es t + 1 (un objetivo en t quedaría en buena parte en las features).
+# Todos los horizontes se construyen de una vez con una búsqueda por fecha (no por posición de fila), así
+# los días descartados por create_features o los huecos no desplazan los objetivos
+
+import numpy as np
+import pandas as pd
+
+from src.features.forecast import HORIZONS
+
+DAY = np.timedelta64(1, "D")
+
+
+def horizon_columns(target="caudal", horizons=HORIZONS):
+    return [f"{target}_h{k}" for k in horizons]
+
+
+def horizon_targets(times, source_times, source_values, horizons=HORIZONS):
+    """Matriz (n, horizontes) con el valor de la serie fuente en el día t + k (NaN si no existe)"""
+    times = np.asarray(times, dtype="datetime64[ns]")
+    source_times = np.asarray(source_times, dtype="datetime64[ns]")
+    source_values = np.asarray(source_values, dtype="float64")
+    out = np.full((len(times), len(horizons)), np.nan)
+    for j, k in enumerate(horizons):
+        wanted = times + k * DAY
+        pos = np.minimum(np.searchsorted(source_times, wanted), len(source_times) - 1)
+        found = source_times[pos] == wanted
+        out[found, j] = source_values[pos[found]]
+    return out
+
+
+def add_horizon_targets(df, source=None, target="caudal", horizons=HORIZONS):
+    """Agrega las columnas objetivo <target>_h<k> y descarta las filas sin todos los horizontes
+
+    source: serie diaria (time, target) de la que se toman los valores futuros (por defecto el mismo frame);
+    conviene pasar la serie completa, ya que create_features descarta días que sí tienen caudal observado.
+    """
+    source = df if source is None else source.sort_values("time")
+    matrix = horizon_targets(df["time"].to_numpy(), source["time"].to_numpy(), source[target].to_numpy(),
+                             horizons)
+    targets = pd.DataFrame(matrix, columns=horizon_columns(target, horizons), index=df.index)
+    keep = ~np.isnan(matrix).any(axis=1)
+    print(f"Objetivos multi-horizonte (h{horizons[0]}-h{horizons[-1]}): {int(keep.sum())}/{len(df)} filas "
+          f"con todos los horizontes")
+    return pd.concat([df, targets], axis=1)[keep].reset_index(drop=True)
+
+
+def horizon_frame(times, y_pred, horizons=HORIZONS, y_true=None, target="caudal"):
+    """Formato largo (time de la fila de features, horizonte, fecha objetivo time + h, predicción[, real])"""
+    times = np.asarray(times, dtype="datetime64[ns]")
+    y_pred = np.asarray(y_pred)
+    horizons = np.asarray(horizons)
+    frame = pd.DataFrame({
+        "time": np.repeat(times, len(horizons)),
+        "horizon": np.tile(horizons, len(times)),
+        "target_time": (times[:, None] + horizons[None, :] * DAY).ravel(),
+    })
+    if y_true is not None:
+        frame[target] = np.asarray(y_true).ravel()
+    frame[f"{target}_pred"] = y_pred.ravel()
+    return frame
+
+
+def embargo_rows(times, test_start, horizons=HORIZONS):
+    """Cantidad de filas iniciales de entrenamiento cuyo último objetivo (día t + max(k)) precede a la prueba"""
+    cutoff = np.datetime64(test_start, "ns") - max(horizons) * DAY
+    return int(np.searchsorted(np.asarray(times, dtype="datetime64[ns]"), cutoff, side="left"))
@@ -0,0 +1,227 @@
+# src/features/online.py
+# Estado incremental de lags y ventanas móviles por COMID: actualización O(1) por día nuevo
+# Cada COMID guarda un buffer circular con los últimos valores y, por ventana, media y M2 (Welford deslizante)
+# La salida reproduce numéricamente las columnas de create_features para las filas nuevas
+
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+
+STATE_PATH = Path("data/features/online_state.json")
+LAGS = (1, 2, 3, 7, 15, 30)
+WINDOWS = (3, 7, 15, 30)
+STEP = pd.Timedelta(days=1)
+# Cada cuántas actualizaciones se recalculan media/M2 desde el buffer para acotar el error acumulado
+RESYNC_EVERY = 1000
+
+
+def calendar_features(time):
+    """Features temporales y cíclicas de create_features para un día"""
+    time = pd.Timestamp(time)
+    return {
+        "year": time.year,
+        "month": time.month,
+        "day": time.day,
+        "dayofyear": time.dayofyear,
+        "quarter": time.quarter,
+        "month_sin": math.sin(2 * math.pi * time.month / 12),
+        "month_cos": math.cos(2 * math.pi * time.month / 12),
+        "day_sin": math.sin(2 * math.pi * time.dayofyear / 365),
+        "day_cos": math.cos(2 * math.pi * time.dayofyear / 365),
+    }
+
+
+class OnlineFeatureState:
+    """Estado de un COMID: buffer circular + media/M2 por ventana sobre la racha de días consecutivos"""
+
+    def __init__(self, lags=LAGS, windows=WINDOWS):
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        # lag_k necesita el valor de t-k: se guardan max(lag)+1 valores
+        self.size = max(max(self.lags) + 1, max(self.windows))
+        self.reset()
+        self.last_time = None
+
+    def reset(self):
+        """Vacía el estado (tras un NaN o un salto en el índice, como el dropna de create_features)"""
+        self.buffer = [0.0] * self.size
+        self.pos = 0
+        self.count = 0
+        self.updates = 0
+        self.mean = {w: 0.0 for w in self.windows}
+        self.m2 = {w: 0.0 for w in self.windows}
+
+    def _value(self, back):
+        """Valor de hace `back` pasos (0 = el más reciente)"""
+        return self.buffer[(self.pos - 1 - back) % self.size]
+
+    def _resync(self):
+        for w in self.windows:
+            n = min(self.count, w)
+            values = [self._value(i) for i in range(n)]
+            mean = sum(values) / n
+            self.mean[w] = mean
+            self.m2[w] = sum((v - mean) ** 2 for v in values)
+
+    def _push(self, value):
+        for w in self.windows:
+            mean = self.mean[w]
+            if self.count < w:
+                # Ventana aún creciendo: Welford clásico
+                n = self.count + 1
+                delta = value - mean
+                new_mean = mean + delta / n
+                self.m2[w] += delta * (value - new_mean)
+            else:
+                # Ventana llena: entra value, sale el valor de hace w pasos
+                old = self._value(w - 1)
+                new_mean = mean + (value - old) / w
+                self.m2[w] += (value - old) * (value - new_mean + old - mean)
+            self.mean[w] = new_mean
+        self.buffer[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count += 1
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self._resync()
+
+    def update(self, time, value):
+        """Incorpora la observación del día; devuelve la fila de features o None si aún no es válida"""
+        time = pd.Timestamp(time)
+        if self.last_time is not None:
+            if time <= self.last_time:
+                raise ValueError(f"Observación fuera de orden: {time} <= {self.last_time}")
+            if time - self.last_time != STEP:
+                self.reset()
+        self.last_time = time
+        if value is None or math.isnan(value):
+            self.reset()
+            return None
+
+        value = float(value)
+        self._push(value)
+        if self.count < self.size:
+            return None
+
+        row = {"time": time, "caudal": value}
+        row.update(calendar_features(time))
+        for lag in self.lags:
+            row[f"caudal_lag_{lag}"] = self._value(lag)
+        for w in self.windows:
+            row[f"caudal_rolling_mean_{w}"] = self.mean[w]
+            row[f"caudal_rolling_std_{w}"] = math.sqrt(max(self.m2[w], 0.0) / (w - 1))
+        return row
+
+    def to_dict(self):
+        return {
+            "lags": list(self.lags),
+            "windows": list(self.windows),
+            "buffer": self.buffer,
+            "pos": self.pos,
+            "count": self.count,
+            "updates": self.updates,
+            "mean": {str(w): v for w, v in self.mean.items()},
+            "m2": {str(w): v for w, v in self.m2.items()},
+            "last_time": self.last_time.isoformat() if self.last_time is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["lags"], data["windows"])
+        state.buffer = [float(v) for v in data["buffer"]]
+        state.pos = data["pos"]
+        state.count = data["count"]
+        state.updates = data["updates"]
+        state.mean = {int(w): v for w, v in data["mean"].items()}
+        state.m2 = {int(w): v for w, v in data["m2"].items()}
+        state.last_time = pd.Timestamp(data["last_time"]) if data["last_time"] else None
+        return state
+
+
+class OnlineFeatureEngine:
+    """Estados por COMID persistidos en JSON; procesa solo las observaciones posteriores al último día visto"""
+
+    def __init__(self, path=None, lags=LAGS, windows=WINDOWS):
+        self.path = Path(path or STATE_PATH)
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.states = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.states = {int(c): OnlineFeatureState.from_dict(s) for c, s in data.items()}
+
+    def state(self, comid):
+        if comid not in self.states:
+            self.states[comid] = OnlineFeatureState(self.lags, self.windows)
+        return self.states[comid]
+
+    def last_time(self, comid):
+        return self.states[comid].last_time if comid in self.states else None
+
+    def update(self, comid, time, value):
+        return self.state(comid).update(time, value)
+
+    def update_frame(self, comid, df, warm_start=False):
+        """Aplica las filas (time, caudal) nuevas; devuelve las filas de features emitidas
+
+        Con warm_start solo se alimentan los últimos días necesarios para llenar el buffer
+        (arranque sin recorrer toda la historia).
+        """
+        state = self.state(comid)
+        if state.last_time is not None:
+            df = df[df["time"] > state.last_time]
+        elif warm_start:
+            df = df.tail(state.size)
+        rows = []
+        for time, value in zip(df["time"], df["caudal"].to_numpy(dtype="float64")):
+            row = state.update(time, value)
+            if row is not None:
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def save(self):
+        """Persiste todos los estados de forma atómica"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({str(c): s.to_dict() for c, s in self.states.items()}, f)
+        os.replace(tmp_path, self.path)
+
+
+def update_from_store(comids, path=None, root=None):
+    """Actualización diaria: lee del almacén solo los días posteriores al estado guardado"""
+    engine = OnlineFeatureEngine(path)
+    frames = {}
+    for comid in comids:
+        last = engine.last_time(comid)
+        if last is None:
+            # Arranque: basta con los últimos días que llenan el buffer
+            tail = raw_store.last_time(comid, root=root)
+            if tail is None:
+                # Sin serie en el almacén: el estado queda como estaba y no se emiten filas
+                print(f"COMID {comid}: sin datos en el almacén")
+                frames[comid] = pd.DataFrame()
+                continue
+            start = tail - (engine.state(comid).size - 1) * STEP
+        else:
+            start = last + STEP
+        df = raw_store.read_series(comid, start=start, root=root)
+        frames[comid] = engine.update_frame(comid, df, warm_start=last is None)
+        print(f"COMID {comid}: {len(df)} días nuevos, {len(frames[comid])} filas de features")
+    engine.save()
+    return frames
+
+
+if __name__ == "__main__":
+    update_from_store([int(arg) for arg in sys.argv[1:]] or [620883808])
@@ -0,0 +1,78 @@
+# src/features/panel.py
+# Motor de features en panel para muchos tramos (COMID) a la vez
+# Trabaja sobre una matriz tiempo x tramo: el calendario se calcula una sola vez y se difunde a todos
+# los tramos, y lags/ventanas salen del mismo plan compilado (src/features/spec.py) operando por columnas
+# El resultado es un FeatureDataset float32 ordenado por tiempo (las divisiones temporales siguen siendo vistas)
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store
+from src.features.dataset import FEATURE_DTYPE, FeatureDataset
+from src.features.gaps import MAX_FILL, fill_matrix, long_to_matrix
+from src.features.spec import compile_spec
+
+
+def build_panel_dataset(times, values, comids, spec=None):
+    """Features de todos los tramos desde una matriz (tiempo x tramo) en formato largo compacto
+
+    Solo se materializan las celdas completas (equivalente al dropna de create_features por tramo);
+    cada columna se escribe directamente en la matriz float32 final, sin tablas intermedias por tramo.
+    """
+    plan = compile_spec(spec)
+    values = np.ascontiguousarray(values, dtype="float64")
+    valid = plan.valid_mask(values)
+    counts = valid.sum(axis=1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    # Orden Fortran: cada feature es una columna contigua y se escribe secuencialmente
+    X = np.empty((int(offsets[-1]), len(plan.columns)), dtype=FEATURE_DTYPE, order="F")
+    # Desde `lead` todas las filas están completas (caso habitual tras el calentamiento inicial)
+    incomplete = np.flatnonzero(~valid.all(axis=1))
+    lead = int(incomplete[-1]) + 1 if len(incomplete) else 0
+
+    def write(j, start, stop, block):
+        split = min(max(start, lead), stop)
+        head, tail = block[:split - start], block[split - start:]
+        if split > start:
+            if block.ndim == 1:
+                # Calendario: un valor por día difundido a los tramos válidos de ese día
+                X[offsets[start]:offsets[split], j] = np.repeat(head, counts[start:split])
+            else:
+                X[offsets[start]:offsets[split], j] = head[valid[start:split]]
+        if stop > split:
+            # Rango completo: copia directa sin máscara (el calendario se repite por tramo)
+            X[offsets[split]:offsets[stop], j] = (np.repeat(tail, values.shape[1]) if block.ndim == 1
+                                                  else tail.reshape(-1))
+
+    plan.emit(times, values, write)
+    y = values[valid]
+    time = np.repeat(np.asarray(times, dtype="datetime64[ns]"), counts)
+    comid = np.broadcast_to(np.asarray(comids), values.shape)[valid]
+    return FeatureDataset(X, y, time, plan.columns, comid, plan.target)
+
+
+def panel_from_long(df, spec=None, fill=True, max_gap=MAX_FILL, method="linear", freq="D",
+                    value_col="caudal", comid_col="comid"):
+    """Panel desde formato largo (comid, time, valor): malla común, relleno de huecos cortos y features"""
+    grid, comids, raw = long_to_matrix(df, freq, value_col, comid_col)
+    if fill:
+        raw = fill_matrix(raw, max_gap, method)[0]
+    return build_panel_dataset(grid.to_numpy(), raw, comids, spec)
+
+
+def load_panel(comids=None, start=None, end=None, root=None):
+    """Series retrospectivas de varios COMID desde el almacén (formato largo comid, time, caudal)"""
+    df = raw_store.read_many(comids, start=start, end=end, root=root)
+    print(f"Panel cargado: {df['comid'].nunique()} tramos, {len(df)} registros")
+    return df
+
+
+if __name__ == "__main__":
+    dataset = panel_from_long(load_panel([int(arg) for arg in sys.argv[1:]] or None))
+    print(dataset.memory_report("Panel"))
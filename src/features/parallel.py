@@ -0,0 +1,165 @@
+# src/features/parallel.py
+# Cálculo de features en panel con un pool de procesos sobre memoria compartida
+# La matriz de caudales (tiempo x tramo) y la máscara de celdas válidas se publican una sola vez en
+# multiprocessing.shared_memory; cada proceso calcula un bloque de tramos y escribe sus columnas
+# directamente en la matriz de salida compartida, ya preasignada en el orden final (por tiempo)
+
+import math
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.features.dataset import FEATURE_DTYPE, FeatureDataset
+from src.features.panel import build_panel_dataset
+from src.features.spec import compile_spec
+
+# Estado de cada proceso del pool: arreglos adjuntos a la memoria compartida y plan compilado
+_WORKER = {}
+
+
+def share_array(array, order="C"):
+    """Copia un arreglo a un bloque de memoria compartida; devuelve (bloque, vista, descriptor)"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, order=order)
+    view[...] = array
+    return shm, view, (shm.name, array.shape, array.dtype.str, order)
+
+
+def allocate_array(shape, dtype, order="C"):
+    """Bloque compartido sin inicializar"""
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order=order)
+    return shm, view, (shm.name, shape, dtype.str, order)
+
+
+def attach_array(descriptor):
+    """Adjunta un bloque compartido existente a partir de su descriptor; devuelve (bloque, vista)"""
+    name, shape, dtype, order = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, order=order)
+
+
+def _init_worker(layout, spec):
+    """Inicializador del pool: adjunta los bloques compartidos una vez por proceso"""
+    for key, descriptor in layout.items():
+        _WORKER[key] = attach_array(descriptor)
+    _WORKER["plan"] = compile_spec(spec)
+
+
+def _compute_block(c0, c1, base, lead):
+    """Features de los tramos [c0, c1): escribe en la matriz compartida en las filas de esas celdas
+
+    base[t] es la fila de salida de la primera celda válida del tramo c0 en el día t; desde `lead`
+    todos los días están completos y las filas del bloque forman una vista 2-D con paso fijo.
+    """
+    plan = _WORKER["plan"]
+    times = _WORKER["times"][1]
+    offsets = _WORKER["offsets"][1]
+    values = _WORKER["values"][1][:, c0:c1]
+    valid = _WORKER["valid"][1][:lead, c0:c1]
+    X = _WORKER["X"][1]
+    n_reaches = _WORKER["values"][1].shape[1]
+
+    counts = valid.sum(axis=1)
+    local = np.concatenate(([0], np.cumsum(counts)))
+    # Fila destino de cada celda válida anterior a `lead`, en orden tiempo-tramo
+    rows = (base[:, None] + np.cumsum(valid, axis=1) - 1)[valid]
+
+    def write(j, start, stop, block):
+        split = min(max(start, lead), stop)
+        head, tail = block[:split - start], block[split - start:]
+        if split > start:
+            target = rows[local[start]:local[split]]
+            if block.ndim == 1:
+                X[target, j] = np.repeat(head, counts[start:split])
+            else:
+                X[target, j] = head[valid[start:split]]
+        if stop > split:
+            dest = X[offsets[split]:offsets[stop], j].reshape(-1, n_reaches)[:, c0:c1]
+            dest[...] = tail[:, None] if block.ndim == 1 else tail
+
+    plan.emit(times, values, write)
+    full = len(values) - lead
+    return int(local[-1]) + full * (c1 - c0)
+
+
+def _release(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+def build_panel_parallel(times, values, comids, spec=None, workers=None, block_reaches=None):
+    """Versión multiproceso de build_panel_dataset con entradas y salida en memoria compartida
+
+    La matriz X del dataset vive en un bloque compartido que se libera cuando X deja de usarse.
+    """
+    workers = workers or os.cpu_count() or 1
+    plan = compile_spec(spec)
+    values = np.ascontiguousarray(values, dtype="float64")
+    times = np.asarray(times, dtype="datetime64[ns]")
+    valid = plan.valid_mask(values)
+    counts = valid.sum(axis=1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    incomplete = np.flatnonzero(~valid.all(axis=1))
+    lead = int(incomplete[-1]) + 1 if len(incomplete) else 0
+    n_reaches = values.shape[1]
+    block_reaches = block_reaches or max(1, math.ceil(n_reaches / (workers * 4)))
+
+    blocks = []
+    owned = []
+    try:
+        for key, array in (("times", times), ("offsets", offsets), ("values", values), ("valid", valid)):
+            shm, _, descriptor = share_array(array)
+            owned.append(shm)
+            blocks.append((key, descriptor))
+        x_shm, X, x_descriptor = allocate_array((int(offsets[-1]), len(plan.columns)), FEATURE_DTYPE, order="F")
+        try:
+            blocks.append(("X", x_descriptor))
+            layout = dict(blocks)
+
+            # Fila inicial de cada bloque de tramos por día hasta `lead`: offset del día + celdas válidas
+            # de los tramos anteriores (desde `lead` la posición se deduce del número de tramos)
+            tasks = []
+            before = offsets[:lead].copy()
+            for c0 in range(0, n_reaches, block_reaches):
+                c1 = min(c0 + block_reaches, n_reaches)
+                tasks.append((c0, c1, before.copy(), lead))
+                before += valid[:lead, c0:c1].sum(axis=1)
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(layout, spec)) as pool:
+                written = sum(pool.map(_compute_block, *zip(*tasks)))
+            if written != len(X):
+                raise RuntimeError(f"Filas escritas {written} != esperadas {len(X)}")
+        except BaseException:
+            # Sin dataset que lo use: el bloque de salida se libera junto con los de entrada
+            del X
+            _release(x_shm)
+            x_shm.unlink()
+            raise
+    finally:
+        for shm in owned:
+            shm.close()
+            shm.unlink()
+
+    # El nombre se libera ya; el mapeo sigue vivo mientras exista X (o una vista de X)
+    x_shm.unlink()
+    weakref.finalize(X, _release, x_shm).atexit = False
+
+    y = values[valid]
+    time = np.repeat(times, counts)
+    comid = np.broadcast_to(np.asarray(comids), values.shape)[valid]
+    return FeatureDataset(X, y, time, plan.columns, comid, plan.target)
+
+
+def build_panel(times, values, comids, spec=None, workers=1):
+    """Ruta serie (workers=1) o multiproceso según el número de procesos"""
+    if workers == 1:
+        return build_panel_dataset(times, values, comids, spec)
+    return build_panel_parallel(times, values, comids, spec, workers)
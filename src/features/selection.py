@@ -0,0 +1,75 @@
+# src/features/selection.py
+# Poda de features guiada por importancia: toma las importancias de una ejecución previa (CSV local o
+# artefacto de MLflow), elige top-k o el subconjunto que acumula una fracción de la importancia y devuelve
+# una especificación que solo calcula esas columnas (las features exógenas fc_ se filtran aparte)
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.features.spec import compile_spec
+
+IMPORTANCE_PATH = Path("data/processed/feature_importance.csv")
+MLFLOW_SCHEMES = ("runs:/", "models:/", "mlflow-artifacts:/")
+
+
+def load_importance(source=None):
+    """Importancias (feature, importance) ordenadas de mayor a menor
+
+    source: ruta a feature_importance.csv (por defecto la de la última ejecución) o URI de MLflow,
+    p. ej. runs:/<run_id>/feature_importance.csv (artefacto que registra run_with_mlflow.py).
+    """
+    source = str(source or IMPORTANCE_PATH)
+    if source.startswith(MLFLOW_SCHEMES):
+        # Import diferido: solo se necesita MLflow al leer artefactos
+        import mlflow
+        source = mlflow.artifacts.download_artifacts(artifact_uri=source)
+    importance = pd.read_csv(source)
+    return importance.sort_values("importance", ascending=False).reset_index(drop=True)
+
+
+def select_features(importance, top_k=None, cumulative=None):
+    """Las top_k features más importantes, o las mínimas cuya importancia acumulada alcanza `cumulative`"""
+    if (top_k is None) == (cumulative is None):
+        raise ValueError("Indique exactamente uno de top_k o cumulative")
+    importance = importance.sort_values("importance", ascending=False)
+    if top_k is not None:
+        if top_k < 1:
+            raise ValueError("top_k debe ser >= 1")
+        return importance["feature"].head(top_k).tolist()
+    if not 0 < cumulative <= 1:
+        raise ValueError("cumulative debe estar en (0, 1]")
+    share = (importance["importance"] / importance["importance"].sum()).cumsum().to_numpy()
+    count = int((share < cumulative - 1e-12).sum()) + 1
+    return importance["feature"].head(count).tolist()
+
+
+def prune_spec(features, spec=None):
+    """Especificación restringida a las features seleccionadas que genera el plan
+
+    Devuelve (spec, exógenas): las columnas que no salen del plan (p. ej. fc_*) se filtran tras calcularlas.
+    """
+    plan = compile_spec(spec)
+    planned = [name for name in features if name in plan.columns]
+    exogenous = [name for name in features if name not in plan.columns]
+    return dict(plan.spec, features=planned), exogenous
+
+
+def print_pruning_report(before, after):
+    """Tabla antes/después: tiempo de entrenamiento, tamaño del modelo, latencia y error"""
+    rows = [
+        ("Features", "n_features", "{:.0f}"),
+        ("Entrenamiento (s)", "train_s", "{:.2f}"),
+        ("Tamaño del modelo (MB)", "model_mb", "{:.1f}"),
+        ("Latencia (ms / 1000 filas)", "latency_ms", "{:.2f}"),
+        ("MAE (m³/s)", "mae", "{:.3f}"),
+        ("RMSE (m³/s)", "rmse", "{:.3f}"),
+    ]
+    print("Poda de features por importancia:")
+    print(f"  {'':<28} {'completo':>10} {'podado':>10} {'cambio':>10}")
+    for label, key, fmt in rows:
+        if key not in before or key not in after:
+            continue
+        a, b = before[key], after[key]
+        change = f"{(b - a) / a * 100:+.1f}%" if a else "-"
+        print(f"  {label:<28} {fmt.format(a):>10} {fmt.format(b):>10} {change:>10}")
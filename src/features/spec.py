@@ -0,0 +1,256 @@
+# src/features/spec.py
+# Especificación declarativa de features (lags, ventanas, agregaciones, codificaciones de calendario
+# y separación de flujo base)
+# compilada a un plan NumPy: todas las columnas se escriben en una única matriz preasignada,
+# las medias/sumas salen de sumas prefijas y el resto de estadísticos de sliding_window_view por bloques
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.features.baseflow import DEFAULT_BASEFLOW, baseflow_columns, baseflow_features, baseflow_windows
+
+DEFAULT_SPEC = {
+    "target": "caudal",
+    "calendar": ["year", "month", "day", "dayofyear", "quarter", "month_sin", "month_cos", "day_sin", "day_cos"],
+    "lags": [1, 2, 3, 7, 15, 30],
+    "windows": [3, 7, 15, 30],
+    "aggregations": ["mean", "std"],
+    # Familia de flujo base desactivada por defecto; True o un dict (ver DEFAULT_BASEFLOW) la activa
+    "baseflow": None,
+}
+
+# Cada codificación se calcula a partir de las componentes de fecha (ver calendar_parts)
+CALENDAR = {
+    "year": lambda t: t["year"],
+    "month": lambda t: t["month"],
+    "day": lambda t: t["day"],
+    "dayofyear": lambda t: t["dayofyear"],
+    "quarter": lambda t: (t["month"] - 1) // 3 + 1,
+    "month_sin": lambda t: np.sin(2 * np.pi * t["month"] / 12),
+    "month_cos": lambda t: np.cos(2 * np.pi * t["month"] / 12),
+    "day_sin": lambda t: np.sin(2 * np.pi * t["dayofyear"] / 365),
+    "day_cos": lambda t: np.cos(2 * np.pi * t["dayofyear"] / 365),
+}
+AGGREGATIONS = ("mean", "sum", "std", "min", "max")
+# Filas por bloque: acota la magnitud de las sumas prefijas (precisión) y la memoria temporal
+CHUNK_ROWS = 1 << 13
+
+
+def calendar_parts(times):
+    """Año, mes, día y día del año con aritmética de datetime64 (sin accesores de pandas)"""
+    days = np.asarray(times).astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    years = months.astype("datetime64[Y]")
+    return {
+        "year": years.astype("int64") + 1970,
+        "month": (months - years).astype("int64") + 1,
+        "day": (days - months).astype("int64") + 1,
+        "dayofyear": (days - years).astype("int64") + 1,
+    }
+
+
+class FeaturePlan:
+    """Plan compilado: orden de columnas, calentamiento y cálculo vectorizado sobre arreglos contiguos"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.target = spec["target"]
+        calendar = list(spec.get("calendar", []))
+        lags = sorted(spec.get("lags", []))
+        windows = sorted(spec.get("windows", []))
+        aggregations = list(spec.get("aggregations", []))
+        # Selección opcional de columnas (poda por importancia): solo se calculan las listadas
+        selected = None if spec.get("features") is None else set(spec["features"])
+
+        def keep(name):
+            return selected is None or name in selected
+
+        self.calendar = [name for name in calendar if keep(name)]
+        self.lags = [lag for lag in lags if keep(f"{self.target}_lag_{lag}")]
+        self.rolling = [(w, agg) for w in windows for agg in aggregations
+                        if keep(f"{self.target}_rolling_{agg}_{w}")]
+        self.windows = sorted({w for w, _ in self.rolling})
+        used = {agg for _, agg in self.rolling}
+        self.aggregations = [agg for agg in aggregations if agg in used]
+        # Familia opcional de flujo base (Lyne–Hollick): True usa los parámetros por defecto
+        baseflow = spec.get("baseflow")
+        self.baseflow = None
+        self.baseflow_keep = []
+        if baseflow:
+            self.baseflow = dict(DEFAULT_BASEFLOW, **(baseflow if isinstance(baseflow, dict) else {}))
+            names = baseflow_columns(self.target, self.baseflow)
+            self.baseflow_keep = [i for i, name in enumerate(names) if keep(name)]
+        self.columns = (
+            self.calendar
+            + [f"{self.target}_lag_{lag}" for lag in self.lags]
+            + [f"{self.target}_rolling_{agg}_{w}" for w, agg in self.rolling]
+            + [baseflow_columns(self.target, self.baseflow)[i] for i in self.baseflow_keep]
+        )
+        # Ventanas de flujo base que deben estar completas (terminan en t-1: necesitan w días previos)
+        self.baseflow_windows = sorted({baseflow_windows(self.baseflow)[i] for i in self.baseflow_keep})
+        # Filas iniciales sin historia suficiente (lag_k necesita t-k; una ventana w necesita w-1 previos)
+        self.span = max([lag + 1 for lag in self.lags] + self.windows + [w + 1 for w in self.baseflow_windows]
+                        + [1])
+
+    def _calendar(self, times, write):
+        if not self.calendar:
+            return
+        parts = calendar_parts(times)
+        n = len(parts["year"])
+        for j, name in enumerate(self.calendar):
+            write(j, 0, n, CALENDAR[name](parts))
+
+    def _lags(self, values, write, offset):
+        for j, lag in enumerate(self.lags):
+            col = np.empty_like(values)
+            col[:lag] = np.nan
+            col[lag:] = values[:-lag]
+            write(offset + j, 0, len(values), col)
+
+    def _rolling(self, values, write, offset):
+        """Estadísticos por ventana a lo largo del eje 0 (serie 1-D o matriz tiempo x tramo)"""
+        if not self.windows:
+            return
+        n = len(values)
+        width = max(self.windows)
+        # Relleno inicial de width-1 NaN: las filas sin ventana completa quedan sin valor
+        padded = np.concatenate((np.full((width - 1,) + values.shape[1:], np.nan), values), axis=0)
+        zero = np.zeros((1,) + values.shape[1:])
+
+        for start in range(0, n, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, n)
+            chunk = padded[start:stop + width - 1]
+            missing = np.isnan(chunk)
+            clean = np.where(missing, 0.0, chunk)
+            # Sumas prefijas por bloque sobre valores centrados en la media del bloque (por tramo):
+            # media, suma y varianza de todas las ventanas en O(n) sin cancelación apreciable
+            center = clean.sum(axis=0) / np.maximum((~missing).sum(axis=0), 1)
+            shifted = np.where(missing, 0.0, chunk - center)
+            p0 = np.concatenate((zero, np.cumsum(missing, axis=0)), axis=0)
+            p1 = np.concatenate((zero, np.cumsum(shifted, axis=0)), axis=0)
+            p2 = np.concatenate((zero, np.cumsum(shifted * shifted, axis=0)), axis=0)
+            view = None
+
+            for w in self.windows:
+                lo, hi = width - w, len(chunk) + 1 - w
+                incomplete = (p0[width:] - p0[lo:hi]) > 0
+                s1 = p1[width:] - p1[lo:hi]
+                s2 = p2[width:] - p2[lo:hi]
+                for j, (size, agg) in enumerate(self.rolling):
+                    if size != w:
+                        continue
+                    if agg == "mean":
+                        result = center + s1 / w
+                    elif agg == "sum":
+                        result = center * w + s1
+                    elif agg == "std":
+                        result = np.sqrt(np.maximum(s2 - s1 * s1 / w, 0.0) / (w - 1))
+                    else:
+                        # min/max: una sola vista de ancho máximo; las ventanas menores son sus últimas columnas
+                        if view is None:
+                            view = sliding_window_view(chunk, width, axis=0)
+                        tail = view[..., width - w:]
+                        result = tail.min(axis=-1) if agg == "min" else tail.max(axis=-1)
+                    result[incomplete] = np.nan
+                    write(offset + j, start, stop, result)
+
+    def _baseflow(self, values, write, offset):
+        """Flujo base, BFI y recesión con el filtro lineal sobre toda la serie (o todos los tramos) a la vez"""
+        if not self.baseflow_keep:
+            return
+        columns = baseflow_features(values, self.baseflow)
+        for j, i in enumerate(self.baseflow_keep):
+            write(offset + j, 0, len(values), columns[i])
+
+    def emit(self, times, values, write):
+        """Calcula cada columna y la entrega a write(j, inicio, fin, bloque) por rangos del eje temporal
+
+        values puede ser una serie (n,) o una matriz tiempo x tramo (n, m); el calendario se entrega
+        una sola vez como arreglo 1-D (n,) para difundirlo sobre todos los tramos.
+        """
+        values = np.ascontiguousarray(values, dtype="float64")
+        self._calendar(times, write)
+        self._lags(values, write, len(self.calendar))
+        self._rolling(values, write, len(self.calendar) + len(self.lags))
+        self._baseflow(values, write, len(self.calendar) + len(self.lags) + len(self.rolling))
+
+    def compute(self, times, values):
+        """Matriz (n x columnas) float64 preasignada; NaN donde falta historia o hay datos faltantes
+
+        Se asigna en orden Fortran: cada columna es contigua (escrituras secuenciales) y coincide
+        con la disposición interna de un bloque de pandas, que la envuelve sin copiar.
+        """
+        out = np.empty((len(values), len(self.columns)), dtype="float64", order="F")
+
+        def write(j, start, stop, block):
+            out[start:stop, j] = block
+
+        self.emit(times, values, write)
+        return out
+
+    def valid_mask(self, values):
+        """Celdas con todas las features definidas (dropna) sin materializarlas; (n,) o (n, m)"""
+        missing = np.isnan(values)
+        valid = ~missing
+        for lag in self.lags:
+            valid[:lag] = False
+            valid[lag:] &= ~missing[:-lag]
+        if self.windows or self.baseflow_windows:
+            counts = np.concatenate((np.zeros((1,) + values.shape[1:], dtype=np.int32),
+                                     np.cumsum(missing, axis=0, dtype=np.int32)), axis=0)
+            for w in self.windows:
+                valid[:w - 1] = False
+                valid[w - 1:] &= (counts[w:] - counts[:-w]) == 0
+            # Flujo base: w días completos terminando en t-1
+            for w in self.baseflow_windows:
+                valid[:w] = False
+                valid[w:] &= (counts[w:-1] - counts[:-w - 1]) == 0
+        return valid
+
+    def valid_rows(self, values, matrix):
+        """Filas completas (equivalente a dropna sobre target + features)"""
+        return ~np.isnan(values) & ~np.isnan(matrix).any(axis=1)
+
+    def transform(self, df):
+        """DataFrame (time, target, features...) sin filas incompletas, como create_features"""
+        times = df["time"].to_numpy()
+        values = df[self.target].to_numpy(dtype="float64")
+        matrix = self.compute(times, values)
+        keep = self.valid_rows(values, matrix)
+        rows = np.flatnonzero(keep)
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            # Caso habitual (solo el calentamiento inicial incompleto): vista sin copia
+            matrix = matrix[rows[0]:rows[-1] + 1]
+        else:
+            matrix = matrix.T[:, keep].T
+        frame = pd.DataFrame(matrix, columns=self.columns, copy=False)
+        frame.insert(0, self.target, values[keep])
+        frame.insert(0, "time", times[keep])
+        return frame
+
+
+def compile_spec(spec=None):
+    """Valida la especificación y devuelve su plan"""
+    spec = dict(DEFAULT_SPEC, **(spec or {}))
+    unknown = [name for name in spec.get("calendar", []) if name not in CALENDAR]
+    if unknown:
+        raise ValueError(f"Codificaciones de calendario desconocidas: {unknown}")
+    unknown = [agg for agg in spec.get("aggregations", []) if agg not in AGGREGATIONS]
+    if unknown:
+        raise ValueError(f"Agregaciones desconocidas: {unknown}")
+    if any(lag < 1 for lag in spec.get("lags", [])) or any(w < 2 for w in spec.get("windows", [])):
+        raise ValueError("Los lags deben ser >= 1 y las ventanas >= 2")
+    baseflow = spec.get("baseflow")
+    if isinstance(baseflow, dict):
+        config = dict(DEFAULT_BASEFLOW, **baseflow)
+        if not 0 < config["alpha"] < 1 or config["passes"] < 1:
+            raise ValueError("Flujo base: alpha debe estar en (0, 1) y passes >= 1")
+        if any(w < 1 for w in config["bfi_windows"]) or any(k < 1 for k in config["recession"]):
+            raise ValueError("Flujo base: las ventanas de BFI y recesión deben ser >= 1")
+    plan = FeaturePlan(spec)
+    if spec.get("features") is not None:
+        unknown = sorted(set(spec["features"]) - set(plan.columns))
+        if unknown:
+            raise ValueError(f"Features seleccionadas que la especificación no genera: {unknown}")
+    return plan
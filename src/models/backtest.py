@@ -0,0 +1,237 @@
+# src/models/backtest.py
+# Backtesting walk-forward (ventana creciente o deslizante) sobre un FeatureDataset ordenado por tiempo
+# La matriz de features se publica una vez en memoria compartida de solo lectura; cada proceso del pool
+# entrena y evalúa pliegues sobre vistas de esa matriz (sin copias serializadas por pliegue)
+# El presupuesto de núcleos se reparte entre procesos (pliegues simultáneos) e hilos por modelo
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.features.parallel import attach_array, share_array
+from src.models import data_analysis
+from src.models.engines import DEFAULT_ENGINE, ENGINES
+
+MODES = ("expanding", "sliding")
+
+# Estado de cada proceso del pool: vistas de la memoria compartida y función de entrenamiento
+_WORKER = {}
+
+
+def walk_forward_folds(times, n_folds=5, test_fraction=0.3, mode="expanding", train_days=None, gap_days=0):
+    """Rangos de filas (train_inicio, train_fin, test_inicio, test_fin) de cada pliegue
+
+    El tramo final (test_fraction del período) se divide en n_folds ventanas de prueba consecutivas;
+    los cortes caen en cambios de día, así un mismo día (varios tramos) nunca queda a ambos lados.
+    mode="sliding" limita el entrenamiento a los train_days previos; gap_days deja un embargo
+    entre el fin del entrenamiento y el inicio de la prueba.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode} (use {MODES})")
+    if mode == "sliding" and not train_days:
+        raise ValueError("El modo sliding requiere train_days")
+    times = np.asarray(times, dtype="datetime64[ns]")
+    first, last = times[0], times[-1] + np.timedelta64(1, "D")
+    test_start = last - (last - first) * test_fraction
+    edges = [test_start + (last - test_start) * i / n_folds for i in range(n_folds + 1)]
+    cuts = np.searchsorted(times, np.array(edges, dtype="datetime64[ns]").astype("datetime64[D]"), side="left")
+    day = np.timedelta64(1, "D")
+
+    folds = []
+    for k in range(n_folds):
+        a, b = int(cuts[k]), int(cuts[k + 1])
+        if b <= a:
+            continue
+        train_end = int(np.searchsorted(times, times[a] - gap_days * day, side="left"))
+        train_start = 0
+        if mode == "sliding":
+            train_start = int(np.searchsorted(times, times[a] - (gap_days + train_days) * day, side="left"))
+        if train_end <= train_start:
+            raise ValueError(f"Pliegue {k + 1} sin datos de entrenamiento")
+        folds.append((train_start, train_end, a, b))
+    return folds
+
+
+def core_budget(cores=None, n_folds=1):
+    """(procesos, hilos por modelo) para un presupuesto de núcleos"""
+    cores = max(1, cores or os.cpu_count() or 1)
+    workers = max(1, min(n_folds, cores))
+    return workers, max(1, cores // workers)
+
+
+def _init_worker(layout, train_fn, n_jobs, feature_names):
+    for key, descriptor in layout.items():
+        # Se conserva el bloque junto a la vista: si se libera, el mapeo se cierra bajo la vista
+        _WORKER[f"{key}_shm"], _WORKER[key] = attach_array(descriptor)
+    _WORKER.update(train_fn=train_fn, n_jobs=n_jobs, feature_names=feature_names)
+
+
+def _run_fold(k, fold, params=None):
+    """Entrena y evalúa un pliegue sobre vistas de la matriz compartida"""
+    train_start, train_end, test_start, test_end = fold
+    X, y = _WORKER["X"], _WORKER["y"]
+    start = time.perf_counter()
+    model = _WORKER["train_fn"](X[train_start:train_end], y[train_start:train_end], n_jobs=_WORKER["n_jobs"],
+                                params=params, feature_names=_WORKER["feature_names"])
+    fit_s = time.perf_counter() - start
+    y_pred = model.predict(X[test_start:test_end])
+    y_test = y[test_start:test_end]
+    metrics = {
+        "fold": k + 1,
+        "n_train": train_end - train_start,
+        "n_test": test_end - test_start,
+        "mae": mean_absolute_error(y_test, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        "r2": r2_score(y_test, y_pred),
+        "fit_s": fit_s,
+    }
+    return metrics, y_pred
+
+
+class FoldPool:
+    """Procesos que comparten X e y de un dataset (solo lectura) y evalúan tareas (k, pliegue, params)
+
+    Con un solo proceso las tareas corren en el proceso actual sobre las matrices originales.
+    """
+
+    def __init__(self, dataset, workers=1, n_jobs=1, train_fn=None):
+        self.dataset = dataset
+        self.workers = workers
+        self.n_jobs = n_jobs
+        self.train_fn = train_fn or data_analysis.train_model
+        self.pool = None
+        self.owned = []
+
+    def __enter__(self):
+        if self.workers == 1:
+            _WORKER.update(X=self.dataset.X, y=self.dataset.y, train_fn=self.train_fn, n_jobs=self.n_jobs,
+                           feature_names=self.dataset.feature_names)
+            return self
+        try:
+            layout = {}
+            X = self.dataset.X
+            for key, array, order in (("X", X, "F" if X.flags.f_contiguous else "C"), ("y", self.dataset.y, "C")):
+                shm, _, descriptor = share_array(array, order)
+                self.owned.append(shm)
+                layout[key] = descriptor
+            # spawn: un fork tras usar OpenMP (árboles de sklearn) no es seguro en los procesos hijos
+            initargs = (layout, self.train_fn, self.n_jobs, self.dataset.feature_names)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker, initargs=initargs)
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def run(self, tasks):
+        """Resultados (métricas, predicciones) de cada tarea (k, pliegue, params), en el mismo orden"""
+        if self.pool is None:
+            return [_run_fold(*task) for task in tasks]
+        return list(self.pool.map(_run_fold, *zip(*tasks)))
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for shm in self.owned:
+            shm.close()
+            shm.unlink()
+        self.owned = []
+        _WORKER.clear()
+
+
+def backtest(dataset, n_folds=5, mode="expanding", train_days=None, test_fraction=0.3, gap_days=0,
+             cores=None, train_fn=None, params=None):
+    """Backtesting walk-forward; devuelve (métricas por pliegue, serie fuera de muestra)
+
+    train_fn(X, y, n_jobs=..., params=..., feature_names=...) debe ser una función de módulo (o un
+    functools.partial de una) porque se envía a los procesos; por defecto data_analysis.train_model.
+    """
+    folds = walk_forward_folds(dataset.time, n_folds, test_fraction, mode, train_days, gap_days)
+    workers, n_jobs = core_budget(cores, len(folds))
+    print(f"Backtesting walk-forward ({mode}): {len(folds)} pliegues, {workers} procesos x {n_jobs} hilos")
+
+    start = time.perf_counter()
+    with FoldPool(dataset, workers, n_jobs, train_fn) as pool:
+        results = pool.run([(k, fold, params) for k, fold in enumerate(folds)])
+    elapsed = time.perf_counter() - start
+
+    metrics = pd.DataFrame([m for m, _ in results])
+    bounds = [(dataset.time[a], dataset.time[b - 1], dataset.time[c], dataset.time[d - 1]) for a, b, c, d in folds]
+    metrics.insert(1, "train_start", [b[0] for b in bounds])
+    metrics.insert(2, "train_end", [b[1] for b in bounds])
+    metrics.insert(3, "test_start", [b[2] for b in bounds])
+    metrics.insert(4, "test_end", [b[3] for b in bounds])
+
+    rows = np.concatenate([np.arange(c, d) for _, _, c, d in folds])
+    predictions = pd.DataFrame({
+        "time": dataset.time[rows],
+        dataset.target: dataset.y[rows],
+        f"{dataset.target}_pred": np.concatenate([p for _, p in results]),
+        "fold": np.repeat(metrics["fold"].to_numpy(), metrics["n_test"].to_numpy()),
+    })
+    if dataset.comid is not None:
+        predictions.insert(1, "comid", dataset.comid[rows])
+    print_backtest(metrics, predictions, elapsed)
+    return metrics, predictions
+
+
+def print_backtest(metrics, predictions, elapsed=None):
+    """Resumen por pliegue y métricas de la serie fuera de muestra completa"""
+    target = predictions.columns[-3]
+    print("Resultados por pliegue:")
+    for _, row in metrics.iterrows():
+        print(f"  {int(row['fold']):2d}. prueba {row['test_start']:%Y-%m-%d} a {row['test_end']:%Y-%m-%d} "
+              f"({int(row['n_test'])} filas, entrenamiento {int(row['n_train'])}): "
+              f"MAE {row['mae']:.2f}  RMSE {row['rmse']:.2f}  R² {row['r2']:.3f}  ({row['fit_s']:.1f} s)")
+    y, y_pred = predictions[target], predictions[f"{target}_pred"]
+    print(f"  Fuera de muestra ({len(predictions)} filas): MAE {mean_absolute_error(y, y_pred):.2f} m³/s  "
+          f"R² {r2_score(y, y_pred):.3f}  | MAE por pliegue {metrics['mae'].mean():.2f} ± {metrics['mae'].std():.2f}")
+    if elapsed is not None:
+        print(f"  Tiempo total: {elapsed:.1f} s (suma de entrenamientos {metrics['fit_s'].sum():.1f} s)")
+
+
+def save_backtest(metrics, predictions, directory=None):
+    directory = Path(directory or data_analysis.PROC_DIR)
+    metrics.to_csv(directory / "backtest_folds.csv", index=False)
+    predictions.to_csv(directory / "backtest_predictions.csv", index=False)
+    print(f"Backtesting guardado en {directory}/")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Backtesting walk-forward del modelo de caudales")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--mode", choices=MODES, default="expanding")
+    parser.add_argument("--train-days", type=int, help="Largo de la ventana de entrenamiento (modo sliding)")
+    parser.add_argument("--test-fraction", type=float, default=0.3)
+    parser.add_argument("--gap-days", type=int, default=0)
+    parser.add_argument("--cores", type=int, help="Presupuesto de núcleos (por defecto todos)")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default=DEFAULT_ENGINE, help="Motor del modelo")
+    args = parser.parse_args()
+
+    df = data_analysis.load_retrospective_data()
+    df, _ = data_analysis.fill_gaps(df)
+    df = data_analysis.build_features(df)
+    dataset = FeatureDataset.from_frame(df)
+    train_fn = partial(data_analysis.train_model, engine=args.engine)
+    metrics, predictions = backtest(dataset, args.folds, args.mode, args.train_days, args.test_fraction,
+                                    args.gap_days, args.cores, train_fn)
+    save_backtest(metrics, predictions)
+
+
+if __name__ == "__main__":
+    main()
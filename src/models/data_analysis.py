@@ -3,68 +3,146 @@
 # Implementa Random Forest con ingeniería de características para predecir caudales del COMID 620883808
 # División temporal 70/30 para entrenamiento y validación del modelo
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import warnings
 import mlflow
 import joblib
+import io
+import json
+import time
 warnings.filterwarnings('ignore')
 
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.data import raw_store, binary_series, forecast_archive
+from src.features.gaps import fill_gaps, print_report as print_gap_report
+from src.features.feature_store import FeatureStore, config_fingerprint
+from src.features.spec import FeaturePlan, compile_spec
+from src.features.dataset import FeatureDataset
+from src.features.forecast import add_forecast_features
+from src.features.climatology import ClimatologyIndex, climatology_columns, climatology_features
+from src.features.selection import load_importance, select_features, prune_spec, print_pruning_report
+from src.models.engines import (DEFAULT_ENGINE, ENGINES, MULTI_OUTPUT_ENGINES, engine_label,
+                                feature_importance, make_model, required_columns)
+from src.features.horizons import HORIZONS, add_horizon_targets, embargo_rows, horizon_columns, horizon_frame
+
 # Configuración de paths
 RAW_DIR = Path("data/raw")
 PROC_DIR = Path("data/processed")  
+# Sufijo de las salidas de ejecuciones con poda: no reemplazan la importancia ni el perfil de referencia
+PRUNED_SUFFIX = "_pruned"
 MODELS_DIR = Path("models")
 FIG_DIR = Path("reports/figures")
+BEST_PARAMS_PATH = MODELS_DIR / "best_params.json"
 PROC_DIR.mkdir(parents=True, exist_ok=True)
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_retrospective_data():
-    """Carga y prepara datos retrospectivos del COMID 620883808 desde archivo CSV"""
+def load_retrospective_data(comid=620883808, start=None, end=None, source="auto"):
+    """Carga datos retrospectivos del COMID desde el almacén Parquet (o el CSV si no existe)
+
+    source="binary" usa el formato memmap de binary_series (lectura sin copia, caudal float32).
+    """
     print("Cargando datos retrospectivos...")
-    df = pd.read_csv(RAW_DIR / "620883808_retrospective_data.csv")
-    df['time'] = pd.to_datetime(df['time'])
-    df = df.rename(columns={'620883808': 'caudal'})
+    if source == "binary":
+        df = binary_series.load_frame(comid, start=start, end=end)
+    elif source != "csv" and raw_store.has_series(comid):
+        df = raw_store.read_series(comid, start=start, end=end)
+        df['caudal'] = df['caudal'].astype('float64')
+    else:
+        df = pd.read_csv(RAW_DIR / f"{comid}_retrospective_data.csv")
+        df['time'] = pd.to_datetime(df['time'])
+        df = df.rename(columns={str(comid): 'caudal'})
+        if start is not None:
+            df = df[df['time'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['time'] <= pd.Timestamp(end)]
     df = df.sort_values('time').reset_index(drop=True)
     print(f"Cargados {len(df)} registros desde {df['time'].min()} hasta {df['time'].max()}")
     return df
 
-def create_features(df):
-    """Genera características temporales, lags y ventanas móviles para el modelo ML"""
+def create_features(df, spec=None):
+    """Genera características temporales, lags y ventanas móviles para el modelo ML
+
+    Las columnas salen de la especificación declarativa (src/features/spec.py, DEFAULT_SPEC por defecto),
+    compilada a un plan NumPy que llena una sola matriz y descarta las filas incompletas.
+    """
     print("Creando features...")
-    
-    # Features temporales
-    df['year'] = df['time'].dt.year
-    df['month'] = df['time'].dt.month
-    df['day'] = df['time'].dt.day
-    df['dayofyear'] = df['time'].dt.dayofyear
-    df['quarter'] = df['time'].dt.quarter
-    
-    # Features estacionales (componentes cíclicas)
-    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-    df['day_sin'] = np.sin(2 * np.pi * df['dayofyear'] / 365)
-    df['day_cos'] = np.cos(2 * np.pi * df['dayofyear'] / 365)
-    
-    # Features de lags (valores anteriores)
-    for lag in [1, 2, 3, 7, 15, 30]:
-        df[f'caudal_lag_{lag}'] = df['caudal'].shift(lag)
-    
-    # Features de ventanas móviles
-    for window in [3, 7, 15, 30]:
-        df[f'caudal_rolling_mean_{window}'] = df['caudal'].rolling(window=window).mean()
-        df[f'caudal_rolling_std_{window}'] = df['caudal'].rolling(window=window).std()
-    
-    # Eliminar filas con NaN
-    df = df.dropna().reset_index(drop=True)
+    df = compile_spec(spec).transform(df)
     print(f"Features creadas. Datos finales: {len(df)} registros")
     return df
 
+def build_features(df, use_store=True, spec=None):
+    """create_features a través del almacén de features: reutiliza la matriz si datos y código no cambiaron"""
+    if not use_store:
+        return create_features(df, spec)
+    store = FeatureStore()
+    plan = compile_spec(spec)
+    # La clave incluye la especificación y el código del plan, no solo el de create_features
+    config = {"spec": plan.spec, "plan": config_fingerprint(FeaturePlan)}
+    df = store.get_or_compute(df, create_features, config, spec=spec)
+    store.print_stats()
+    return df
+
+def add_exogenous_features(df, comid=620883808, root=None):
+    """Features del pronóstico GeoGLOWS archivado (cruce as-of sin fuga); sin cambios si no hay emisiones
+
+    Las filas sin emisión disponible quedan en NaN (RandomForest admite valores faltantes).
+    """
+    if not forecast_archive.issues(comid, root=root):
+        print("Sin pronósticos archivados: se omiten las features exógenas")
+        return df
+    return add_forecast_features(df, comid, root=root)
+
+def add_climatology_features(df, test_size=0.3, series=None):
+    """Percentil, anomalía estandarizada y banderas de sequía/crecida respecto de la climatología diaria
+
+    La climatología se construye solo con el período de entrenamiento (mismo corte que split_temporal),
+    así el conjunto de prueba no influye en las features. series: serie diaria (time, caudal) de la que se
+    toma el caudal del día anterior; conviene pasarla porque create_features descarta días con caudal.
+    """
+    source = df if series is None else series.sort_values('time')
+    split_date = df['time'].quantile(1 - test_size)
+    train = df['time'] < split_date
+    index = ClimatologyIndex()
+    index.update(df.loc[train, 'time'].to_numpy(), df.loc[train, 'caudal'].to_numpy(dtype="float64"))
+    features = climatology_features(index, df['time'].to_numpy(), df['caudal'].to_numpy(dtype="float64"),
+                                    source=(source['time'].to_numpy(), source['caudal'].to_numpy(dtype="float64")))
+    features.index = df.index
+    print(f"Features climatológicas: índice con {int(train.sum())} días hasta {split_date}")
+    return pd.concat([df, features], axis=1)
+
+def pruning_selection(top_k=None, cumulative=None, source=None, engine=DEFAULT_ENGINE):
+    """Features a conservar según las importancias de una ejecución previa; devuelve (spec, exógenas)
+
+    Las columnas que el motor necesita (p. ej. dayofyear de la climatología) se conservan siempre.
+    """
+    importance = load_importance(source)
+    selected = select_features(importance, top_k=top_k, cumulative=cumulative)
+    kept = [col for col in required_columns(engine) if col not in selected]
+    if kept:
+        print(f"Poda de features: se conservan {kept}, requeridas por el motor {engine}")
+        selected += kept
+    spec, exogenous = prune_spec(selected)
+    print(f"Poda de features: {len(selected)} de {len(importance)} "
+          f"({len(spec['features'])} del plan, {len(exogenous)} exógenas)")
+    return spec, exogenous
+
+def keep_exogenous(df, exogenous):
+    """Descarta las features agregadas fuera del plan (fc_*, climatológicas) que no quedaron en la selección"""
+    outside = set(climatology_columns())
+    drop = [col for col in df.columns
+            if (col.startswith("fc_") or col in outside) and col not in exogenous]
+    return df.drop(columns=drop)
+
 def train_test_split_temporal(df, test_size=0.3):
     """Realiza división temporal cronológica para validación realista del modelo"""
     split_date = df['time'].quantile(1 - test_size)
@@ -85,26 +163,55 @@ def prepare_ml_data(df):
     y = df['caudal']
     return X, y, feature_cols
 
-def train_model(X_train, y_train):
-    """Entrena modelo Random Forest optimizado para predicción de series temporales"""
-    print("Entrenando modelo Random Forest...")
-    
-    model = RandomForestRegressor(
-        n_estimators=100,
-        max_depth=20,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1
-    )
+def prepare_dataset(df, target_cols=None):
+    """Dataset float32 respaldado por arreglos (alternativa a prepare_ml_data sin copias por división)
+
+    target_cols: columnas objetivo multi-horizonte (add_horizon_targets); quedan fuera de las features.
+    """
+    dataset = FeatureDataset.from_frame(df, target_cols=target_cols)
+    print(dataset.memory_report())
+    return dataset
+
+def load_model_params(path=None, engine=DEFAULT_ENGINE):
+    """Hiperparámetros del motor; los del Random Forest se actualizan con los mejores de la última búsqueda"""
+    path = Path(path or BEST_PARAMS_PATH)
+    params = dict(ENGINES[engine][2])
+    if engine == "random_forest" and path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            params.update(json.load(f))
+    return params
+
+def train_model(X_train, y_train=None, n_jobs=-1, params=None, engine=DEFAULT_ENGINE, feature_names=None):
+    """Entrena el modelo del motor `engine` (src/models/engines.py; por defecto Random Forest)
+
+    Acepta (X, y) o un FeatureDataset; n_jobs acota los hilos (p. ej. dentro de un pool de procesos)
+    y params reemplaza hiperparámetros por defecto del motor. Las líneas base necesitan los nombres
+    de las features (los toma del FeatureDataset). Con y de varias columnas (multi-horizonte) se ajusta
+    un único modelo multi-salida.
+    """
+    print(f"Entrenando modelo {engine_label(engine)}...")
+    if isinstance(X_train, FeatureDataset):
+        print(X_train.memory_report("  Entrenamiento"))
+        X_train, y_train, feature_names = X_train.X, X_train.y, X_train.feature_names
+    if np.ndim(y_train) == 2 and engine not in MULTI_OUTPUT_ENGINES:
+        raise ValueError(f"El motor {engine} no admite varios horizontes (use {MULTI_OUTPUT_ENGINES})")
+    
+    model = make_model(engine, params, n_jobs, feature_names)
     
     model.fit(X_train, y_train)
     print("Modelo entrenado")
     return model
 
-def evaluate_model(model, X_test, y_test, feature_names):
-    """Evalúa rendimiento del modelo y analiza importancia de características"""
+def evaluate_model(model, X_test, y_test=None, feature_names=None):
+    """Evalúa rendimiento del modelo y analiza importancia de características
+
+    Acepta (X, y, nombres) o un FeatureDataset. Con varios horizontes las métricas globales promedian
+    los horizontes y además se imprime la tabla por horizonte (horizon_metrics).
+    """
     print("Evaluando modelo...")
+    target_cols = None
+    if isinstance(X_test, FeatureDataset):
+        X_test, y_test, feature_names, target_cols = X_test.X, X_test.y, X_test.feature_names, X_test.target_cols
     
     y_pred = model.predict(X_test)
     
@@ -117,11 +224,14 @@ def evaluate_model(model, X_test, y_test, feature_names):
     print(f"  MAE: {mae:.2f} m³/s")
     print(f"  RMSE: {rmse:.2f} m³/s") 
     print(f"  R²: {r2:.3f}")
+    if np.ndim(y_test) == 2:
+        print(f"\nMétricas por horizonte:")
+        print(horizon_metrics(y_test, y_pred, target_cols).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
     
-    # Feature importance
+    # Feature importance (por permutación en motores sin importancias propias)
     importance_df = pd.DataFrame({
         'feature': feature_names,
-        'importance': model.feature_importances_
+        'importance': feature_importance(model, X_test, y_test)
     }).sort_values('importance', ascending=False)
     
     print(f"\nTop 10 features más importantes:")
@@ -130,8 +240,48 @@ def evaluate_model(model, X_test, y_test, feature_names):
     
     return y_pred, importance_df
 
-def save_results(test_df, y_pred, importance_df):
-    """Guarda resultados"""
+def horizon_metrics(y_true, y_pred, target_cols=None):
+    """MAE, RMSE y R² de cada horizonte (columna) de un pronóstico multi-salida"""
+    target_cols = target_cols or [f"h{k + 1}" for k in range(y_true.shape[1])]
+    rows = []
+    for j, name in enumerate(target_cols):
+        rows.append({
+            "horizon": j + 1,
+            "target": name,
+            "mae": mean_absolute_error(y_true[:, j], y_pred[:, j]),
+            "rmse": float(np.sqrt(mean_squared_error(y_true[:, j], y_pred[:, j]))),
+            "r2": r2_score(y_true[:, j], y_pred[:, j]),
+        })
+    return pd.DataFrame(rows)
+
+def profile_model(model, X_test, y_test, train_s, repeats=3):
+    """Tiempo de entrenamiento, tamaño serializado, latencia de predicción y error sobre el conjunto de prueba"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    latency = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        latency.append(time.perf_counter() - start)
+    return {
+        "n_features": X_test.shape[1],
+        "train_s": train_s,
+        "model_mb": buffer.tell() / 1024 ** 2,
+        "latency_ms": min(latency) * 1000 / max(len(X_test), 1) * 1000,
+        "mae": mean_absolute_error(y_test, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+    }
+
+def model_path(engine=DEFAULT_ENGINE, suffix="", horizons=None):
+    """Ruta del modelo entrenado: solo la ejecución por defecto (Random Forest, sin poda, un horizonte)
+    escribe trained_model.pkl, el modelo desplegado que incremental.py sigue actualizando"""
+    if engine == DEFAULT_ENGINE and not suffix and not horizons:
+        return MODELS_DIR / "trained_model.pkl"
+    tag = f"_h{max(horizons)}" if horizons else ""
+    return MODELS_DIR / f"trained_model_{engine}{suffix}{tag}.pkl"
+
+def save_results(test_df, y_pred, importance_df, suffix=""):
+    """Guarda resultados (suffix: PRUNED_SUFFIX en ejecuciones con poda de features)"""
     print("Guardando resultados...")
     
     # Predicciones vs reales
@@ -142,11 +292,20 @@ def save_results(test_df, y_pred, importance_df):
     results_df['error_pct'] = (results_df['error'] / results_df['caudal']) * 100
     
     results_df.to_csv(PROC_DIR / "model_predictions.csv", index=False)
-    importance_df.to_csv(PROC_DIR / "feature_importance.csv", index=False)
+    importance_df.to_csv(PROC_DIR / f"feature_importance{suffix}.csv", index=False)
     
     print("Resultados guardados en data/processed/")
     return results_df
 
+def save_horizon_results(test_ds, y_pred, horizons=HORIZONS):
+    """Guarda el pronóstico multi-horizonte en formato largo y las métricas por horizonte"""
+    predictions = horizon_frame(test_ds.time, y_pred, horizons, test_ds.y)
+    metrics = horizon_metrics(test_ds.y, y_pred, test_ds.target_cols)
+    predictions.to_csv(PROC_DIR / "horizon_predictions.csv", index=False)
+    metrics.to_csv(PROC_DIR / "horizon_metrics.csv", index=False)
+    print("Pronóstico multi-horizonte guardado en data/processed/")
+    return metrics
+
 def create_plots(results_df, importance_df):
     """Crea gráficos de resultados"""
     print("Creando gráficos...")
@@ -210,42 +369,87 @@ def create_plots(results_df, importance_df):
     
     print("Gráficos guardados en reports/figures/")
 
-def main():
-    """Ejecuta el pipeline completo de entrenamiento y evaluación del modelo predictivo"""
+def main(prune=None, engine=DEFAULT_ENGINE, horizons=None):
+    """Ejecuta el pipeline completo de entrenamiento y evaluación del modelo predictivo
+
+    prune: dict opcional con top_k o cumulative (y source) para entrenar solo con las features más
+    importantes de una ejecución previa; el reporte compara contra el perfil de esa ejecución.
+    engine: motor de src/models/engines.py (random_forest, hist_gradient_boosting o una línea base).
+    horizons: días de anticipación (p. ej. 1-15) para el modo multi-horizonte: un solo modelo multi-salida
+    predice el vector completo por fecha de emisión; None entrena el modelo del mismo día.
+    """
     print("Iniciando análisis y entrenamiento del modelo predictivo de caudales")
     print("=" * 70)
+    spec, exogenous = pruning_selection(**prune, engine=engine) if prune else (None, None)
+    # La ejecución sin poda es la referencia: las podadas escriben en archivos aparte
+    suffix = PRUNED_SUFFIX if prune else ""
+    baseline_path = PROC_DIR / "model_profile.json"
+    previous = pd.read_json(baseline_path, typ="series").to_dict() if baseline_path.exists() else None
     
     # 1. Cargar datos
     df = load_retrospective_data()
+
+    # 1b. Malla diaria regular: huecos cortos interpolados, largos enmascarados
+    df, gap_report = fill_gaps(df)
+    print_gap_report(gap_report)
+    series = df
     
-    # 2. Crear features
-    df = create_features(df)
-    
-    # 3. División temporal 70/30
-    train_df, test_df = train_test_split_temporal(df, test_size=0.3)
-    
-    # 4. Preparar datos para ML
-    X_train, y_train, feature_names = prepare_ml_data(train_df)
-    X_test, y_test, _ = prepare_ml_data(test_df)
-    
-    # 5. Entrenar modelo
-    model = train_model(X_train, y_train)
-    
-    # 6. Evaluar modelo
-    y_pred, importance_df = evaluate_model(model, X_test, y_test, feature_names)
-    
-    # 7. Guardar resultados
-    results_df = save_results(test_df, y_pred, importance_df)
-    
-    # 8. Crear gráficos
+    # 2. Crear features (desde el almacén si la entrada no cambió; con poda, solo las seleccionadas)
+    df = build_features(df, spec=spec)
+
+    # 2b. Features exógenas del pronóstico archivado (solo emisiones publicadas antes de cada día)
+    df = add_exogenous_features(df)
+    # 2c. Anomalías respecto de la climatología por día del año (índice del período de entrenamiento)
+    df = add_climatology_features(df, test_size=0.3, series=series)
+    if prune:
+        df = keep_exogenous(df, exogenous)
+    # 2d. Modo multi-horizonte: objetivos caudal_h1..h<k> desde la serie diaria completa
+    target_cols = None
+    if horizons:
+        df = add_horizon_targets(df, series, horizons=horizons)
+        target_cols = horizon_columns(horizons=horizons)
+    
+    # 3. Dataset float32 y división temporal 70/30 (vistas, sin copias)
+    dataset = prepare_dataset(df, target_cols)
+    train_ds, test_ds = dataset.split_temporal(test_size=0.3)
+    if horizons:
+        # Embargo: los objetivos de las últimas filas de entrenamiento caerían dentro del período de prueba
+        train_ds = train_ds.rows(0, embargo_rows(train_ds.time, test_ds.start, horizons))
+    
+    # 4. Entrenar modelo
+    start = time.perf_counter()
+    model = train_model(train_ds, params=load_model_params(engine=engine), engine=engine)
+    train_s = time.perf_counter() - start
+    
+    # 5. Evaluar modelo
+    y_pred, importance_df = evaluate_model(model, test_ds)
+    y_test = test_ds.y
+
+    # 5b. Perfil del modelo (tiempo, tamaño, latencia, error); con poda se compara con la ejecución previa
+    profile = profile_model(model, test_ds.X, y_test, train_s)
+    if prune and previous is not None:
+        print_pruning_report(previous, profile)
+    pd.Series(profile).to_json(PROC_DIR / f"model_profile{suffix}.json")
+    
+    # 6. Guardar resultados (multi-horizonte: el primer horizonte, fechado en su día objetivo, en los
+    #    resultados y gráficos habituales)
+    test_frame = test_ds.frame()
+    if horizons:
+        save_horizon_results(test_ds, y_pred, horizons)
+        y_pred = y_pred[:, 0]
+        y_test = y_test[:, 0]
+        test_frame["time"] += pd.Timedelta(days=horizons[0])
+    results_df = save_results(test_frame, y_pred, importance_df, suffix)
+    
+    # 7. Crear gráficos
     create_plots(results_df, importance_df)
     
-    # 9. Guardar modelo
-    model_path = MODELS_DIR / "trained_model.pkl"
-    joblib.dump(model, model_path)
-    print(f"Modelo guardado en: {model_path}")
+    # 8. Guardar modelo
+    path = model_path(engine, suffix, horizons)
+    joblib.dump(model, path)
+    print(f"Modelo guardado en: {path}")
     
-    # 10. Registrar métricas finales
+    # 9. Registrar métricas finales
     mae = mean_absolute_error(y_test, y_pred)
     mse = mean_squared_error(y_test, y_pred)
     rmse = np.sqrt(mse)
@@ -264,4 +468,16 @@ def main():
     return model, results_df, importance_df
 
 if __name__ == "__main__":
-    model, results, importance = main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Entrenamiento y evaluación del modelo de caudales")
+    parser.add_argument("--top-k", type=int, help="Podar a las k features más importantes")
+    parser.add_argument("--cumulative", type=float, help="Podar a la fracción acumulada de importancia (0-1]")
+    parser.add_argument("--importance", help="feature_importance.csv previo o URI runs:/<id>/feature_importance.csv")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default=DEFAULT_ENGINE, help="Motor del modelo")
+    parser.add_argument("--horizons", type=int, help="Pronóstico directo de 1 a N días en un solo modelo (p. ej. 15)")
+    args = parser.parse_args()
+    prune = None
+    if args.top_k is not None or args.cumulative is not None:
+        prune = {"top_k": args.top_k, "cumulative": args.cumulative, "source": args.importance}
+    horizons = tuple(range(1, args.horizons + 1)) if args.horizons else None
+    model, results, importance = main(prune, args.engine, horizons)
\ No newline at end of file
@@ -0,0 +1,196 @@
+# src/models/engines.py
+# Motores de modelo intercambiables por nombre: Random Forest, gradient boosting por histogramas (binning de
+# features y árboles multihilo, NaN nativo) y dos líneas base baratas (persistencia y climatología por día
+# del año) para medir cuánto aporta cada modelo. train_model/evaluate_model de data_analysis despachan aquí
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.inspection import permutation_importance
+from threadpoolctl import threadpool_limits
+
+from src.features.climatology import _smooth
+
+# Hiperparámetros por defecto del Random Forest (la búsqueda de src/models/tuning.py los puede reemplazar)
+RF_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 20,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "random_state": 42,
+}
+HGB_PARAMS = {
+    "max_iter": 300,
+    "learning_rate": 0.05,
+    "max_leaf_nodes": 31,
+    "min_samples_leaf": 20,
+    "l2_regularization": 0.0,
+    "max_bins": 255,
+    "early_stopping": False,
+    "random_state": 42,
+}
+DEFAULT_ENGINE = "random_forest"
+# Motores que ajustan varios objetivos (horizontes) en un solo modelo; HistGradientBoosting es de una salida
+MULTI_OUTPUT_ENGINES = ("random_forest", "persistence", "climatology")
+# Filas de prueba usadas para la importancia por permutación de modelos sin importancias propias
+IMPORTANCE_ROWS = 2000
+
+
+def _column(feature_names, column):
+    if feature_names is None or column not in feature_names:
+        raise ValueError(f"La línea base requiere la feature {column} (entrene con un FeatureDataset)")
+    return list(feature_names).index(column)
+
+
+class PersistenceModel(RegressorMixin, BaseEstimator):
+    """Línea base de persistencia: el caudal del día es el del día anterior (columna <target>_lag_1)
+
+    Con varios horizontes se repite el mismo valor en todos.
+    """
+
+    def __init__(self, column="caudal_lag_1", feature_names=None):
+        self.column = column
+        self.feature_names = feature_names
+
+    def fit(self, X, y):
+        self.index_ = _column(self.feature_names, self.column)
+        self.n_features_in_ = X.shape[1]
+        y = np.asarray(y, dtype="float64")
+        self.n_outputs_ = y.shape[1] if y.ndim == 2 else None
+        self.fallback_ = float(np.nanmean(y if y.ndim == 1 else y[:, 0]))
+        return self
+
+    def predict(self, X):
+        values = np.asarray(X[:, self.index_], dtype="float64")
+        values = np.where(np.isnan(values), self.fallback_, values)
+        return values if self.n_outputs_ is None else np.repeat(values[:, None], self.n_outputs_, axis=1)
+
+    @property
+    def feature_importances_(self):
+        importance = np.zeros(self.n_features_in_)
+        importance[self.index_] = 1.0
+        return importance
+
+
+class ClimatologyModel(RegressorMixin, BaseEstimator):
+    """Línea base climatológica: media del entrenamiento por día del año, suavizada en una ventana circular
+
+    Con varios horizontes (columnas de y = días t+1, t+2, ...) la salida j es la media del día del año + j + 1.
+    """
+
+    def __init__(self, column="dayofyear", window=15, feature_names=None):
+        self.column = column
+        self.window = window
+        self.feature_names = feature_names
+
+    def fit(self, X, y):
+        self.index_ = _column(self.feature_names, self.column)
+        self.n_features_in_ = X.shape[1]
+        doy = np.asarray(X[:, self.index_], dtype=np.int64) - 1
+        y = np.asarray(y, dtype="float64")
+        self.n_outputs_ = y.shape[1] if y.ndim == 2 else None
+        if y.ndim == 2:
+            # La primera columna es el día siguiente al de la fila
+            doy = (doy + 1) % 366
+            y = y[:, 0]
+        count = _smooth(np.bincount(doy, minlength=366).astype("float64"), self.window)
+        total = _smooth(np.bincount(doy, weights=y, minlength=366), self.window)
+        self.fallback_ = float(y.mean())
+        self.table_ = np.where(count > 0, total / np.maximum(count, 1), self.fallback_)
+        return self
+
+    def predict(self, X):
+        doy = np.clip(np.asarray(X[:, self.index_], dtype=np.int64) - 1, 0, 365)
+        if self.n_outputs_ is None:
+            return self.table_[doy]
+        return self.table_[(doy[:, None] + np.arange(1, self.n_outputs_ + 1)) % len(self.table_)]
+
+    @property
+    def feature_importances_(self):
+        importance = np.zeros(self.n_features_in_)
+        importance[self.index_] = 1.0
+        return importance
+
+
+class ThreadLimitedModel(RegressorMixin, BaseEstimator):
+    """Envuelve un estimador con paralelismo OpenMP interno y acota sus hilos en fit/predict (n_jobs)"""
+
+    def __init__(self, model, n_jobs=-1):
+        self.model = model
+        self.n_jobs = n_jobs
+
+    def _limits(self):
+        return threadpool_limits(self.n_jobs if self.n_jobs and self.n_jobs > 0 else None, user_api="openmp")
+
+    def fit(self, X, y):
+        with self._limits():
+            self.model.fit(X, y)
+        return self
+
+    def predict(self, X):
+        with self._limits():
+            return self.model.predict(X)
+
+
+def _random_forest(params, n_jobs, feature_names):
+    return RandomForestRegressor(**params, n_jobs=n_jobs)
+
+
+def _hist_gradient_boosting(params, n_jobs, feature_names):
+    return ThreadLimitedModel(HistGradientBoostingRegressor(**params), n_jobs)
+
+
+def _persistence(params, n_jobs, feature_names):
+    return PersistenceModel(**params, feature_names=feature_names)
+
+
+def _climatology(params, n_jobs, feature_names):
+    return ClimatologyModel(**params, feature_names=feature_names)
+
+
+# nombre -> (descripción, constructor, parámetros por defecto)
+ENGINES = {
+    "random_forest": ("Random Forest", _random_forest, RF_PARAMS),
+    "hist_gradient_boosting": ("Gradient Boosting por histogramas", _hist_gradient_boosting, HGB_PARAMS),
+    "persistence": ("línea base de persistencia", _persistence, {"column": "caudal_lag_1"}),
+    "climatology": ("línea base climatológica", _climatology, {"column": "dayofyear", "window": 15}),
+}
+
+
+def _engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine} (use {tuple(ENGINES)})")
+    return ENGINES[engine]
+
+
+def engine_label(engine):
+    return _engine(engine)[0]
+
+
+def required_columns(engine=DEFAULT_ENGINE, params=None):
+    """Features que el motor lee por nombre (columna de las líneas base); la poda debe conservarlas"""
+    _, _, defaults = _engine(engine)
+    column = dict(defaults, **(params or {})).get("column")
+    return [column] if column else []
+
+
+def make_model(engine=DEFAULT_ENGINE, params=None, n_jobs=-1, feature_names=None):
+    """Estimador sin entrenar del motor con sus parámetros por defecto actualizados con `params`"""
+    _, build, defaults = _engine(engine)
+    return build(dict(defaults, **(params or {})), n_jobs, feature_names)
+
+
+def feature_importance(model, X, y, random_state=42):
+    """Importancias propias del modelo o, si no las tiene, por permutación sobre una muestra de filas
+
+    Las de permutación (aumento del MAE) se normalizan a suma 1 como las de los árboles.
+    """
+    importance = getattr(model, "feature_importances_", None)
+    if importance is not None:
+        return np.asarray(importance)
+    rows = np.random.default_rng(random_state).permutation(len(X))[:IMPORTANCE_ROWS]
+    rows.sort()
+    result = permutation_importance(model, X[rows], y[rows], n_repeats=3, random_state=random_state,
+                                    scoring="neg_mean_absolute_error")
+    importance = np.maximum(result.importances_mean, 0.0)
+    return importance / importance.sum() if importance.sum() > 0 else importance
@@ -0,0 +1,294 @@
+# src/models/incremental.py
+# Reentrenamiento incremental del Random Forest: en lugar de reajustar todo el bosque cada día, se carga el
+# modelo anterior (models/trained_model.pkl o el registro de MLflow), se agregan unos pocos árboles con
+# warm_start entrenados sobre una ventana reciente y se retiran los árboles más antiguos para acotar el
+# tamaño del ensamble. Cada `refit_days` (p. ej. semanal), o si cambian las features, se reajusta completo
+# El estado (último reajuste completo y su error) queda en models/training_state.json para medir la pérdida.
+# Se entrena siempre sobre la cola real del dataset completo (la ventana termina en el último día). El error
+# se mide con un holdout móvil: antes de actualizar, el modelo desplegado predice los días que llegaron
+# desde su último entrenamiento (que nunca vio); esas predicciones se acumulan para los últimos HOLDOUT_DAYS
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.models import data_analysis
+
+MODEL_PATH = data_analysis.MODELS_DIR / "trained_model.pkl"
+STATE_PATH = data_analysis.MODELS_DIR / "training_state.json"
+MODES = ("auto", "full", "incremental")
+# Árboles nuevos por actualización, ventana de entrenamiento reciente (días) y cadencia del reajuste completo
+ADD_TREES = 5
+WINDOW_DAYS = 3650
+REFIT_DAYS = 7
+# Días del holdout móvil (predicciones fuera de muestra acumuladas) y archivo donde se acumulan
+HOLDOUT_DAYS = 30
+HOLDOUT_PATH = data_analysis.PROC_DIR / "incremental_holdout.csv"
+# Salidas propias: model_predictions.csv / feature_importance.csv siguen siendo las de data_analysis.py
+IMPORTANCE_PATH = data_analysis.PROC_DIR / "feature_importance_incremental.csv"
+DAY_NS = 86400 * 10 ** 9
+
+
+def load_state(path=None):
+    """Estado del reentrenamiento (último reajuste completo, features, actualizaciones); vacío si no existe"""
+    path = Path(path or STATE_PATH)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=None):
+    """Escribe el estado de forma atómica (tmp + replace)"""
+    path = Path(path or STATE_PATH)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_previous_model(path=None, model_uri=None):
+    """Modelo anterior desde el registro de MLflow (model_uri, p. ej. models:/CELEC_Flow_Predictor/latest)
+    o desde models/trained_model.pkl; None si no hay"""
+    if model_uri:
+        # Import diferido: solo se necesita MLflow al leer del registro
+        import mlflow.sklearn
+        return mlflow.sklearn.load_model(model_uri)
+    path = Path(path or MODEL_PATH)
+    return joblib.load(path) if path.exists() else None
+
+
+def incompatible(model, state, feature_names):
+    """Motivo por el que el modelo previo no admite árboles nuevos (None si es compatible)"""
+    if not isinstance(model, RandomForestRegressor):
+        return "sin modelo Random Forest previo"
+    known = state.get("feature_names")
+    if (known is not None and known != list(feature_names)) or model.n_features_in_ != len(feature_names):
+        return "cambiaron las features"
+    return None
+
+
+def refit_reason(model, state, feature_names, today, refit_days=REFIT_DAYS):
+    """Motivo para reajustar completo (None si basta una actualización incremental)"""
+    reason = incompatible(model, state, feature_names)
+    if reason is not None:
+        return reason
+    last = state.get("last_full_refit")
+    if last is None:
+        return "sin reajuste completo registrado"
+    if pd.Timestamp(today) - pd.Timestamp(last) >= pd.Timedelta(days=refit_days):
+        return f"pasaron {refit_days} días desde el último reajuste completo"
+    return None
+
+
+def grow_forest(model, X, y, add_trees=ADD_TREES, max_trees=None, n_jobs=-1, seed=None):
+    """Agrega add_trees árboles entrenados sobre (X, y) con warm_start y retira los más antiguos
+
+    Devuelve la cantidad de árboles retirados; el bosque queda con a lo sumo max_trees árboles
+    (por defecto los que tenía). warm_start deriva las semillas de los árboles nuevos de random_state
+    saltando tantas como árboles existen; tras retirar árboles se repetirían, por eso cada actualización
+    usa su propia semilla (`seed`).
+    """
+    max_trees = max_trees or len(model.estimators_)
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + add_trees, n_jobs=n_jobs)
+    if seed is not None:
+        model.set_params(random_state=seed)
+    model.fit(X, y)
+    retired = max(0, len(model.estimators_) - max_trees)
+    if retired:
+        # estimators_ está en orden de creación: los primeros son los más antiguos
+        model.estimators_ = model.estimators_[retired:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return retired
+
+
+def window_rows(times, window_days=WINDOW_DAYS):
+    """Primera fila de la ventana reciente: los últimos window_days días de la serie"""
+    times = np.asarray(times, dtype="datetime64[ns]")
+    return int(np.searchsorted(times, times[-1] - np.timedelta64(window_days, "D"), side="right"))
+
+
+def unseen_rows(times, trained_until=None):
+    """Primera fila posterior a trained_until (días que el modelo desplegado no vio); len si no se conoce"""
+    times = np.asarray(times, dtype="datetime64[ns]")
+    if trained_until is None:
+        return len(times)
+    return int(np.searchsorted(times, np.datetime64(pd.Timestamp(trained_until), "ns"), side="right"))
+
+
+def score_holdout(dataset, model, state, holdout_path=None, holdout_days=HOLDOUT_DAYS):
+    """Holdout móvil: predicciones del modelo desplegado sobre los días llegados desde su último entrenamiento
+
+    Se agregan a holdout_path (time, caudal, caudal_pred, mode del modelo que predijo) y se conservan los
+    últimos holdout_days del dataset. Devuelve el holdout acumulado.
+    """
+    path = Path(holdout_path or HOLDOUT_PATH)
+    columns = ["time", "caudal", "caudal_pred", "mode"]
+    parts = [pd.read_csv(path, parse_dates=["time"])] if path.exists() else []
+    first = unseen_rows(dataset.time, state.get("trained_until"))
+    if model is not None and first < len(dataset) and incompatible(model, state, dataset.feature_names) is None:
+        new = dataset.rows(first, len(dataset))
+        parts = [part[part["time"] < new.start] for part in parts]
+        parts.append(pd.DataFrame({"time": new.time, "caudal": new.y, "caudal_pred": model.predict(new.X),
+                                   "mode": state.get("last_mode")}))
+        print(f"Holdout móvil: {len(new)} días nuevos predichos por el modelo anterior")
+    holdout = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    holdout["time"] = pd.to_datetime(holdout["time"])
+    holdout = holdout[holdout["time"] > dataset.end - pd.Timedelta(days=holdout_days)].reset_index(drop=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    holdout[columns].to_csv(path, index=False)
+    return holdout
+
+
+def holdout_metrics(holdout):
+    """MAE, RMSE y R² del holdout móvil, más el MAE de las predicciones de cada modo de entrenamiento"""
+    if len(holdout) < 2:
+        return {}
+    y_true, y_pred = holdout["caudal"].to_numpy(), holdout["caudal_pred"].to_numpy()
+    metrics = {
+        "mae": mean_absolute_error(y_true, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "r2": r2_score(y_true, y_pred),
+        "holdout_days": len(holdout),
+    }
+    errors = (holdout["caudal"] - holdout["caudal_pred"]).abs().groupby(holdout["mode"]).mean()
+    metrics.update({f"mae_{mode}": float(mae) for mode, mae in errors.items()})
+    return metrics
+
+
+def retrain(train_ds, model=None, state=None, mode="auto", today=None, add_trees=ADD_TREES,
+            window_days=WINDOW_DAYS, refit_days=REFIT_DAYS, params=None, n_jobs=-1):
+    """Reentrena completo o incremental según el modo y la cadencia; devuelve (modelo, estado, resumen)
+
+    mode: "auto" (incremental salvo que toque reajuste completo), "full" o "incremental".
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode} (use {MODES})")
+    state = dict(state or {})
+    today = pd.Timestamp(today or pd.Timestamp.now().normalize())
+    params = params or data_analysis.load_model_params()
+    reason = refit_reason(model, state, train_ds.feature_names, today, refit_days)
+    if mode == "incremental" and incompatible(model, state, train_ds.feature_names) is not None:
+        raise ValueError(f"No se puede actualizar de forma incremental: {reason}")
+    full = mode == "full" or (mode == "auto" and reason is not None)
+
+    start = time.perf_counter()
+    if full:
+        print(f"Reajuste completo: {reason or 'solicitado'}")
+        model = data_analysis.train_model(train_ds, n_jobs=n_jobs, params=params)
+        summary = {"mode": "full", "trees_added": len(model.estimators_), "trees_retired": 0,
+                   "window_rows": len(train_ds), "window_start": train_ds.start}
+        state.update(last_full_refit=str(today.date()), feature_names=list(train_ds.feature_names), updates=0)
+    else:
+        first = window_rows(train_ds.time, window_days)
+        print(f"Actualización incremental: {add_trees} árboles sobre {len(train_ds) - first} filas recientes "
+              f"(desde {pd.Timestamp(train_ds.time[first]).date()})")
+        retired = grow_forest(model, train_ds.X[first:], train_ds.y[first:], add_trees,
+                              params.get("n_estimators"), n_jobs, seed=int(today.value // DAY_NS))
+        summary = {"mode": "incremental", "trees_added": add_trees, "trees_retired": retired,
+                   "window_rows": len(train_ds) - first, "window_start": pd.Timestamp(train_ds.time[first])}
+        state["updates"] = state.get("updates", 0) + 1
+    summary.update(train_s=time.perf_counter() - start, n_trees=len(model.estimators_), window_end=train_ds.end)
+    state["last_update"] = str(today.date())
+    print(f"  {summary['mode']}: {summary['train_s']:.2f} s, {summary['n_trees']} árboles "
+          f"(+{summary['trees_added']} / -{summary['trees_retired']})")
+    return model, state, summary
+
+
+def log_retrain(summary, metrics, state, params, experiment="CELEC_Flow_Prediction_Incremental"):
+    """Registra el reentrenamiento en MLflow: modo, costo y error, y la diferencia frente al último
+    reajuste completo (pérdida de exactitud de las actualizaciones incrementales)"""
+    import mlflow
+    mlflow.set_experiment(experiment)
+    with mlflow.start_run(run_name=f"retrain_{summary['mode']}") as run:
+        mlflow.log_params({"mode": summary["mode"], "updates_since_full": state.get("updates", 0),
+                           "last_full_refit": state.get("last_full_refit"), **params})
+        mlflow.log_metrics({k: float(summary[k]) for k in ("train_s", "n_trees", "trees_added", "trees_retired",
+                                                           "window_rows")})
+        mlflow.log_metrics(metrics)
+        if "full_mae" in state and "mae" in metrics:
+            mlflow.log_metrics({"mae_delta_vs_full": metrics["mae"] - state["full_mae"],
+                                "train_s_ratio_vs_full": summary["train_s"] / state["full_train_s"]})
+        mlflow.set_tag("model_purpose", "hydrological_forecast")
+    return run.info.run_id
+
+
+def daily_update(dataset, model=None, state=None, mode="auto", today=None, add_trees=ADD_TREES,
+                 window_days=WINDOW_DAYS, refit_days=REFIT_DAYS, params=None, holdout_path=None,
+                 holdout_days=HOLDOUT_DAYS, n_jobs=-1):
+    """Actualización diaria sobre el dataset completo: primero el holdout móvil con el modelo desplegado,
+    luego el reentrenamiento sobre la cola real de los datos; devuelve (modelo, estado, resumen, holdout, métricas)"""
+    state = dict(state or {})
+    holdout = score_holdout(dataset, model, state, holdout_path, holdout_days)
+    metrics = holdout_metrics(holdout)
+    if "mae_full" in metrics:
+        state["full_mae"] = metrics["mae_full"]
+    model, state, summary = retrain(dataset, model, state, mode, today, add_trees, window_days, refit_days,
+                                    params, n_jobs)
+    if summary["mode"] == "full":
+        state["full_train_s"] = summary["train_s"]
+    state.update(trained_until=str(dataset.end), last_mode=summary["mode"])
+    return model, state, summary, holdout, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reentrenamiento incremental (warm start) del modelo de caudales")
+    parser.add_argument("--mode", choices=MODES, default="auto")
+    parser.add_argument("--add-trees", type=int, default=ADD_TREES)
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    parser.add_argument("--refit-days", type=int, default=REFIT_DAYS, help="Cadencia del reajuste completo")
+    parser.add_argument("--holdout-days", type=int, default=HOLDOUT_DAYS, help="Días del holdout móvil")
+    parser.add_argument("--model-uri", help="Modelo previo del registro de MLflow (por defecto trained_model.pkl)")
+    parser.add_argument("--mlflow", action="store_true", help="Registrar el reentrenamiento en MLflow (file:./mlruns)")
+    args = parser.parse_args()
+
+    # Mismo dataset que data_analysis.py (las features salen del almacén si la entrada no cambió), completo:
+    # los árboles nuevos se entrenan con los días más recientes
+    df = data_analysis.load_retrospective_data()
+    series, _ = data_analysis.fill_gaps(df)
+    df = data_analysis.build_features(series)
+    df = data_analysis.add_exogenous_features(df)
+    df = data_analysis.add_climatology_features(df, test_size=0.3, series=series)
+    dataset = data_analysis.prepare_dataset(df)
+
+    params = data_analysis.load_model_params()
+    model, state, summary, holdout, metrics = daily_update(
+        dataset, load_previous_model(model_uri=args.model_uri), load_state(), args.mode,
+        add_trees=args.add_trees, window_days=args.window_days, refit_days=args.refit_days, params=params,
+        holdout_days=args.holdout_days)
+    if metrics:
+        print(f"  Holdout móvil ({metrics['holdout_days']} días fuera de muestra): MAE {metrics['mae']:.3f}, "
+              f"R² {metrics['r2']:.3f}")
+        if "full_mae" in state and "full_train_s" in state:
+            print(f"  MAE {metrics['mae']:.3f} frente a {state['full_mae']:.3f} de los reajustes completos "
+                  f"(costo {summary['train_s'] / state['full_train_s']:.2f}x)")
+
+    # El holdout (incremental_holdout.csv) ya quedó escrito, vacío en la primera ejecución
+    importance_df = pd.DataFrame({"feature": dataset.feature_names, "importance": model.feature_importances_})
+    importance_df.sort_values("importance", ascending=False).to_csv(IMPORTANCE_PATH, index=False)
+    joblib.dump(model, MODEL_PATH)
+    save_state(state)
+    print(f"Modelo guardado en: {MODEL_PATH}")
+    if args.mlflow:
+        import mlflow
+        mlflow.set_tracking_uri("file:./mlruns")
+        log_retrain(summary, metrics, state, params)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# src/models/tuning.py
+# Búsqueda de hiperparámetros del Random Forest sobre pliegues temporales (walk-forward) con successive halving:
+# todos los candidatos se evalúan con poco recurso (pocos árboles o solo la fracción más reciente del
+# entrenamiento) y en cada ronda sobrevive el mejor 1/eta con eta veces más recurso.
+# Los pliegues se calculan una vez y son vistas de una única matriz compartida por el pool de procesos
+# (sin reconstruir features ni copiar datos por prueba); cada prueba queda como run anidado en MLflow.
+# Los pliegues se arman solo con el período de entrenamiento: el último HOLDOUT de las fechas es la prueba
+# que informa data_analysis.py y no debe influir en los hiperparámetros que luego usa
+
+import itertools
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Ejecución directa como script: habilita imports del paquete src
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.dataset import FeatureDataset
+from src.models import data_analysis
+from src.models.backtest import FoldPool, core_budget, walk_forward_folds
+
+# Espacio por defecto (n_estimators lo fija el recurso de cada ronda o RF_PARAMS)
+SEARCH_SPACE = {
+    "max_depth": [10, 20, 30, None],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": [1.0, "sqrt", 0.5],
+}
+# Recurso que crece entre rondas: cantidad de árboles o fracción (más reciente) del entrenamiento de cada pliegue
+RESOURCES = {"n_estimators": (10, 100), "fraction": (1 / 9, 1.0)}
+ETA = 3
+# Fracción final de las fechas reservada como prueba (la misma división que data_analysis.split_temporal(0.3))
+HOLDOUT = 0.3
+RESULTS_PATH = Path("data/processed/tuning_results.csv")
+
+
+def sample_candidates(space=None, n_candidates=27, seed=42):
+    """Combinaciones distintas del espacio elegidas al azar (todas si la grilla es más chica)"""
+    space = space or SEARCH_SPACE
+    names = list(space)
+    grid = list(itertools.product(*(space[name] for name in names)))
+    rng = np.random.default_rng(seed)
+    chosen = rng.permutation(len(grid))[:n_candidates] if n_candidates < len(grid) else range(len(grid))
+    return [dict(zip(names, grid[i])) for i in chosen]
+
+
+def halving_schedule(n_candidates, min_resource, max_resource, eta=ETA):
+    """Rondas (candidatos, recurso): el recurso se multiplica por eta hasta max_resource y los candidatos
+    se dividen por eta; la última ronda siempre usa max_resource"""
+    if not 0 < min_resource <= max_resource:
+        raise ValueError("Se requiere 0 < min_resource <= max_resource")
+    if eta < 2:
+        raise ValueError("eta debe ser >= 2")
+    rounds = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9))
+    rounds = min(rounds, int(math.ceil(math.log(max(n_candidates, 1), eta) - 1e-9)))
+    return [(max(1, math.ceil(n_candidates / eta ** i)), max_resource / eta ** (rounds - i))
+            for i in range(rounds + 1)]
+
+
+def _task(fold, params, resource, value):
+    """Pliegue y parámetros de una prueba con el recurso de su ronda"""
+    train_start, train_end, test_start, test_end = fold
+    if resource == "n_estimators":
+        return fold, dict(params, n_estimators=max(1, int(round(value))))
+    # fraction: las filas más recientes del entrenamiento (la prueba no cambia)
+    keep = max(1, int(round((train_end - train_start) * value)))
+    return (train_end - keep, train_end, test_start, test_end), params
+
+
+def search(dataset, space=None, n_candidates=27, resource="n_estimators", min_resource=None, max_resource=None,
+           eta=ETA, n_folds=3, test_fraction=0.3, mode="expanding", train_days=None, gap_days=0,
+           cores=None, seed=42, train_fn=None, holdout=HOLDOUT):
+    """Successive halving sobre pliegues walk-forward; devuelve (mejores parámetros, tabla de pruebas)
+
+    Cada prueba es un candidato en una ronda, puntuado por el MAE medio de sus pliegues. Los pliegues
+    se arman dentro del período de entrenamiento (se excluye la fracción final `holdout` de las fechas;
+    0 usa el dataset completo, p. ej. si ya viene recortado).
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f"Recurso desconocido: {resource} (use {tuple(RESOURCES)})")
+    low, high = RESOURCES[resource]
+    min_resource, max_resource = min_resource or low, max_resource or high
+    candidates = sample_candidates(space, n_candidates, seed)
+    schedule = halving_schedule(len(candidates), min_resource, max_resource, eta)
+    if holdout:
+        dataset, _ = dataset.split_temporal(test_size=holdout)
+    # Caché de pliegues: rangos de filas calculados una vez, vistas de la matriz compartida en todas las rondas
+    folds = walk_forward_folds(dataset.time, n_folds, test_fraction, mode, train_days, gap_days)
+    workers, n_jobs = core_budget(cores, len(candidates) * len(folds))
+    print(f"Búsqueda de hiperparámetros: {len(candidates)} candidatos, {len(folds)} pliegues, "
+          f"{len(schedule)} rondas ({resource}), {workers} procesos x {n_jobs} hilos")
+
+    rows = []
+    alive = list(range(len(candidates)))
+    start = time.perf_counter()
+    with FoldPool(dataset, workers, n_jobs, train_fn) as pool:
+        for rung, (n_keep, value) in enumerate(schedule):
+            alive = alive[:n_keep]
+            tasks = [(k,) + _task(fold, candidates[c], resource, value) for c in alive for k, fold in enumerate(folds)]
+            results = pool.run(tasks)
+            for i, c in enumerate(alive):
+                metrics = pd.DataFrame([m for m, _ in results[i * len(folds):(i + 1) * len(folds)]])
+                rows.append({"trial": c, "rung": rung, resource: value, **candidates[c],
+                             "mae": metrics["mae"].mean(), "mae_std": metrics["mae"].std(),
+                             "rmse": metrics["rmse"].mean(), "r2": metrics["r2"].mean(),
+                             "fit_s": metrics["fit_s"].sum()})
+            scores = {row["trial"]: row["mae"] for row in rows[-len(alive):]}
+            alive.sort(key=scores.get)
+            print(f"  Ronda {rung + 1}: {len(tasks)} entrenamientos con {resource}={value:.3g}, "
+                  f"mejor MAE {scores[alive[0]]:.3f}")
+    elapsed = time.perf_counter() - start
+
+    trials = pd.DataFrame(rows)
+    best = dict(candidates[alive[0]])
+    if resource == "n_estimators":
+        best["n_estimators"] = int(round(max_resource))
+    print(f"  Mejores parámetros: {best} ({elapsed:.1f} s, {trials['fit_s'].sum():.1f} s de entrenamiento)")
+    return best, trials
+
+
+def save_search(best, trials, results_path=None, params_path=None):
+    """Tabla de pruebas en CSV y mejores parámetros en JSON (los toma data_analysis.load_model_params)"""
+    results_path = Path(results_path or RESULTS_PATH)
+    params_path = Path(params_path or data_analysis.BEST_PARAMS_PATH)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    params_path.parent.mkdir(parents=True, exist_ok=True)
+    trials.to_csv(results_path, index=False)
+    with open(params_path, "w", encoding="utf-8") as f:
+        json.dump(best, f, indent=2)
+    print(f"Búsqueda guardada en {results_path} y {params_path}")
+
+
+def log_search(best, trials, resource="n_estimators", experiment="CELEC_Flow_Prediction_Tuning"):
+    """Registra la búsqueda en MLflow: un run padre y un run anidado por prueba
+
+    Las pruebas se escriben al final de la búsqueda. MLflow no permite crear varios runs en una llamada:
+    cada run anidado cuesta create_run, un log_batch (métricas, parámetros y tags juntos) y set_terminated.
+    """
+    # Import diferido: la búsqueda no necesita MLflow
+    import mlflow
+    from mlflow.entities import Metric, Param, RunTag
+    from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID, MLFLOW_RUN_NAME
+
+    mlflow.set_experiment(experiment)
+    client = mlflow.tracking.MlflowClient()
+    with mlflow.start_run(run_name="hyperparameter_search") as parent:
+        mlflow.log_params({f"best_{k}": v for k, v in best.items()})
+        mlflow.log_params({"resource": resource, "candidates": trials["trial"].nunique(),
+                           "rounds": trials["rung"].nunique()})
+        final = trials[trials["rung"] == trials["rung"].max()].sort_values("mae").iloc[0]
+        mlflow.log_metrics({"best_mae": final["mae"], "best_rmse": final["rmse"], "best_r2": final["r2"],
+                            "search_fit_s": trials["fit_s"].sum()})
+        experiment_id = parent.info.experiment_id
+        now = int(time.time() * 1000)
+        metric_names = ["mae", "mae_std", "rmse", "r2", "fit_s"]
+        for _, row in trials.iterrows():
+            name = f"trial_{int(row['trial'])}_rung_{int(row['rung'])}"
+            run = client.create_run(experiment_id, tags={MLFLOW_PARENT_RUN_ID: parent.info.run_id,
+                                                         MLFLOW_RUN_NAME: name})
+            params = [Param(k, str(v)) for k, v in row.items() if k not in metric_names]
+            metrics = [Metric(k, float(row[k]), now, int(row["rung"])) for k in metric_names if pd.notna(row[k])]
+            client.log_batch(run.info.run_id, metrics=metrics, params=params, tags=[RunTag("trial", name)])
+            client.set_terminated(run.info.run_id)
+    print(f"MLflow: {len(trials)} pruebas registradas bajo el run {parent.info.run_id}")
+    return parent.info.run_id
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con successive halving")
+    parser.add_argument("--candidates", type=int, default=27)
+    parser.add_argument("--resource", choices=tuple(RESOURCES), default="n_estimators")
+    parser.add_argument("--min-resource", type=float)
+    parser.add_argument("--max-resource", type=float)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--mode", choices=("expanding", "sliding"), default="expanding")
+    parser.add_argument("--train-days", type=int)
+    parser.add_argument("--cores", type=int, help="Presupuesto de núcleos (por defecto todos)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mlflow", action="store_true", help="Registrar la búsqueda en MLflow (file:./mlruns)")
+    args = parser.parse_args()
+
+    df = data_analysis.load_retrospective_data()
+    df, _ = data_analysis.fill_gaps(df)
+    df = data_analysis.build_features(df)
+    dataset = FeatureDataset.from_frame(df)
+    best, trials = search(dataset, n_candidates=args.candidates, resource=args.resource,
+                          min_resource=args.min_resource, max_resource=args.max_resource, eta=args.eta,
+                          n_folds=args.folds, mode=args.mode, train_days=args.train_days,
+                          cores=args.cores, seed=args.seed)
+    save_search(best, trials)
+    if args.mlflow:
+        import mlflow
+        mlflow.set_tracking_uri("file:./mlruns")
+        log_search(best, trials, args.resource)
+
+
+if __name__ == "__main__":
+    main()
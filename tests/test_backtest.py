@@ -0,0 +1,83 @@
+# tests/test_backtest.py
+# Tests del backtesting walk-forward con matriz de features compartida
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.features.panel import build_panel_dataset
+from src.models.backtest import backtest, core_budget, walk_forward_folds
+from src.models.data_analysis import create_features
+
+
+def sample_dataset(days=700, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2010-01-01", periods=days, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, days)
+    return FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+
+class TestWalkForwardFolds(unittest.TestCase):
+    """Construcción de pliegues crecientes y deslizantes"""
+
+    def test_expanding_folds_cover_tail(self):
+        times = pd.date_range("2000-01-01", periods=1000, freq="D").to_numpy()
+        folds = walk_forward_folds(times, n_folds=4, test_fraction=0.3)
+        self.assertEqual(len(folds), 4)
+        self.assertEqual(folds[-1][3], 1000)
+        self.assertEqual(folds[0][2], 700)
+        for (train_start, train_end, test_start, test_end), following in zip(folds, folds[1:] + [None]):
+            self.assertEqual(train_start, 0)
+            self.assertEqual(train_end, test_start)
+            if following is not None:
+                self.assertEqual(test_end, following[2])
+
+    def test_sliding_with_gap(self):
+        times = pd.date_range("2000-01-01", periods=1000, freq="D").to_numpy()
+        folds = walk_forward_folds(times, n_folds=3, mode="sliding", train_days=200, gap_days=7)
+        for train_start, train_end, test_start, _ in folds:
+            self.assertEqual(train_end - train_start, 200)
+            self.assertEqual(test_start - train_end, 7)
+        with self.assertRaises(ValueError):
+            walk_forward_folds(times, mode="sliding")
+
+    def test_panel_days_not_split(self):
+        times = pd.date_range("2000-01-01", periods=400, freq="D").to_numpy()
+        values = np.random.default_rng(1).gamma(2.0, 50.0, (400, 3))
+        dataset = build_panel_dataset(times, values, np.arange(3))
+        for _, train_end, test_start, test_end in walk_forward_folds(dataset.time, n_folds=3):
+            self.assertLess(dataset.time[train_end - 1], dataset.time[test_start])
+            if test_end < len(dataset):
+                self.assertLess(dataset.time[test_end - 1], dataset.time[test_end])
+
+    def test_core_budget(self):
+        self.assertEqual(core_budget(8, n_folds=5), (5, 1))
+        self.assertEqual(core_budget(8, n_folds=2), (2, 4))
+        self.assertEqual(core_budget(1, n_folds=5), (1, 1))
+
+
+class TestBacktest(unittest.TestCase):
+    """Resultados por pliegue y serie fuera de muestra; pool y ruta serie coinciden"""
+
+    def test_parallel_matches_serial(self):
+        dataset = sample_dataset()
+        serial_metrics, serial_pred = backtest(dataset, n_folds=3, cores=1)
+        metrics, predictions = backtest(dataset, n_folds=3, cores=2)
+        self.assertEqual(len(metrics), 3)
+        np.testing.assert_allclose(metrics["mae"], serial_metrics["mae"])
+        np.testing.assert_allclose(predictions["caudal_pred"], serial_pred["caudal_pred"])
+        # Serie fuera de muestra: cada fila de prueba una sola vez, en orden temporal
+        self.assertEqual(len(predictions), metrics["n_test"].sum())
+        self.assertTrue(predictions["time"].is_monotonic_increasing)
+        self.assertEqual(list(predictions["fold"].unique()), [1, 2, 3])
+        self.assertLess(metrics["train_end"].iloc[0], metrics["test_start"].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# tests/test_baseflow.py
+# Tests de la separación de flujo base (Lyne–Hollick) y de su familia de features en la especificación
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.baseflow import lyne_hollick
+from src.features.panel import build_panel_dataset
+from src.features.spec import compile_spec
+from src.models.data_analysis import create_features
+
+
+def sample_matrix(days=400, reaches=4, seed=3):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2010-01-01", periods=days, freq="D")
+    # Recesiones exponenciales con crecidas aleatorias
+    values = np.empty((days, reaches))
+    values[0] = 50.0
+    for t in range(1, days):
+        values[t] = values[t - 1] * 0.97 + rng.exponential(3.0, reaches) * (rng.random(reaches) < 0.2) * 20
+    return times, values
+
+
+def reference_pass(series, alpha):
+    """Pasada hacia adelante del filtro de Lyne–Hollick, día a día y acotando el flujo rápido en cada paso"""
+    quick = 0.0
+    base = np.empty(len(series))
+    base[0] = series[0]
+    for t in range(1, len(series)):
+        quick = alpha * quick + (1 + alpha) / 2 * (series[t] - series[t - 1])
+        if quick < 0.0:
+            quick = 0.0
+        elif quick > series[t]:
+            quick = series[t]
+        base[t] = series[t] - quick
+    return base
+
+
+class TestLyneHollick(unittest.TestCase):
+    """Filtro vectorizado frente al bucle de referencia"""
+
+    def test_matches_loop_and_bounds(self):
+        _, values = sample_matrix(reaches=1)
+        base = lyne_hollick(values[:, 0], alpha=0.925)
+        np.testing.assert_allclose(base, reference_pass(values[:, 0], 0.925))
+        self.assertTrue((base >= 0).all() and (base <= values[:, 0] + 1e-9).all())
+
+    def test_clamped_state_feeds_recursion(self):
+        """Tras una caída fuerte el flujo rápido acotado a 0 reinicia la recursión (no arrastra el negativo)"""
+        series = np.array([10.0, 100.0, 10.0, 10.0, 30.0])
+        base = lyne_hollick(series, alpha=0.9)
+        np.testing.assert_allclose(base, reference_pass(series, 0.9))
+        # Día 2: flujo rápido acotado a 0 (sin acotar sería negativo); día 4: solo cuenta el aumento de 20
+        self.assertAlmostEqual(base[2], 10.0)
+        self.assertAlmostEqual(base[4], 30.0 - 0.95 * 20.0)
+
+    def test_all_reaches_at_once(self):
+        _, values = sample_matrix()
+        matrix = lyne_hollick(values, passes=3)
+        for col in range(values.shape[1]):
+            np.testing.assert_allclose(matrix[:, col], lyne_hollick(values[:, col], passes=3))
+
+    def test_forward_pass_is_causal(self):
+        _, values = sample_matrix(reaches=1)
+        changed = values[:, 0].copy()
+        changed[300:] *= 0.2
+        np.testing.assert_array_equal(lyne_hollick(values[:, 0])[:300], lyne_hollick(changed)[:300])
+        self.assertFalse(np.array_equal(lyne_hollick(values[:, 0], passes=3)[:300],
+                                        lyne_hollick(changed, passes=3)[:300]))
+
+
+class TestBaseflowFeatures(unittest.TestCase):
+    """Familia de flujo base en el plan de features"""
+
+    SPEC = {"baseflow": {"bfi_windows": [10], "recession": [5]}}
+
+    def test_columns_use_previous_day(self):
+        times, values = sample_matrix(reaches=1)
+        df = create_features(pd.DataFrame({"time": times, "caudal": values[:, 0]}), self.SPEC)
+        for col in ("caudal_baseflow_lag_1", "caudal_quickflow_lag_1", "caudal_bfi_10", "caudal_recession_5"):
+            self.assertIn(col, df.columns)
+        self.assertFalse(df.isna().any().any())
+        base = lyne_hollick(values[:, 0])
+        row = df.iloc[50]
+        t = int(np.flatnonzero(times == row["time"])[0])
+        self.assertAlmostEqual(row["caudal_baseflow_lag_1"], base[t - 1])
+        self.assertAlmostEqual(row["caudal_quickflow_lag_1"], values[t - 1, 0] - base[t - 1])
+        self.assertAlmostEqual(row["caudal_bfi_10"], base[t - 10:t].sum() / values[t - 10:t, 0].sum())
+        self.assertAlmostEqual(row["caudal_recession_5"], (np.log(base[t - 1]) - np.log(base[t - 6])) / 5)
+
+    def test_panel_matches_per_reach_with_gaps(self):
+        times, values = sample_matrix()
+        values[[100, 101], 1] = np.nan
+        values[250, 3] = np.nan
+        spec = dict(self.SPEC, baseflow={"bfi_windows": [45], "recession": [3]})
+        dataset = build_panel_dataset(times.to_numpy(), values, np.arange(4), spec)
+        self.assertFalse(np.isnan(dataset.X).any())
+        for col in range(4):
+            expected = create_features(pd.DataFrame({"time": times, "caudal": values[:, col]}), spec)
+            rows = dataset.comid == col
+            self.assertEqual(int(rows.sum()), len(expected))
+            np.testing.assert_allclose(dataset.X[rows], expected[dataset.feature_names].to_numpy(dtype="float32"),
+                                       rtol=1e-5, atol=1e-4)
+
+    def test_default_spec_unchanged_and_validation(self):
+        self.assertIsNone(compile_spec().baseflow)
+        self.assertEqual(compile_spec({"baseflow": True}).span, 91)
+        with self.assertRaises(ValueError):
+            compile_spec({"baseflow": {"alpha": 1.5}})
+
+
+if __name__ == '__main__':
+    unittest.main()
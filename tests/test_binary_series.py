@@ -0,0 +1,73 @@
+# tests/test_binary_series.py
+# Tests del formato binario memmap para series diarias
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import binary_series as bs
+from src.models.data_analysis import create_features
+
+
+class TestBinarySeries(unittest.TestCase):
+    """Tests de conversión, carga sin copia y anexado"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        times = pd.date_range("2015-01-01", periods=400, freq="D")
+        self.csv = self.dir / "620883808_retrospective_data.csv"
+        pd.DataFrame({"time": times.strftime("%Y-%m-%d"),
+                      "620883808": np.random.rand(400) * 50 + 10}).to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_is_zero_copy(self):
+        """El frame cargado comparte memoria con el memmap y conserva el eje diario"""
+        path = bs.csv_to_binary(self.csv, 620883808, self.dir / "a.f32")
+        header = bs.read_header(path)
+        self.assertEqual((header["comid"], header["length"]), (620883808, 400))
+        self.assertEqual(path.stat().st_size, bs.HEADER_SIZE + 400 * 4)
+
+        df = bs.load_frame(path=path)
+        base = df["caudal"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = getattr(base, "base", None)
+        self.assertIsInstance(base, np.memmap)
+        self.assertEqual(df["time"].iloc[-1], pd.Timestamp("2016-02-04"))
+        expected = pd.read_csv(self.csv)["620883808"].to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(df["caudal"].to_numpy(), expected)
+
+    def test_date_range_and_gaps(self):
+        """Los huecos se rellenan con NaN y los rangos se resuelven por índice"""
+        df = pd.read_csv(self.csv).drop(index=[10, 11])
+        df.columns = ["time", "caudal"]
+        path = bs.frame_to_binary(df, 1, self.dir / "b.f32")
+        full = bs.load_frame(path=path)
+        self.assertEqual(len(full), 400)
+        self.assertEqual(int(full["caudal"].isna().sum()), 2)
+
+        part = bs.load_frame(path=path, start="2015-01-05", end="2015-01-09")
+        self.assertEqual(list(part["time"].dt.day), [5, 6, 7, 8, 9])
+
+    def test_append_and_feature_shape(self):
+        """Anexar extiende la cabecera y el frame sirve directamente a create_features"""
+        path = bs.csv_to_binary(self.csv, 620883808, self.dir / "c.f32")
+        self.assertEqual(bs.append_values(path, [1.0, 2.0, 3.0]), 403)
+        df = bs.load_frame(path=path)
+        self.assertEqual(df["caudal"].iloc[-1], 3.0)
+        features = create_features(df)
+        self.assertIn("caudal_rolling_std_30", features.columns)
+        self.assertEqual(len(features), 403 - 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_bulk_download.py
+# Tests del descargador concurrente contra un servidor HTTP local (sin red externa)
+
+import unittest
+import tempfile
+import threading
+import time
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import download_retrospective as dr
+from src.data import raw_store
+from src.data.bulk_download import HttpClient, run_bulk
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Imita /retrospective/{comid}; falla la primera solicitud de cada COMID con 503"""
+
+    protocol_version = "HTTP/1.1"
+    failed_once = set()
+    connections = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        comid = self.path.split("?")[0].rstrip("/").split("/")[-1]
+        with self.lock:
+            self.connections.add(self.client_address)
+            first = comid not in self.failed_once
+            self.failed_once.add(comid)
+        if first:
+            self._send(503, b"")
+            return
+        times = pd.date_range("2020-01-01", periods=20, freq="D").strftime("%Y-%m-%d")
+        body = "time,{0}\n".format(comid) + "".join(f"{t},{i}.5\n" for i, t in enumerate(times))
+        self._send(200, body.encode("utf-8"))
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBulkDownload(unittest.TestCase):
+    """Tests del descargador masivo"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInHandler.failed_once.clear()
+        StandInHandler.connections.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self._old = (dr.BASE_DIR, dr.SYNC_STATE_PATH, dr.RETROSPECTIVE_URL, raw_store.STORE_DIR)
+        dr.BASE_DIR = Path(self.tmp.name)
+        raw_store.STORE_DIR = dr.BASE_DIR / "store"
+        dr.SYNC_STATE_PATH = dr.BASE_DIR / "sync_state.json"
+        dr.RETROSPECTIVE_URL = self.base_url + "/retrospective/{comid}"
+
+    def tearDown(self):
+        dr.BASE_DIR, dr.SYNC_STATE_PATH, dr.RETROSPECTIVE_URL, raw_store.STORE_DIR = self._old
+        self.tmp.cleanup()
+
+    def test_many_comids_with_retry(self):
+        """Todas las series se descargan pese a un 503 inicial por COMID"""
+        segmentos = [(f"rio_{c}", c) for c in range(100, 112)]
+        client = HttpClient(pool_size=4, retries=2, backoff=0.01)
+        summary = dr.sync_many_retrospective(segmentos, max_workers=4, client=client)
+        client.close()
+
+        self.assertEqual(len(summary["ok"]), 12)
+        self.assertFalse(summary["failed"])
+        self.assertEqual(client.stats["retries"], 12)
+        state = dr.load_sync_state()
+        self.assertEqual(len(state), 12)
+        df = pd.read_csv(dr.retrospective_path(105))
+        self.assertEqual(len(df), 20)
+
+    def test_connections_are_reused(self):
+        """Un solo worker reutiliza una única conexión keep-alive"""
+        with HttpClient(pool_size=1, retries=0) as client:
+            for comid in range(5):
+                StandInHandler.failed_once.add(str(comid))
+                self.assertEqual(client.get(f"{self.base_url}/x/{comid}").status_code, 200)
+        self.assertEqual(len(StandInHandler.connections), 1)
+
+    def test_rate_limit_per_host(self):
+        """El limitador espacia las solicitudes al mismo host"""
+        for comid in range(6):
+            StandInHandler.failed_once.add(str(comid))
+        client = HttpClient(pool_size=3, rate_per_host=20, retries=0)
+        tasks = [(c, lambda c=c: client.get(f"{self.base_url}/x/{c}")) for c in range(6)]
+        start = time.perf_counter()
+        summary = run_bulk(tasks, max_workers=3)
+        elapsed = time.perf_counter() - start
+        client.close()
+        self.assertEqual(len(summary["ok"]), 6)
+        self.assertGreaterEqual(elapsed, 5 / 20 * 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
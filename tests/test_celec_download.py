@@ -0,0 +1,125 @@
+# tests/test_celec_download.py
+# Tests del ingestor CELEC pointValues contra un servidor HTTP local
+
+import unittest
+import tempfile
+import threading
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import celec_download as cd
+from src.data import raw_store
+from src.data.bulk_download import HttpClient
+
+
+class PointValuesHandler(BaseHTTPRequestHandler):
+    """Imita ORDS pointValues: valores horarios entre fechaInicio y fechaFin, 10 por página"""
+
+    protocol_version = "HTTP/1.1"
+    page_size = 10
+    # Inicio de ventana que responde con error (simula una falla del servidor)
+    fail_start = None
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        start = pd.Timestamp(query["fechaInicio"][0]).tz_convert(None)
+        end = pd.Timestamp(query["fechaFin"][0]).tz_convert(None)
+        if start == self.fail_start:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        offset = int(query.get("offset", ["0"])[0])
+        hours = pd.date_range(start, end, freq="h")
+        items = [{"mrid": int(query["mrid"][0]), "fecha": t.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                  "valor": float(t.hour)} for t in hours]
+        page = items[offset:offset + self.page_size]
+        body = json.dumps({"items": page, "hasMore": offset + self.page_size < len(items)}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCelecDownload(unittest.TestCase):
+    """Tests de ventanas paralelas, fusión y persistencia"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), PointValuesHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/sardomcsr/pointValues"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._old = (cd.POINT_VALUES_URL, raw_store.STORE_DIR)
+        cd.POINT_VALUES_URL = self.url
+        raw_store.STORE_DIR = Path(self.tmp.name)
+
+    def tearDown(self):
+        cd.POINT_VALUES_URL, raw_store.STORE_DIR = self._old
+        PointValuesHandler.fail_start = None
+        self.tmp.cleanup()
+
+    def test_split_windows(self):
+        """Las ventanas cubren el rango sin huecos y la última se recorta al fin"""
+        windows = cd.split_windows("2025-01-01", "2025-01-10 12:00", "3D")
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[-1][1], pd.Timestamp("2025-01-10 12:00"))
+
+    def test_parallel_backfill_persists_and_resumes(self):
+        """Backfill paralelo con paginación, persistencia y continuación incremental"""
+        with HttpClient(pool_size=4, retries=0) as client:
+            df, summary = cd.backfill_point(30031, start="2025-07-01", end="2025-07-04",
+                                            max_workers=4, client=client)
+            self.assertFalse(summary["failed"])
+            self.assertEqual(len(df), 72)
+            self.assertTrue(df["time"].is_monotonic_increasing)
+
+            df, _ = cd.backfill_point(30031, end="2025-07-05", client=client)
+            self.assertEqual(df["time"].min(), pd.Timestamp("2025-07-04"))
+
+        stored = raw_store.read_series(30031, dataset=cd.DATASET)
+        self.assertEqual(len(stored), 96)
+        self.assertTrue(stored["time"].is_unique)
+        self.assertEqual(list(stored.columns), ["time", "valor"])
+
+    def test_failed_window_is_retried(self):
+        """Una ventana fallida no deja hueco: se persiste el prefijo y la siguiente ejecución la reintenta"""
+        PointValuesHandler.fail_start = pd.Timestamp("2025-07-02")
+        with HttpClient(pool_size=4, retries=0) as client:
+            _, summary = cd.backfill_point(30031, start="2025-07-01", end="2025-07-04", max_workers=4,
+                                           client=client, use_cache=False)
+            self.assertTrue(summary["failed"])
+            self.assertEqual(summary["resume_from"], pd.Timestamp("2025-07-02"))
+            self.assertEqual(raw_store.last_time(30031, dataset=cd.DATASET), pd.Timestamp("2025-07-01 23:00"))
+
+            PointValuesHandler.fail_start = None
+            df, summary = cd.backfill_point(30031, end="2025-07-04", client=client)
+            self.assertFalse(summary["failed"])
+            self.assertEqual(df["time"].min(), pd.Timestamp("2025-07-02"))
+
+        stored = raw_store.read_series(30031, dataset=cd.DATASET)
+        self.assertEqual(len(stored), 72)
+        self.assertEqual(stored["time"].diff().dropna().unique().tolist(), [pd.Timedelta(hours=1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# tests/test_climatology.py
+# Tests del índice climatológico por día del año y de las features de anomalía
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import raw_store
+from src.features.climatology import (ClimatologyIndex, PERCENTILES, climatology_features, climatology_path,
+                                      update_climatology)
+from src.models.data_analysis import add_climatology_features, create_features
+
+
+def sample_series(years=20, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("1990-01-01", periods=365 * years, freq="D")
+    values = np.exp(rng.normal(5 + np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365), 0.4))
+    return times.to_numpy(), values
+
+
+def window_sample(times, values, doy, half=7):
+    days = pd.DatetimeIndex(times).dayofyear.to_numpy() - 1
+    distance = np.abs(days - doy)
+    return values[np.minimum(distance, 366 - distance) <= half]
+
+
+class TestClimatologyIndex(unittest.TestCase):
+    """Tablas por día del año frente al cálculo directo sobre la ventana suavizada"""
+
+    def setUp(self):
+        self.times, self.values = sample_series()
+        self.index = ClimatologyIndex()
+        self.index.update(self.times, self.values)
+
+    def test_mean_std_and_percentiles(self):
+        sample = window_sample(self.times, self.values, doy=120)
+        tables = self.index.tables
+        self.assertAlmostEqual(tables["mean"][120], sample.mean(), places=6)
+        self.assertAlmostEqual(tables["std"][120], sample.std(ddof=1), places=6)
+        # Percentiles desde el histograma logarítmico: error relativo acotado por el ancho del bin (~4%);
+        # en las colas (p1, p99) pesan además los pocos valores de la ventana
+        exact = np.percentile(sample, PERCENTILES)
+        np.testing.assert_allclose(tables["percentiles"][120][1:-1], exact[1:-1], rtol=0.04)
+        np.testing.assert_allclose(tables["percentiles"][120][[0, -1]], exact[[0, -1]], rtol=0.1)
+
+    def test_lookups_and_flags(self):
+        day = np.array(["2000-05-01"], dtype="datetime64[ns]")
+        p10, p90 = self.index.threshold(day, 10)[0], self.index.threshold(day, 90)[0]
+        self.assertAlmostEqual(self.index.percentile(day, [p10])[0], 10, delta=0.5)
+        self.assertAlmostEqual(self.index.percentile(day, [p90])[0], 90, delta=0.5)
+        drought, flood = self.index.flags(np.repeat(day, 3), [p10 * 0.8, (p10 + p90) / 2, p90 * 1.2])
+        np.testing.assert_array_equal(drought, [True, False, False])
+        np.testing.assert_array_equal(flood, [False, False, True])
+        self.assertTrue(np.isnan(self.index.percentile(day, [np.nan])[0]))
+
+    def test_incremental_update_equals_full_build(self):
+        half = len(self.times) // 2
+        index = ClimatologyIndex()
+        index.update(self.times[:half], self.values[:half])
+        # Repetir días ya contados no los duplica
+        index.update(self.times[half - 10:], self.values[half - 10:])
+        np.testing.assert_array_equal(index.counts, self.index.counts)
+        np.testing.assert_allclose(index.tables["mean"], self.index.tables["mean"])
+
+    def test_store_update_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root, directory = Path(tmp) / "store", Path(tmp) / "clim"
+            raw_store.write_series(pd.DataFrame({"time": self.times, "caudal": self.values}), 5, root=root)
+            update_climatology(5, end=pd.Timestamp(self.times[1000]), root=root, directory=directory)
+            index = update_climatology(5, root=root, directory=directory)
+            self.assertTrue(climatology_path(5, directory).exists())
+            self.assertEqual(index.last_time, pd.Timestamp(self.times[-1]))
+            np.testing.assert_array_equal(index.counts, self.index.counts)
+
+
+class TestClimatologyFeatures(unittest.TestCase):
+    """Features de anomalía con el valor del día anterior e índice del período de entrenamiento"""
+
+    def test_features_use_previous_day(self):
+        times, values = sample_series(years=5)
+        index = ClimatologyIndex()
+        index.update(times, values)
+        features = climatology_features(index, times, values)
+        self.assertTrue(features.iloc[0, 2:].isna().all())
+        expected = index.percentile(times[99:100], values[99:100])[0]
+        self.assertAlmostEqual(features["caudal_pct_lag_1"].iloc[100], expected)
+        changed = values.copy()
+        changed[100] *= 10
+        np.testing.assert_array_equal(climatology_features(index, times, changed).iloc[100],
+                                      features.iloc[100])
+
+    def test_pipeline_index_ignores_test_period(self):
+        times, values = sample_series(years=10)
+        df = pd.DataFrame({"time": times, "caudal": values})
+        base = add_climatology_features(df)
+        shifted = df.copy()
+        split = df["time"].quantile(0.7)
+        shifted.loc[shifted["time"] >= split, "caudal"] *= 3
+        other = add_climatology_features(shifted)
+        np.testing.assert_allclose(base["caudal_clim_mean"], other["caudal_clim_mean"])
+
+    def test_previous_day_by_date_after_gap(self):
+        """Tras un hueco descartado por create_features el día anterior es el real (como caudal_lag_1)"""
+        times, values = sample_series(years=6)
+        df = pd.DataFrame({"time": times, "caudal": values})
+        df.loc[1000:1019, "caudal"] = np.nan
+        features = create_features(df)
+        jump = int(np.flatnonzero(np.diff(features["time"].to_numpy()) > np.timedelta64(1, "D"))[0]) + 1
+        out = add_climatology_features(features, series=df)
+        index = ClimatologyIndex()
+        train = features["time"] < features["time"].quantile(0.7)
+        index.update(features.loc[train, "time"].to_numpy(), features.loc[train, "caudal"].to_numpy())
+        prev_times = out["time"].to_numpy() - np.timedelta64(1, "D")
+        np.testing.assert_allclose(out["caudal_pct_lag_1"], index.percentile(prev_times, out["caudal_lag_1"]))
+        self.assertFalse(np.isnan(out["caudal_anom_lag_1"].iloc[jump]))
+        # Sin la serie completa el día anterior descartado queda faltante, no se toma uno semanas antes
+        alone = add_climatology_features(features)
+        self.assertTrue(np.isnan(alone["caudal_anom_lag_1"].iloc[jump]))
+        np.testing.assert_allclose(alone["caudal_anom_lag_1"].iloc[jump + 1], out["caudal_anom_lag_1"].iloc[jump + 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_dataset.py
+# Tests del dataset float32 respaldado por arreglos y sus divisiones temporales sin copia
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.features.spec import compile_spec
+from src.models.data_analysis import (create_features, train_test_split_temporal, prepare_ml_data,
+                                      train_model, evaluate_model)
+
+
+def sample_features(days=600, seed=0):
+    times = pd.date_range("2015-01-01", periods=days, freq="D")
+    flows = np.random.default_rng(seed).gamma(2.0, 50.0, days)
+    return create_features(pd.DataFrame({"time": times, "caudal": flows}))
+
+
+class TestFeatureDataset(unittest.TestCase):
+    """Tests de construcción, vistas y compatibilidad con train/evaluate"""
+
+    def test_from_frame_is_contiguous_float32(self):
+        df = sample_features()
+        ds = FeatureDataset.from_frame(df)
+        self.assertEqual(ds.X.dtype, np.float32)
+        self.assertTrue(ds.X.flags["C_CONTIGUOUS"])
+        X, y, names = prepare_ml_data(df)
+        self.assertEqual(ds.feature_names, names)
+        np.testing.assert_allclose(ds.X, X.to_numpy(dtype="float64"), rtol=1e-6)
+
+    def test_split_is_view_and_matches_dataframe_split(self):
+        df = sample_features()
+        ds = FeatureDataset.from_frame(df)
+        train, test = ds.split_temporal(0.3)
+        train_df, test_df = train_test_split_temporal(df, 0.3)
+        self.assertEqual((len(train), len(test)), (len(train_df), len(test_df)))
+        self.assertTrue(np.shares_memory(train.X, ds.X) and np.shares_memory(test.X, ds.X))
+        self.assertIsNotNone(train.X.base)
+        self.assertEqual(test.start, test_df["time"].min())
+
+    def test_from_plan_matches_from_frame(self):
+        times = pd.date_range("2015-01-01", periods=600, freq="D")
+        flows = np.random.default_rng(0).gamma(2.0, 50.0, 600)
+        direct = FeatureDataset.from_plan(compile_spec(), times.to_numpy(), flows)
+        via_frame = FeatureDataset.from_frame(sample_features())
+        np.testing.assert_array_equal(direct.X, via_frame.X)
+        np.testing.assert_array_equal(direct.time, via_frame.time)
+
+    def test_concat_orders_by_time(self):
+        a = FeatureDataset.from_frame(sample_features(seed=1).assign(comid=1))
+        b = FeatureDataset.from_frame(sample_features(seed=2).assign(comid=2))
+        both = FeatureDataset.concat([a, b])
+        self.assertEqual(len(both), len(a) + len(b))
+        self.assertTrue((np.diff(both.time) >= np.timedelta64(0)).all())
+        self.assertEqual(sorted(set(both.comid.tolist())), [1, 2])
+        self.assertNotIn("comid", both.feature_names)
+
+    def test_train_and_evaluate_accept_dataset(self):
+        train, test = FeatureDataset.from_frame(sample_features(400)).split_temporal(0.3)
+        model = train_model(train)
+        y_pred, importance = evaluate_model(model, test)
+        self.assertEqual(len(y_pred), len(test))
+        self.assertEqual(list(importance["feature"].sort_values()), sorted(train.feature_names))
+
+
+if __name__ == '__main__':
+    unittest.main()
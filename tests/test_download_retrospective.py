@@ -0,0 +1,147 @@
+# tests/test_download_retrospective.py
+# Tests de la sincronización incremental de datos retrospectivos (sin red)
+
+import unittest
+import tempfile
+import io
+import os
+import sys
+from pathlib import Path
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import download_retrospective as dr
+from src.data import raw_store
+from src.data.streaming import ingest_csv_stream
+
+
+class FakeResponse:
+    """Respuesta HTTP mínima con el contrato usado por los descargadores"""
+
+    def __init__(self, text, status_code=200):
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=1):
+        # Bloques pequeños para ejercitar el reensamblado de líneas
+        for i in range(0, len(self.content), 7):
+            yield self.content[i:i + 7]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeSession:
+    """Sesión que sirve una serie diaria y registra los parámetros pedidos"""
+
+    def __init__(self, df, support_start=True):
+        self.df = df
+        self.support_start = support_start
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        params = params or {}
+        self.calls.append(params)
+        df = self.df
+        if "start_date" in params:
+            if not self.support_start:
+                return FakeResponse("", status_code=400)
+            df = df[pd.to_datetime(df["time"]) >= pd.Timestamp(params["start_date"])]
+        return FakeResponse(df.to_csv(index=False))
+
+
+def make_series(start, periods):
+    """Serie diaria sintética con el formato de GeoGLOWS"""
+    times = pd.date_range(start, periods=periods, freq="D")
+    return pd.DataFrame({"time": times.strftime("%Y-%m-%d"), "620883808": range(periods)})
+
+
+class TestIncrementalSync(unittest.TestCase):
+    """Tests de sincronización incremental"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._old_base = dr.BASE_DIR
+        self._old_state = dr.SYNC_STATE_PATH
+        self._old_store = raw_store.STORE_DIR
+        dr.BASE_DIR = Path(self.tmp.name)
+        raw_store.STORE_DIR = dr.BASE_DIR / "store"
+        dr.SYNC_STATE_PATH = dr.BASE_DIR / "sync_state.json"
+
+    def tearDown(self):
+        dr.BASE_DIR = self._old_base
+        dr.SYNC_STATE_PATH = self._old_state
+        raw_store.STORE_DIR = self._old_store
+        self.tmp.cleanup()
+
+    def test_appends_only_missing_tail(self):
+        """Solo se piden y anexan los días posteriores al último guardado"""
+        session = FakeSession(make_series("2020-01-01", 10))
+        self.assertTrue(dr.sync_retrospective_data(620883808, "rio", session=session))
+
+        session.df = make_series("2020-01-01", 13)
+        self.assertTrue(dr.sync_retrospective_data(620883808, "rio", session=session))
+        self.assertEqual(session.calls[-1]["start_date"], "20200111")
+
+        df = pd.read_csv(dr.retrospective_path(620883808))
+        self.assertEqual(len(df), 13)
+        self.assertTrue(df["time"].is_unique)
+        stored = raw_store.read_series(620883808)
+        self.assertEqual(list(stored["caudal"]), list(range(13)))
+        state = dr.load_sync_state()["620883808"]
+        self.assertEqual(state["last_time"][:10], "2020-01-13")
+        self.assertEqual(state["rows"], 13)
+
+    def test_fallback_to_full_fetch(self):
+        """Si el endpoint no acepta start_date se descarga todo y se deduplica"""
+        session = FakeSession(make_series("2020-01-01", 5), support_start=False)
+        dr.sync_retrospective_data(620883808, "rio", session=session)
+        session.df = make_series("2020-01-01", 8)
+        dr.sync_retrospective_data(620883808, "rio", session=session)
+
+        df = pd.read_csv(dr.retrospective_path(620883808))
+        self.assertEqual(list(df["620883808"]), list(range(8)))
+
+    def test_truncates_uncommitted_append(self):
+        """Bytes anexados sin confirmar en el estado se descartan"""
+        session = FakeSession(make_series("2020-01-01", 5))
+        dr.sync_retrospective_data(620883808, "rio", session=session)
+        with open(dr.retrospective_path(620883808), "a") as f:
+            f.write("2020-01-0")
+
+        session.df = make_series("2020-01-01", 6)
+        dr.sync_retrospective_data(620883808, "rio", session=session)
+        df = pd.read_csv(dr.retrospective_path(620883808))
+        self.assertEqual(len(df), 6)
+
+
+class TestStreamingIngest(unittest.TestCase):
+    """Tests de la ingesta en streaming"""
+
+    def test_single_pass_stats_and_dedupe(self):
+        """Las estadísticas salen de la misma pasada y los duplicados se descartan"""
+        body = b"time,1\n2020-01-01,1.0\n2020-01-02,3.0\n2020-01-02,3.0\n2020-01-03,\n2020-01-04,5.0"
+        chunks = [body[i:i + 5] for i in range(0, len(body), 5)]
+        out = io.BytesIO()
+        header, stats = ingest_csv_stream(chunks, out)
+
+        self.assertEqual(header, ["time", "1"])
+        self.assertEqual(stats.rows, 4)
+        self.assertEqual(stats.skipped, 1)
+        self.assertEqual(stats.nulls, 1)
+        self.assertAlmostEqual(stats.flow_mean, 3.0)
+        self.assertEqual((stats.flow_min, stats.flow_max), (1.0, 5.0))
+        df = pd.read_csv(io.BytesIO(out.getvalue()))
+        self.assertEqual(len(df), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
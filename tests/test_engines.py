@@ -0,0 +1,73 @@
+# tests/test_engines.py
+# Tests de los motores de modelo intercambiables y las líneas base
+
+import unittest
+import os
+import sys
+import io
+import joblib
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features, train_model, evaluate_model, load_model_params
+from src.models.engines import ENGINES, HGB_PARAMS, make_model
+
+
+def sample_dataset(days=800, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2012-01-01", periods=days, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, days)
+    return FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+
+class TestEngines(unittest.TestCase):
+    """Despacho por nombre en train_model/evaluate_model"""
+
+    def test_all_engines_train_and_evaluate(self):
+        train, test = sample_dataset().split_temporal(0.3)
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                model = train_model(train, n_jobs=1, engine=engine)
+                y_pred, importance = evaluate_model(model, test)
+                self.assertEqual(y_pred.shape, (len(test),))
+                self.assertTrue(np.isfinite(y_pred).all())
+                self.assertAlmostEqual(importance["importance"].sum(), 1.0, places=6)
+                # Persistible igual que el Random Forest (models/trained_model.pkl)
+                buffer = io.BytesIO()
+                joblib.dump(model, buffer)
+                buffer.seek(0)
+                np.testing.assert_allclose(joblib.load(buffer).predict(test.X), y_pred)
+
+    def test_baselines(self):
+        train, test = sample_dataset().split_temporal(0.3)
+        persistence = train_model(train, engine="persistence")
+        lag = test.feature_names.index("caudal_lag_1")
+        np.testing.assert_allclose(persistence.predict(test.X), test.X[:, lag])
+        climatology = train_model(train, engine="climatology")
+        doy = test.X[:, test.feature_names.index("dayofyear")].astype(int)
+        same_day = climatology.predict(test.X)
+        self.assertEqual(len(np.unique(same_day[doy == doy[0]])), 1)
+        # Las líneas base necesitan los nombres de las features
+        with self.assertRaises(ValueError):
+            train_model(train.X, train.y, engine="persistence")
+
+    def test_gradient_boosting_handles_missing(self):
+        train, test = sample_dataset().split_temporal(0.3)
+        X = train.X.copy()
+        X[::7, 0] = np.nan
+        model = train_model(X, train.y, engine="hist_gradient_boosting", params={"max_iter": 50})
+        self.assertEqual(model.model.max_iter, 50)
+        self.assertEqual(len(model.predict(test.X)), len(test))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            make_model("xgboost")
+        self.assertEqual(load_model_params("missing.json", engine="hist_gradient_boosting"), HGB_PARAMS)
+
+
+if __name__ == '__main__':
+    unittest.main()
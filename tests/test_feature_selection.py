@@ -0,0 +1,123 @@
+# tests/test_feature_selection.py
+# Tests de la poda de features por importancia
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.spec import compile_spec
+from src.features.selection import load_importance, select_features, prune_spec
+from src.models import data_analysis
+from src.models.data_analysis import create_features, profile_model, train_model, keep_exogenous
+
+
+def sample_frame(days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"time": pd.date_range("2015-01-01", periods=days, freq="D"),
+                         "caudal": rng.gamma(2.0, 50.0, days)})
+
+
+IMPORTANCE = pd.DataFrame({
+    "feature": ["caudal_lag_1", "caudal_rolling_mean_3", "month_sin", "caudal_rolling_std_7", "fc_median_h1", "year"],
+    "importance": [0.5, 0.2, 0.15, 0.1, 0.04, 0.01],
+})
+
+
+class TestFeatureSelection(unittest.TestCase):
+    """Selección top-k / acumulada y especificación podada"""
+
+    def test_top_k_and_cumulative(self):
+        shuffled = IMPORTANCE.sample(frac=1, random_state=1)
+        self.assertEqual(select_features(shuffled, top_k=2), ["caudal_lag_1", "caudal_rolling_mean_3"])
+        self.assertEqual(select_features(shuffled, cumulative=0.85),
+                         ["caudal_lag_1", "caudal_rolling_mean_3", "month_sin"])
+        self.assertEqual(len(select_features(shuffled, cumulative=1.0)), 6)
+        with self.assertRaises(ValueError):
+            select_features(shuffled)
+        with self.assertRaises(ValueError):
+            select_features(shuffled, top_k=2, cumulative=0.5)
+
+    def test_load_importance_from_previous_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "feature_importance.csv"
+            IMPORTANCE.iloc[::-1].to_csv(path, index=False)
+            loaded = load_importance(path)
+        self.assertEqual(loaded["feature"].iloc[0], "caudal_lag_1")
+
+    def test_pruned_plan_computes_only_selected(self):
+        spec, exogenous = prune_spec(select_features(IMPORTANCE, top_k=5))
+        self.assertEqual(exogenous, ["fc_median_h1"])
+        plan = compile_spec(spec)
+        self.assertEqual(plan.columns, ["month_sin", "caudal_lag_1", "caudal_rolling_mean_3",
+                                        "caudal_rolling_std_7"])
+        self.assertEqual(plan.span, 7)
+        df = sample_frame()
+        pruned = create_features(df, spec)
+        full = create_features(df)
+        # Menos calentamiento (ventana máxima 7) y mismas columnas en las filas comunes
+        self.assertEqual(len(pruned), len(df) - 6)
+        common = pruned.merge(full[["time"] + plan.columns], on="time", suffixes=("", "_full"))
+        for col in plan.columns:
+            np.testing.assert_allclose(common[col], common[f"{col}_full"])
+
+    def test_pruning_keeps_engine_columns(self):
+        """La poda conserva la columna que lee la línea base aunque no esté entre las más importantes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "feature_importance.csv"
+            IMPORTANCE.to_csv(path, index=False)
+            spec, _ = data_analysis.pruning_selection(top_k=2, source=path, engine="climatology")
+            default, _ = data_analysis.pruning_selection(top_k=2, source=path)
+        self.assertIn("dayofyear", spec["features"])
+        self.assertNotIn("dayofyear", default["features"])
+        features = create_features(sample_frame(), spec)
+        X = features.drop(columns=["time", "caudal"])
+        model = train_model(X.to_numpy(), features["caudal"].to_numpy(), engine="climatology",
+                            feature_names=list(X.columns))
+        self.assertEqual(len(model.predict(X.to_numpy())), len(X))
+
+    def test_unknown_selected_feature(self):
+        with self.assertRaises(ValueError):
+            compile_spec({"features": ["caudal_lag_99"]})
+
+    def test_keep_exogenous_and_profile(self):
+        df = sample_frame().assign(fc_median_h1=1.0, fc_upper_h2=2.0)
+        self.assertEqual(list(keep_exogenous(df, ["fc_median_h1"]).columns), ["time", "caudal", "fc_median_h1"])
+        features = create_features(sample_frame())
+        X = features.drop(columns=["time", "caudal"]).to_numpy()
+        model = train_model(X, features["caudal"].to_numpy())
+        profile = profile_model(model, X, features["caudal"].to_numpy(), train_s=1.0)
+        self.assertEqual(profile["n_features"], X.shape[1])
+        self.assertGreater(profile["model_mb"], 0)
+        self.assertGreater(profile["latency_ms"], 0)
+
+    def test_pruned_results_do_not_replace_reference(self):
+        """Una ejecución podada escribe su importancia aparte: la de referencia sigue siendo la completa"""
+        test_df = sample_frame(days=5)
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(data_analysis, "PROC_DIR", Path(tmp)):
+            data_analysis.save_results(test_df, test_df["caudal"], IMPORTANCE)
+            data_analysis.save_results(test_df, test_df["caudal"], IMPORTANCE.head(2), data_analysis.PRUNED_SUFFIX)
+            self.assertEqual(len(load_importance(Path(tmp) / "feature_importance.csv")), len(IMPORTANCE))
+            self.assertEqual(len(load_importance(Path(tmp) / "feature_importance_pruned.csv")), 2)
+
+    def test_only_default_run_replaces_deployed_model(self):
+        """Otros motores, la poda o el multi-horizonte no sobrescriben el Random Forest desplegado"""
+        deployed = data_analysis.MODELS_DIR / "trained_model.pkl"
+        self.assertEqual(data_analysis.model_path(), deployed)
+        paths = {data_analysis.model_path("climatology"),
+                 data_analysis.model_path(suffix=data_analysis.PRUNED_SUFFIX),
+                 data_analysis.model_path(horizons=tuple(range(1, 16)))}
+        self.assertEqual(len(paths), 3)
+        self.assertNotIn(deployed, paths)
+        self.assertIn(data_analysis.MODELS_DIR / "trained_model_random_forest_pruned.pkl", paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
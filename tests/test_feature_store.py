@@ -0,0 +1,102 @@
+# tests/test_feature_store.py
+# Tests del almacén de features direccionado por contenido
+
+import unittest
+import tempfile
+import inspect
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features import feature_store
+from src.features.feature_store import FeatureStore, feature_key
+from src.models.data_analysis import create_features
+
+
+def sample_data(days=200, seed=0):
+    times = pd.date_range("2020-01-01", periods=days, freq="D")
+    return pd.DataFrame({"time": times, "caudal": np.random.default_rng(seed).random(days) * 100})
+
+
+class TestFeatureStore(unittest.TestCase):
+    """Tests de aciertos, invalidación y desalojo LRU"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_returns_identical_matrix(self):
+        """La segunda ejecución sobre la misma entrada es un acierto con la misma matriz"""
+        store = FeatureStore(self.dir)
+        first = store.get_or_compute(sample_data(), create_features)
+        second = store.get_or_compute(sample_data(), create_features)
+        pd.testing.assert_frame_equal(first, second, check_dtype=False)
+        self.assertEqual(store.stats["misses"], 1)
+        self.assertEqual(store.stats["hits"], 1)
+
+        # Otro proceso (otra instancia) ve la matriz y los totales acumulados
+        other = FeatureStore(self.dir)
+        other.get_or_compute(sample_data(), create_features)
+        self.assertEqual(other.stats["hits"], 1)
+        self.assertEqual(other._index["totals"]["hits"], 2)
+
+    def test_changes_invalidate_key(self):
+        """Cambiar un valor crudo, la configuración o la función cambia la clave"""
+        df = sample_data()
+        key = feature_key(df, create_features)
+        changed = df.copy()
+        changed.loc[10, "caudal"] += 1.0
+        self.assertNotEqual(key, feature_key(changed, create_features))
+        self.assertNotEqual(key, feature_key(df, create_features, {"lags": [1, 2]}))
+        self.assertNotEqual(key, feature_key(df, lambda d: d))
+        self.assertEqual(key, feature_key(sample_data(), create_features))
+
+    def test_called_code_invalidates_key(self):
+        """Cambiar el código de un módulo llamado (p. ej. baseflow) o FEATURE_VERSION cambia la clave"""
+        df = sample_data()
+        key = feature_key(df, create_features)
+        getsource = inspect.getsource
+
+        def edited(obj):
+            source = getsource(obj)
+            return source + "\n# cambio" if getattr(obj, "__name__", "") == "src.features.baseflow" else source
+
+        try:
+            with mock.patch("inspect.getsource", side_effect=edited):
+                feature_store.code_fingerprint.cache_clear()
+                self.assertNotEqual(key, feature_key(df, create_features))
+            feature_store.code_fingerprint.cache_clear()
+            with mock.patch.object(feature_store, "FEATURE_VERSION", feature_store.FEATURE_VERSION + 1):
+                self.assertNotEqual(key, feature_key(df, create_features))
+        finally:
+            feature_store.code_fingerprint.cache_clear()
+        self.assertEqual(key, feature_key(df, create_features))
+
+    def test_lru_eviction_by_size(self):
+        """Al superar el presupuesto se desaloja la matriz menos usada"""
+        store = FeatureStore(self.dir, max_bytes=10 ** 9)
+        for seed in range(3):
+            store.get_or_compute(sample_data(seed=seed), create_features)
+        sizes = [e["size"] for e in store._index["entries"].values()]
+        store.get_or_compute(sample_data(seed=0), create_features)
+
+        small = FeatureStore(self.dir, max_bytes=sum(sizes) - 1)
+        small.get_or_compute(sample_data(seed=3), create_features)
+        self.assertGreaterEqual(small.stats["evicted"], 1)
+        self.assertEqual(len(list(self.dir.glob("*.parquet"))), len(small._index["entries"]))
+        # La más reciente (seed=0) sobrevive; la más antigua no usada (seed=1) se desaloja
+        self.assertIn(feature_key(sample_data(seed=0), create_features), small._index["entries"])
+        self.assertNotIn(feature_key(sample_data(seed=1), create_features), small._index["entries"])
+
+
+if __name__ == '__main__':
+    unittest.main()
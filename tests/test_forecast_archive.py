@@ -0,0 +1,78 @@
+# tests/test_forecast_archive.py
+# Tests del archivo consolidado de pronósticos y consultas as-of
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import forecast_archive as fa
+
+
+def make_forecast(issue, offset=0.0):
+    """Pronóstico ancho sintético de 15 días cada 3 horas"""
+    valid = pd.date_range(issue, periods=15 * 8, freq="3h")
+    base = np.arange(len(valid), dtype=float) + offset
+    return pd.DataFrame({"datetime": valid.strftime("%Y-%m-%d %H:%M:%S"), "flow_median": base,
+                         "flow_uncertainty_upper": base + 1, "flow_uncertainty_lower": base - 1})
+
+
+class TestForecastArchive(unittest.TestCase):
+    """Tests de importación, índice por emisión y consultas as-of"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "store"
+        self.raw = Path(self.tmp.name) / "geoglows"
+        self.raw.mkdir()
+        for day in range(25, 36):
+            issue = pd.Timestamp("2025-01-01") + pd.Timedelta(days=day)
+            make_forecast(issue, offset=day).to_csv(
+                self.raw / f"rio_620883808_forecast_direct_{issue:%Y%m%d}.csv", index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_and_index_across_months(self):
+        """La importación crea un archivo por mes y un índice ordenado por emisión"""
+        self.assertEqual(fa.import_directory(self.raw, root=self.root), 11)
+        issues = fa.issues(620883808, root=self.root)
+        self.assertEqual(len(issues), 11)
+        self.assertEqual(issues, sorted(issues))
+        files = sorted(p.name for p in fa.archive_dir(620883808, root=self.root).glob("*.parquet"))
+        self.assertEqual(files, ["month=202501.parquet", "month=202502.parquet"])
+
+    def test_as_of_returns_latest_issue_before_cutoff(self):
+        """as_of devuelve la emisión más reciente anterior al corte y filtra por valid_time"""
+        fa.import_directory(self.raw, root=self.root)
+        df = fa.as_of(620883808, "2025-02-03 12:00", root=self.root)
+        self.assertEqual(df["issue_time"].iloc[0], pd.Timestamp("2025-02-03"))
+
+        strict = fa.as_of(620883808, "2025-02-03", inclusive=False, root=self.root)
+        self.assertEqual(strict["issue_time"].iloc[0], pd.Timestamp("2025-02-02"))
+
+        point = fa.as_of(620883808, "2025-02-03", valid_time="2025-02-05", stats=["flow_median"],
+                         root=self.root)
+        self.assertEqual(len(point), 1)
+        # Emisión del día 33 (2025-02-03): 2 días * 8 pasos + offset 33
+        self.assertAlmostEqual(point["value"].iloc[0], 16 + 33)
+        self.assertIsNone(fa.as_of(620883808, "2024-12-31", root=self.root))
+
+    def test_reissue_replaces_row_group(self):
+        """Reingresar una emisión la reemplaza sin duplicar entradas del índice"""
+        issue = pd.Timestamp("2025-01-30")
+        fa.append_forecast(make_forecast(issue), 1, issue, root=self.root)
+        fa.append_forecast(make_forecast(issue, offset=100), 1, issue, root=self.root)
+        self.assertEqual(len(fa.issues(1, root=self.root)), 1)
+        df = fa.read_issue(1, issue, root=self.root, stats=["flow_median"])
+        self.assertEqual(df["value"].min(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
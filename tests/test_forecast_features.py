@@ -0,0 +1,110 @@
+# tests/test_forecast_features.py
+# Tests de las features exógenas del pronóstico y del cruce as-of sin fuga de información
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import forecast_archive as fa
+from src.features import forecast
+
+COMID = 620883808
+
+
+def make_forecast(issue, offset=0.0):
+    """Pronóstico ancho de 15 días cada 3 horas: el valor del día de anticipación L es offset + L"""
+    valid = pd.date_range(issue, periods=15 * 8, freq="3h")
+    lead = np.arange(len(valid)) // 8 + 1 + offset
+    return pd.DataFrame({"datetime": valid.strftime("%Y-%m-%d %H:%M:%S"), "flow_median": lead,
+                         "flow_uncertainty_upper": lead + 1, "flow_uncertainty_lower": lead - 1})
+
+
+class TestForecastFeatures(unittest.TestCase):
+    """Resumen por emisión, tabla incremental y cruce as-of"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for day in (0, 1, 2, 5):
+            issue = pd.Timestamp("2025-01-30") + pd.Timedelta(days=day)
+            fa.append_forecast(make_forecast(issue, offset=100 * day), COMID, issue, root=self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_summary_per_lead_day(self):
+        table = forecast.forecast_table(COMID, root=self.root)
+        self.assertEqual(len(table), 4)
+        first = table.iloc[0]
+        # Cada estadístico se resume por separado (no se mezclan como miembros de un ensamble)
+        self.assertAlmostEqual(first["median_l1"], 1.0)
+        self.assertAlmostEqual(first["median_l15"], 15.0)
+        self.assertAlmostEqual(first["lower_l3"], 2.0)
+        self.assertAlmostEqual(first["upper_l3"], 4.0)
+
+    def test_summary_is_daily_mean_per_stat(self):
+        issue = pd.Timestamp("2025-01-30")
+        long = fa.to_long(make_forecast(issue), issue)
+        long.loc[long["valid_time"] == issue + pd.Timedelta(hours=3), "value"] += 8.0
+        long = pd.concat([long, long.head(8).assign(stat="flow_avg", value=-1.0)], ignore_index=True)
+        table = forecast.summarize_issues(long)
+        # Un paso de 3 h alterado en 8 mueve la media diaria de cada estadístico en 1; flow_avg se ignora
+        self.assertAlmostEqual(table.iloc[0]["median_l1"], 2.0)
+        self.assertAlmostEqual(table.iloc[0]["upper_l1"], 3.0)
+        self.assertAlmostEqual(table.iloc[0]["lower_l1"], 1.0)
+        self.assertAlmostEqual(table.iloc[0]["median_l2"], 2.0)
+
+    def test_table_is_incremental(self):
+        forecast.forecast_table(COMID, root=self.root)
+        issue = pd.Timestamp("2025-02-07")
+        fa.append_forecast(make_forecast(issue, offset=900), COMID, issue, root=self.root)
+        table = forecast.forecast_table(COMID, root=self.root)
+        self.assertEqual(len(table), 5)
+        self.assertAlmostEqual(table.iloc[-1]["median_l1"], 901.0)
+        # Reemplazo de una emisión ya resumida: se recalcula por el cambio de su archivo mensual
+        issue = pd.Timestamp("2025-02-01")
+        fa.append_forecast(make_forecast(issue, offset=500), COMID, issue, root=self.root)
+        table = forecast.forecast_table(COMID, root=self.root).set_index("issue_time")
+        self.assertAlmostEqual(table.loc[issue, "median_l1"], 501.0)
+
+    def test_as_of_join_uses_only_past_issues(self):
+        times = pd.date_range("2025-01-29", "2025-02-20", freq="D")
+        df = pd.DataFrame({"time": times, "caudal": 1.0})
+        out = forecast.add_forecast_features(df, COMID, root=self.root).set_index("time")
+        # Antes de la primera emisión disponible (30 ene + 1 día de latencia) no hay pronóstico
+        self.assertTrue(out.loc[:"2025-01-30", "fc_median_h1"].isna().all())
+        # 31 ene: emisión del 30 ene, el día objetivo es su día de anticipación 2
+        self.assertEqual(out.loc["2025-01-31", "fc_age_days"], 1)
+        self.assertAlmostEqual(out.loc["2025-01-31", "fc_median_h1"], 2.0)
+        self.assertAlmostEqual(out.loc["2025-01-31", "fc_upper_h3"], 5.0)
+        # 4 feb: la emisión del 4 feb no es visible todavía, se usa la del 1 feb (offset 200)
+        self.assertEqual(out.loc["2025-02-04", "fc_age_days"], 3)
+        self.assertAlmostEqual(out.loc["2025-02-04", "fc_median_h1"], 204.0)
+        # Horizonte que sale de los 15 días de la emisión
+        self.assertTrue(np.isnan(out.loc["2025-02-04", "fc_median_h15"]))
+        self.assertTrue(out.loc["2025-02-05", ["fc_median_h1", "fc_age_days"]].notna().all())
+
+    def test_no_issue_issued_after_row(self):
+        """Propiedad anti-fuga: la emisión elegida siempre es anterior al día en al menos la latencia"""
+        table = forecast.forecast_table(COMID, root=self.root)
+        times = pd.date_range("2025-01-25", "2025-03-01", freq="D").to_numpy()
+        matrix, names = forecast.join_forecast(times, table)
+        age = matrix[:, names.index("fc_age_days")]
+        self.assertTrue((age[~np.isnan(age)] >= 1).all())
+
+    def test_empty_archive(self):
+        df = pd.DataFrame({"time": pd.date_range("2025-01-01", periods=5, freq="D"), "caudal": 1.0})
+        out = forecast.add_forecast_features(df, 1, root=self.root)
+        self.assertEqual(len(out.columns), 2 + len(forecast.feature_columns()))
+        self.assertTrue(out["fc_median_h1"].isna().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
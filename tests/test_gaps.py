@@ -0,0 +1,96 @@
+# tests/test_gaps.py
+# Tests de la etapa de huecos (malla regular, interpolación de huecos cortos y máscara de largos)
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features import gaps
+from src.models.data_analysis import create_features
+
+
+def series_with_gaps():
+    times = pd.date_range("2020-01-01", periods=60, freq="D")
+    df = pd.DataFrame({"time": times, "caudal": np.arange(60, dtype="float64") + 10})
+    # Hueco corto (2 días) y hueco largo (6 días)
+    return df.drop(index=[5, 6] + list(range(30, 36))).reset_index(drop=True)
+
+
+class TestGaps(unittest.TestCase):
+    """Tests de detección, relleno y formato panel"""
+
+    def test_short_gap_filled_long_gap_masked(self):
+        """Los huecos cortos se interpolan sobre la malla diaria y los largos quedan NaN"""
+        out, report = gaps.fill_gaps(series_with_gaps(), max_gap=3)
+        self.assertEqual(len(out), 60)
+        np.testing.assert_allclose(out["caudal"].iloc[5:7], [15.0, 16.0])
+        self.assertTrue(out["caudal"].iloc[30:36].isna().all())
+        self.assertEqual(report["gaps"], 2)
+        self.assertEqual(report["filled_steps"], 2)
+        self.assertEqual(report["masked_steps"], 6)
+        self.assertEqual(list(report["runs"]["action"]), ["filled", "masked"])
+        self.assertEqual(report["runs"]["start"].iloc[1], pd.Timestamp("2020-01-31"))
+
+    def test_fill_methods(self):
+        """ffill y nearest usan los vecinos válidos del hueco"""
+        values = np.array([1.0, np.nan, np.nan, 4.0])
+        ffill, filled, _ = gaps.fill_matrix(values, method="ffill")
+        nearest, _, _ = gaps.fill_matrix(values, method="nearest")
+        np.testing.assert_allclose(ffill, [1, 1, 1, 4])
+        np.testing.assert_allclose(nearest, [1, 1, 4, 4])
+        self.assertEqual(filled.tolist(), [False, True, True, False])
+
+    def test_edges_are_not_gaps(self):
+        """Los NaN antes del primer dato o después del último no se rellenan"""
+        values, filled, masked = gaps.fill_matrix(np.array([np.nan, 1.0, np.nan, 3.0, np.nan]))
+        np.testing.assert_allclose(values[1:4], [1, 2, 3])
+        self.assertTrue(np.isnan(values[0]) and np.isnan(values[4]))
+        self.assertEqual(int(filled.sum()), 1)
+        self.assertEqual(int(masked.sum()), 0)
+
+    def test_panel_matches_per_comid(self):
+        """El panel vectorizado equivale a procesar cada COMID por separado"""
+        a = series_with_gaps()
+        b = series_with_gaps().iloc[10:].assign(caudal=lambda d: d["caudal"] * 2)
+        panel = pd.concat([b.assign(comid=2), a.assign(comid=1)], ignore_index=True)
+        out, report = gaps.fill_gaps_panel(panel)
+        for comid, part in ((1, a), (2, b)):
+            expected, _ = gaps.fill_gaps(part)
+            got = out[out["comid"] == comid].reset_index(drop=True)
+            pd.testing.assert_series_equal(got["time"], expected["time"], check_dtype=False)
+            np.testing.assert_allclose(got["caudal"], expected["caudal"])
+        self.assertEqual(sorted(report["runs"]["comid"].unique()), [1, 2])
+
+    def test_duplicates_keep_last(self):
+        """Con marcas de tiempo repetidas gana la última lectura"""
+        df = pd.DataFrame({"time": pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-02"]),
+                           "caudal": [1.0, 2.0, 5.0]})
+        out, _ = gaps.fill_gaps(df)
+        np.testing.assert_allclose(out["caudal"], [1.0, 5.0])
+
+    def test_features_keep_rows_around_short_gaps(self):
+        """Un NaN aislado ya no elimina las ~30 filas cuyas ventanas lo incluyen"""
+        times = pd.date_range("2020-01-01", periods=120, freq="D")
+        raw = pd.DataFrame({"time": times, "caudal": np.arange(120, dtype="float64")})
+        raw.loc[60, "caudal"] = np.nan
+        before = create_features(raw.copy())
+        filled, _ = gaps.fill_gaps(raw)
+        after = create_features(filled)
+        self.assertEqual(len(after), 120 - 30)
+        self.assertEqual(len(before), 120 - 30 - 31)
+
+    def test_lags_use_regular_grid(self):
+        """Con la malla regular el lag de 1 día es el día calendario anterior"""
+        times = pd.date_range("2020-01-01", periods=80, freq="D")
+        raw = pd.DataFrame({"time": times, "caudal": np.arange(80, dtype="float64")}).drop(index=[40, 41])
+        features = create_features(gaps.fill_gaps(raw)[0])
+        self.assertEqual(len(features), 50)
+        self.assertTrue((features["caudal_lag_1"] == features["caudal"] - 1).all())
+
+if __name__ == '__main__':
+    unittest.main()
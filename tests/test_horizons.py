@@ -0,0 +1,97 @@
+# tests/test_horizons.py
+# Tests del pronóstico directo multi-horizonte con un único modelo multi-salida
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.features.horizons import add_horizon_targets, embargo_rows, horizon_columns, horizon_frame, horizon_targets
+from src.models.data_analysis import create_features, train_model, evaluate_model, horizon_metrics
+
+HORIZONS = (1, 2, 3, 5)
+
+
+def sample_series(days=700, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2011-01-01", periods=days, freq="D")
+    # Ruido con memoria de unos días: los primeros horizontes son más predecibles que los lejanos
+    noise = np.convolve(rng.normal(0, 40, days), np.ones(5) / 5, mode="same")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + noise
+    return pd.DataFrame({"time": times, "caudal": caudal})
+
+
+class TestHorizonTargets(unittest.TestCase):
+    """Objetivos por fecha: el horizonte k de la fila t es el caudal del día t + k"""
+
+    def test_targets_by_date(self):
+        series = sample_series(30)
+        matrix = horizon_targets(series["time"], series["time"], series["caudal"], HORIZONS)
+        # h1 es el día siguiente: el caudal del día t (ya presente en las ventanas móviles) no es objetivo
+        np.testing.assert_allclose(matrix[:-1, 0], series["caudal"].to_numpy()[1:])
+        self.assertTrue(np.isnan(matrix[-1, 0]))
+        np.testing.assert_allclose(matrix[:-5, 3], series["caudal"].to_numpy()[5:])
+        self.assertTrue(np.isnan(matrix[-5:, 3]).all())
+
+    def test_dropped_rows_do_not_shift_targets(self):
+        series = sample_series(60)
+        rows = series.drop(index=[10, 11, 12]).reset_index(drop=True)
+        df = add_horizon_targets(rows, series, horizons=HORIZONS)
+        # Los días descartados siguen disponibles como objetivo desde la serie fuente
+        row = df[df["time"] == series["time"][9]].iloc[0]
+        self.assertAlmostEqual(row["caudal_h1"], series["caudal"][10])
+        self.assertAlmostEqual(row["caudal_h3"], series["caudal"][12])
+        self.assertEqual(len(df), len(rows) - 5)
+        self.assertEqual(list(df.columns[-4:]), horizon_columns(horizons=HORIZONS))
+
+    def test_embargo_and_long_frame(self):
+        times = pd.date_range("2020-01-01", periods=20, freq="D").to_numpy()
+        # La fila 10 (10 ene) tiene su objetivo h5 el 16 ene, primer día de prueba
+        self.assertEqual(embargo_rows(times[:15], times[15], HORIZONS), 10)
+        frame = horizon_frame(times[:2], np.arange(8).reshape(2, 4), HORIZONS)
+        self.assertEqual(frame["target_time"].iloc[0], pd.Timestamp("2020-01-02"))
+        self.assertEqual(frame["target_time"].iloc[3], pd.Timestamp("2020-01-06"))
+        self.assertEqual(frame["horizon"].tolist(), [1, 2, 3, 5, 1, 2, 3, 5])
+
+
+class TestMultiHorizonModel(unittest.TestCase):
+    """Un solo ajuste multi-salida y métricas por horizonte"""
+
+    def test_single_fit_predicts_vector(self):
+        series = sample_series()
+        df = add_horizon_targets(create_features(series), series, horizons=HORIZONS)
+        dataset = FeatureDataset.from_frame(df, target_cols=horizon_columns(horizons=HORIZONS))
+        self.assertEqual(dataset.y.shape[1], len(HORIZONS))
+        self.assertFalse(set(dataset.target_cols) & set(dataset.feature_names))
+        train, test = dataset.split_temporal(0.3)
+        self.assertEqual(test.target_cols, dataset.target_cols)
+        model = train_model(train, params={"n_estimators": 20})
+        self.assertEqual(len(model.estimators_), 20)
+        y_pred, importance = evaluate_model(model, test)
+        self.assertEqual(y_pred.shape, (len(test), len(HORIZONS)))
+        metrics = horizon_metrics(test.y, y_pred, test.target_cols)
+        self.assertEqual(metrics["target"].tolist(), dataset.target_cols)
+        # El error crece con la anticipación
+        self.assertLess(metrics["mae"].iloc[0], metrics["mae"].iloc[-1])
+        np.testing.assert_allclose(test.frame()["caudal"], test.y[:, 0])
+
+    def test_baselines_and_single_output_engines(self):
+        series = sample_series()
+        df = add_horizon_targets(create_features(series), series, horizons=HORIZONS)
+        train, test = FeatureDataset.from_frame(df, target_cols=horizon_columns(horizons=HORIZONS)).split_temporal()
+        persistence = train_model(train, engine="persistence").predict(test.X)
+        self.assertEqual(persistence.shape, (len(test), len(HORIZONS)))
+        np.testing.assert_allclose(persistence[:, 0], persistence[:, -1])
+        climatology = train_model(train, engine="climatology").predict(test.X)
+        self.assertEqual(climatology.shape, (len(test), len(HORIZONS)))
+        with self.assertRaises(ValueError):
+            train_model(train, engine="hist_gradient_boosting")
+
+
+if __name__ == '__main__':
+    unittest.main()
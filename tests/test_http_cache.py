@@ -0,0 +1,101 @@
+# tests/test_http_cache.py
+# Tests de la caché HTTP en disco con solicitudes condicionales (servidor local)
+
+import unittest
+import tempfile
+import threading
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.bulk_download import HttpClient
+from src.data.http_cache import HttpCache
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Sirve un cuerpo por ruta con ETag y responde 304 si el validador coincide"""
+
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        body = (self.path * 200).encode("utf-8")
+        etag = '"v-%d"' % len(body)
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpCache(unittest.TestCase):
+    """Tests de revalidación, TTL y desalojo LRU"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ETagHandler.requests_seen.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_conditional_request_served_from_disk(self):
+        """Con TTL vencido se envía If-None-Match y el 304 se sirve desde la copia local"""
+        cache = HttpCache(self.tmp.name, ttls=[])
+        with HttpClient(cache=cache, retries=0) as client:
+            first = client.get(self.base_url + "/forecast/1").content
+            second = client.get(self.base_url + "/forecast/1")
+        self.assertEqual(second.content, first)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(ETagHandler.requests_seen[-1][1], '"v-%d"' % len(first))
+        self.assertEqual(cache.stats["revalidated"], 1)
+
+    def test_ttl_skips_network(self):
+        """Dentro del TTL del endpoint no se consulta la red; el índice persiste en disco"""
+        with HttpClient(cache=HttpCache(self.tmp.name, ttls=[(r"/forecast/", 3600)]), retries=0) as client:
+            client.get(self.base_url + "/forecast/2").content
+        cache = HttpCache(self.tmp.name, ttls=[(r"/forecast/", 3600)])
+        with HttpClient(cache=cache, retries=0) as client:
+            response = client.get(self.base_url + "/forecast/2")
+        self.assertEqual(len(ETagHandler.requests_seen), 1)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(response.content, ("/forecast/2" * 200).encode("utf-8"))
+
+    def test_lru_eviction_by_size(self):
+        """Al superar max_bytes se desaloja la entrada menos usada"""
+        cache = HttpCache(self.tmp.name, max_bytes=1500, ttls=[(r".", 3600)])
+        with HttpClient(cache=cache, retries=0) as client:
+            client.get(self.base_url + "/aa")
+            client.get(self.base_url + "/bb")
+            client.get(self.base_url + "/aa")
+            client.get(self.base_url + "/cc")
+        kept = {entry["url"].rsplit("/", 1)[-1] for entry in cache._index.values()}
+        self.assertEqual(kept, {"aa", "cc"})
+        self.assertEqual(cache.stats["evicted"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
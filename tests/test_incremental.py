@@ -0,0 +1,149 @@
+# tests/test_incremental.py
+# Tests del reentrenamiento incremental (warm start) con reajuste completo periódico
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features, train_model
+from src.models.incremental import (daily_update, grow_forest, load_state, log_retrain, refit_reason, retrain,
+                                   save_state, window_rows)
+
+PARAMS = {"n_estimators": 20, "max_depth": 10, "random_state": 0}
+
+
+def sample_dataset(days=900, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2012-01-01", periods=days, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, days)
+    return FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+
+class TestGrowForest(unittest.TestCase):
+    """Árboles nuevos con warm_start y retiro de los más antiguos"""
+
+    def test_bounded_ensemble_keeps_newest(self):
+        dataset = sample_dataset()
+        model = train_model(dataset, params=PARAMS)
+        kept = model.estimators_[5:]
+        retired = grow_forest(model, dataset.X[-300:], dataset.y[-300:], add_trees=5, max_trees=20, seed=1)
+        self.assertEqual(retired, 5)
+        self.assertEqual(len(model.estimators_), 20)
+        self.assertEqual(model.n_estimators, 20)
+        self.assertTrue(all(a is b for a, b in zip(model.estimators_[:15], kept)))
+        self.assertFalse(model.warm_start)
+        self.assertEqual(len(model.predict(dataset.X[:10])), 10)
+
+    def test_new_seeds_after_retiring(self):
+        dataset = sample_dataset()
+        model = train_model(dataset, params=PARAMS)
+        grow_forest(model, dataset.X, dataset.y, add_trees=3, seed=1)
+        first = [tree.random_state for tree in model.estimators_[-3:]]
+        grow_forest(model, dataset.X, dataset.y, add_trees=3, seed=2)
+        self.assertFalse(set(first) & {tree.random_state for tree in model.estimators_[-3:]})
+
+    def test_window_rows(self):
+        times = pd.date_range("2020-01-01", periods=100, freq="D").to_numpy()
+        self.assertEqual(window_rows(times, 30), 70)
+
+
+class TestRetrain(unittest.TestCase):
+    """Cadencia del reajuste completo y estado persistido"""
+
+    def test_cadence(self):
+        train, _ = sample_dataset().split_temporal(0.3)
+        model, state, summary = retrain(train, mode="auto", today="2024-01-01", params=PARAMS)
+        self.assertEqual(summary["mode"], "full")
+        self.assertEqual(state["last_full_refit"], "2024-01-01")
+
+        model, state, summary = retrain(train, model, state, today="2024-01-03", add_trees=4,
+                                        window_days=200, params=PARAMS)
+        self.assertEqual(summary["mode"], "incremental")
+        self.assertEqual((summary["trees_added"], summary["trees_retired"], summary["n_trees"]), (4, 4, 20))
+        self.assertEqual(summary["window_rows"], 200)
+        self.assertEqual(state["updates"], 1)
+
+        self.assertIsNotNone(refit_reason(model, state, train.feature_names, "2024-01-08"))
+        model, state, summary = retrain(train, model, state, today="2024-01-08", params=PARAMS)
+        self.assertEqual(summary["mode"], "full")
+        self.assertEqual(state["updates"], 0)
+
+    def test_incompatible_model_forces_full(self):
+        train, _ = sample_dataset().split_temporal(0.3)
+        model, state, _ = retrain(train, today="2024-01-01", params=PARAMS)
+        state["feature_names"] = state["feature_names"][:-1]
+        self.assertEqual(refit_reason(model, state, train.feature_names, "2024-01-02"), "cambiaron las features")
+        with self.assertRaises(ValueError):
+            retrain(train, None, {}, mode="incremental", params=PARAMS)
+
+    def test_log_retrain_tracks_delta(self):
+        import mlflow
+        train, _ = sample_dataset().split_temporal(0.3)
+        _, state, summary = retrain(train, today="2024-01-01", params=PARAMS)
+        state.update(full_mae=10.0, full_train_s=summary["train_s"])
+        with tempfile.TemporaryDirectory() as tmp:
+            mlflow.set_tracking_uri(f"sqlite:///{tmp}/mlflow.db")
+            try:
+                run_id = log_retrain(summary, {"mae": 10.5, "rmse": 12.0, "r2": 0.9}, state, PARAMS,
+                                     experiment="test_incremental")
+                run = mlflow.tracking.MlflowClient().get_run(run_id)
+                self.assertAlmostEqual(run.data.metrics["mae_delta_vs_full"], 0.5)
+                self.assertEqual(run.data.params["mode"], "full")
+            finally:
+                mlflow.set_tracking_uri(None)
+
+    def test_state_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "training_state.json")
+            self.assertEqual(load_state(path), {})
+            save_state({"last_full_refit": "2024-01-01", "updates": 2}, path)
+            self.assertEqual(load_state(path)["updates"], 2)
+
+
+
+class TestDailyUpdate(unittest.TestCase):
+    """Actualización diaria sobre el dataset completo con holdout móvil"""
+
+    def test_window_ends_at_last_timestamp(self):
+        dataset = sample_dataset()
+        n = len(dataset)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "holdout.csv")
+            model, state, summary, holdout, metrics = daily_update(dataset.rows(0, n - 10), mode="auto",
+                                                                   today="2024-01-01", params=PARAMS,
+                                                                   holdout_path=path)
+            self.assertEqual(summary["window_end"], dataset.rows(0, n - 10).end)
+            self.assertTrue(holdout.empty)
+            self.assertEqual(metrics, {})
+            # Primera ejecución: el archivo del holdout existe aunque esté vacío (lo valida el DAG)
+            self.assertTrue(pd.read_csv(path).empty)
+
+            # Llegan 10 días: el modelo anterior los predice (fuera de muestra) y luego se entrena con ellos
+            model, state, summary, holdout, metrics = daily_update(dataset, model, state, today="2024-01-02",
+                                                                   window_days=200, params=PARAMS,
+                                                                   holdout_path=path)
+            self.assertEqual(summary["mode"], "incremental")
+            self.assertEqual(summary["window_end"], dataset.end)
+            self.assertEqual(summary["window_start"], dataset.end - pd.Timedelta(days=199))
+            self.assertEqual(state["trained_until"], str(dataset.end))
+            np.testing.assert_array_equal(holdout["time"].to_numpy(), dataset.time[-10:])
+            self.assertEqual(set(holdout["mode"]), {"full"})
+            self.assertEqual(metrics["holdout_days"], 10)
+            self.assertAlmostEqual(state["full_mae"], metrics["mae_full"])
+
+            # Sin días nuevos el holdout acumulado se conserva y no se vuelve a predecir
+            _, _, _, again, _ = daily_update(dataset, model, state, today="2024-01-03", window_days=200,
+                                             params=PARAMS, holdout_path=path)
+            self.assertEqual(len(again), 10)
+            self.assertEqual(set(again["mode"]), {"full"})
+
+
+if __name__ == '__main__':
+    unittest.main()
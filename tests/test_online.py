@@ -0,0 +1,109 @@
+# tests/test_online.py
+# Tests de equivalencia del estado incremental de lags/ventanas con create_features
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import raw_store
+from src.features import online
+from src.models.data_analysis import create_features
+
+
+def sample_series(days=3000, seed=0):
+    times = pd.date_range("2010-01-01", periods=days, freq="D")
+    flows = np.random.default_rng(seed).gamma(2.0, 50.0, days)
+    return pd.DataFrame({"time": times, "caudal": flows})
+
+
+class TestOnlineFeatures(unittest.TestCase):
+    """La actualización incremental reproduce la salida por lotes"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_matches_batch(self, got, df):
+        expected = create_features(df.copy())
+        self.assertEqual(list(got.columns), list(expected.columns))
+        self.assertEqual(len(got), len(expected))
+        for col in expected.columns:
+            if col == "time":
+                self.assertTrue((got[col].to_numpy() == expected[col].to_numpy()).all())
+            else:
+                np.testing.assert_allclose(got[col].to_numpy(dtype="float64"),
+                                           expected[col].to_numpy(dtype="float64"), rtol=1e-9, atol=1e-9,
+                                           err_msg=col)
+
+    def test_full_history_matches_create_features(self):
+        """Recorrer toda la historia día a día da las mismas filas y valores"""
+        df = sample_series()
+        engine = online.OnlineFeatureEngine(self.dir / "state.json")
+        self.assert_matches_batch(engine.update_frame(1, df), df)
+
+    def test_nan_resets_like_dropna(self):
+        """Un NaN invalida las filas cuyas ventanas lo incluyen, igual que el dropna por lotes"""
+        df = sample_series(400)
+        df.loc[[100, 250, 251], "caudal"] = np.nan
+        engine = online.OnlineFeatureEngine(self.dir / "state.json")
+        self.assert_matches_batch(engine.update_frame(1, df), df)
+
+    def test_persisted_state_continues_incrementally(self):
+        """Guardar, recargar y seguir con días nuevos equivale al cálculo completo"""
+        df = sample_series(2500)
+        path = self.dir / "state.json"
+        engine = online.OnlineFeatureEngine(path)
+        first = engine.update_frame(7, df.iloc[:2000])
+        engine.save()
+
+        reloaded = online.OnlineFeatureEngine(path)
+        self.assertEqual(reloaded.last_time(7), df["time"].iloc[1999])
+        rest = [reloaded.update(7, t, v) for t, v in zip(df["time"].iloc[2000:], df["caudal"].iloc[2000:])]
+        got = pd.concat([first, pd.DataFrame(rest)], ignore_index=True)
+        self.assert_matches_batch(got, df)
+
+    def test_out_of_order_rejected(self):
+        state = online.OnlineFeatureState()
+        state.update("2020-01-02", 1.0)
+        with self.assertRaises(ValueError):
+            state.update("2020-01-01", 1.0)
+
+    def test_update_from_store_reads_only_new_days(self):
+        """Arranque en caliente desde la cola del almacén y luego solo los días nuevos"""
+        df = sample_series(800)
+        root = self.dir / "store"
+        raw_store.write_series(df.iloc[:700], 5, root=root)
+        path = self.dir / "state.json"
+        frames = online.update_from_store([5], path=path, root=root)
+        self.assertEqual(len(frames[5]), 1)
+
+        raw_store.write_series(df.iloc[700:], 5, root=root)
+        frames = online.update_from_store([5], path=path, root=root)
+        self.assertEqual(len(frames[5]), 100)
+        expected = create_features(raw_store.read_series(5, root=root).astype({"caudal": "float64"}))
+        np.testing.assert_allclose(frames[5]["caudal_rolling_std_30"], expected["caudal_rolling_std_30"].iloc[-100:],
+                                   rtol=1e-9)
+
+    def test_update_from_store_without_series(self):
+        """Un COMID sin serie guardada no rompe la actualización ni crea estado"""
+        root = self.dir / "store"
+        raw_store.write_series(sample_series(100), 5, root=root)
+        path = self.dir / "state.json"
+        frames = online.update_from_store([7, 5], path=path, root=root)
+        self.assertTrue(frames[7].empty)
+        self.assertEqual(len(frames[5]), 1)
+        self.assertIsNone(online.OnlineFeatureEngine(path).last_time(7))
+
+
+if __name__ == '__main__':
+    unittest.main()
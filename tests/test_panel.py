@@ -0,0 +1,79 @@
+# tests/test_panel.py
+# Tests del motor de features en panel (muchos tramos a la vez)
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import raw_store
+from src.features.panel import build_panel_dataset, panel_from_long, load_panel
+from src.models.data_analysis import create_features, train_model
+
+
+def sample_matrix(days=400, reaches=5, seed=0):
+    times = pd.date_range("2012-01-01", periods=days, freq="D")
+    values = np.random.default_rng(seed).gamma(2.0, 50.0, (days, reaches))
+    return times, values
+
+
+class TestPanelFeatures(unittest.TestCase):
+    """El panel equivale a create_features tramo por tramo"""
+
+    def assert_matches_per_reach(self, dataset, times, values, comids):
+        for col, comid in enumerate(comids):
+            expected = create_features(pd.DataFrame({"time": times, "caudal": values[:, col]}))
+            rows = dataset.comid == comid
+            self.assertEqual(int(rows.sum()), len(expected))
+            np.testing.assert_array_equal(dataset.time[rows], expected["time"].to_numpy())
+            np.testing.assert_allclose(dataset.y[rows], expected["caudal"].to_numpy())
+            np.testing.assert_allclose(dataset.X[rows], expected[dataset.feature_names].to_numpy(dtype="float32"),
+                                       rtol=1e-5, atol=1e-4)
+
+    def test_matrix_panel_matches_create_features(self):
+        times, values = sample_matrix()
+        values[[50, 51], 1] = np.nan
+        values[200, 3] = np.nan
+        comids = np.array([11, 12, 13, 14, 15])
+        dataset = build_panel_dataset(times.to_numpy(), values, comids)
+        self.assertTrue((np.diff(dataset.time) >= np.timedelta64(0)).all())
+        self.assert_matches_per_reach(dataset, times, values, comids)
+
+    def test_long_format_with_different_spans(self):
+        """Tramos con fechas distintas y huecos cortos rellenados antes de calcular"""
+        times, values = sample_matrix(reaches=2)
+        a = pd.DataFrame({"comid": 1, "time": times, "caudal": values[:, 0]})
+        b = pd.DataFrame({"comid": 2, "time": times[100:], "caudal": values[100:, 1]}).drop(index=[150])
+        dataset = panel_from_long(pd.concat([b, a], ignore_index=True))
+        filled_b = values[:, 1].copy()
+        filled_b[:100] = np.nan
+        filled_b[250] = (values[249, 1] + values[251, 1]) / 2
+        self.assert_matches_per_reach(dataset, times, np.column_stack([values[:, 0], filled_b]), [1, 2])
+
+    def test_split_views_and_training(self):
+        times, values = sample_matrix(days=300, reaches=3)
+        dataset = build_panel_dataset(times.to_numpy(), values, np.array([1, 2, 3]))
+        train, test = dataset.split_temporal(0.3)
+        self.assertTrue(np.shares_memory(train.X, dataset.X))
+        self.assertLess(train.time[-1], test.time[0])
+        model = train_model(train)
+        self.assertEqual(len(model.predict(test.X)), len(test))
+
+    def test_load_panel_from_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            times, values = sample_matrix(days=100, reaches=2)
+            for col, comid in enumerate((7, 8)):
+                raw_store.write_series(pd.DataFrame({"time": times, "caudal": values[:, col]}), comid, root=tmp)
+            df = load_panel([7, 8], root=Path(tmp))
+            self.assertEqual(sorted(df["comid"].unique()), [7, 8])
+            self.assertEqual(len(panel_from_long(df)), 2 * (100 - 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
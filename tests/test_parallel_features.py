@@ -0,0 +1,94 @@
+# tests/test_parallel_features.py
+# Tests del cálculo de features en panel con pool de procesos y memoria compartida
+
+import unittest
+import gc
+import os
+import sys
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.panel import build_panel_dataset
+from src.features import parallel
+from src.features.parallel import build_panel, build_panel_parallel
+
+
+def sample_matrix(days=300, reaches=7, seed=1):
+    times = pd.date_range("2015-01-01", periods=days, freq="D").to_numpy()
+    values = np.random.default_rng(seed).gamma(2.0, 50.0, (days, reaches))
+    return times, values
+
+
+class FailingPool:
+    """Pool sustituto cuyo trabajo falla (como un worker que lanza una excepción)"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, *iterables):
+        raise RuntimeError("worker caído")
+
+
+class TestParallelPanel(unittest.TestCase):
+    """La ruta multiproceso produce exactamente el mismo dataset que la ruta serie"""
+
+    def assert_same(self, parallel, serial):
+        self.assertEqual(parallel.feature_names, serial.feature_names)
+        np.testing.assert_array_equal(parallel.X, serial.X)
+        np.testing.assert_array_equal(parallel.y, serial.y)
+        np.testing.assert_array_equal(parallel.time, serial.time)
+        np.testing.assert_array_equal(parallel.comid, serial.comid)
+
+    def test_matches_serial_with_gaps(self):
+        times, values = sample_matrix()
+        values[[40, 41], 2] = np.nan
+        values[120, 5] = np.nan
+        values[:80, 6] = np.nan
+        comids = np.arange(7) + 100
+        serial = build_panel_dataset(times, values, comids)
+        # Bloques de tamaño desigual (7 tramos en bloques de 3) y más bloques que procesos
+        parallel = build_panel_parallel(times, values, comids, workers=2, block_reaches=3)
+        self.assert_same(parallel, serial)
+
+    def test_custom_spec_and_dispatch(self):
+        times, values = sample_matrix(days=120, reaches=4)
+        spec = {"calendar": ["month"], "lags": [1, 5], "windows": [4], "aggregations": ["mean", "max"]}
+        comids = np.arange(4)
+        serial = build_panel(times, values, comids, spec, workers=1)
+        self.assert_same(build_panel(times, values, comids, spec, workers=2), serial)
+
+    def test_output_outlives_shared_block(self):
+        times, values = sample_matrix(days=100, reaches=3)
+        dataset = build_panel_parallel(times, values, np.arange(3), workers=2)
+        train, test = dataset.split_temporal(0.3)
+        expected = test.X.copy()
+        del dataset, train
+        gc.collect()
+        np.testing.assert_array_equal(test.X, expected)
+
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "requiere /dev/shm")
+    def test_failure_releases_shared_blocks(self):
+        """Si el pool o un worker fallan no quedan bloques de memoria compartida huérfanos"""
+        times, values = sample_matrix(days=100, reaches=3)
+        before = set(os.listdir("/dev/shm"))
+        for pool in (FailingPool, mock.Mock(side_effect=OSError("sin procesos"))):
+            with mock.patch.object(parallel, "ProcessPoolExecutor", pool):
+                with self.assertRaises((RuntimeError, OSError)):
+                    build_panel_parallel(times, values, np.arange(3), workers=2)
+        gc.collect()
+        self.assertEqual(set(os.listdir("/dev/shm")) - before, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# tests/test_raw_store.py
+# Tests del almacén columnar Parquet particionado por COMID y año
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import raw_store
+
+
+class TestRawStore(unittest.TestCase):
+    """Tests de conversión, lectura filtrada y exportación"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        times = pd.date_range("2018-06-01", "2021-03-31", freq="D")
+        self.df = pd.DataFrame({"time": times.strftime("%Y-%m-%d"),
+                                "620883808": np.round(np.random.rand(len(times)) * 100, 3)})
+        self.csv = self.root / "620883808_retrospective_data.csv"
+        self.df.to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_roundtrip_partitioned_by_year(self):
+        """La conversión en streaming crea una partición por año con tipos compactos"""
+        rows = raw_store.csv_to_store(self.csv, 620883808, root=self.root, block_size=4096)
+        self.assertEqual(rows, len(self.df))
+        years = sorted(p.name for p in raw_store.series_dir(620883808, root=self.root).iterdir())
+        self.assertEqual(years, ["year=2018", "year=2019", "year=2020", "year=2021"])
+
+        out = raw_store.read_series(620883808, root=self.root)
+        self.assertEqual(str(out["caudal"].dtype), "float32")
+        self.assertTrue(np.issubdtype(out["time"].dtype, np.datetime64))
+        np.testing.assert_allclose(out["caudal"], self.df["620883808"], rtol=1e-6)
+
+    def test_projection_and_date_range(self):
+        """Solo se leen las columnas y el rango de fechas pedidos"""
+        raw_store.csv_to_store(self.csv, 620883808, root=self.root)
+        out = raw_store.read_series(620883808, columns=["caudal"], start="2019-12-30",
+                                    end="2020-01-02", root=self.root)
+        self.assertEqual(list(out.columns), ["caudal"])
+        self.assertEqual(len(out), 4)
+
+    def test_merge_append_and_csv_export(self):
+        """Anexar reescribe solo el año tocado y la exportación CSV es compatible"""
+        raw_store.csv_to_store(self.csv, 620883808, root=self.root)
+        new = pd.DataFrame({"time": ["2021-03-31", "2021-04-01"], "caudal": [1.0, 2.0]})
+        self.assertEqual(raw_store.write_series(new, 620883808, root=self.root), [2021])
+        raw_store.write_series(new.assign(comid=1), 1, root=self.root)
+
+        many = raw_store.read_many(start="2021-04-01", root=self.root)
+        self.assertEqual(sorted(many["comid"].tolist()), [1, 620883808])
+
+        out_csv = raw_store.export_csv(620883808, self.root / "export.csv", root=self.root)
+        exported = pd.read_csv(out_csv)
+        self.assertEqual(list(exported.columns), ["time", "620883808"])
+        self.assertEqual(len(exported), len(self.df) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# tests/test_tuning.py
+# Tests de la búsqueda de hiperparámetros con successive halving sobre pliegues walk-forward
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.features.dataset import FeatureDataset
+from src.models.data_analysis import create_features, load_model_params
+from src.models.engines import RF_PARAMS
+from src.models.tuning import halving_schedule, log_search, sample_candidates, save_search, search
+
+SPACE = {"max_depth": [3, None], "min_samples_leaf": [1, 8], "max_features": [1.0, 0.5]}
+
+
+def sample_dataset(days=600, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2010-01-01", periods=days, freq="D")
+    caudal = 300 + 150 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365) + rng.normal(0, 20, days)
+    return FeatureDataset.from_frame(create_features(pd.DataFrame({"time": times, "caudal": caudal})))
+
+
+class TestSchedule(unittest.TestCase):
+    """Candidatos y rondas de successive halving"""
+
+    def test_candidates_distinct(self):
+        candidates = sample_candidates(SPACE, n_candidates=5, seed=1)
+        self.assertEqual(len(candidates), 5)
+        self.assertEqual(len({tuple(c.items()) for c in candidates}), 5)
+        self.assertEqual(len(sample_candidates(SPACE, n_candidates=100)), 8)
+
+    def test_halving_schedule(self):
+        schedule = halving_schedule(27, 10, 100, eta=3)
+        self.assertEqual([n for n, _ in schedule], [27, 9, 3])
+        self.assertAlmostEqual(schedule[-1][1], 100)
+        self.assertAlmostEqual(schedule[1][1], 100 / 3)
+        # Con pocos candidatos no se agregan rondas que no descartan a nadie
+        self.assertEqual(len(halving_schedule(3, 1, 81, eta=3)), 2)
+        with self.assertRaises(ValueError):
+            halving_schedule(9, 0, 10)
+
+
+class TestSearch(unittest.TestCase):
+    """Rondas de la búsqueda, resultados guardados y registro en MLflow"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_halves_candidates(self):
+        dataset = sample_dataset()
+        best, trials = search(dataset, SPACE, n_candidates=8, resource="n_estimators", min_resource=4,
+                              max_resource=12, eta=2, n_folds=2, cores=1)
+        counts = trials.groupby("rung")["trial"].count().tolist()
+        self.assertEqual(counts, [8, 4])
+        final = trials[trials["rung"] == 1].sort_values("mae").iloc[0]
+        self.assertEqual(best["n_estimators"], 12)
+        self.assertEqual(best["min_samples_leaf"], final["min_samples_leaf"])
+        # Solo los mejores de la primera ronda pasan a la siguiente
+        first = trials[trials["rung"] == 0].sort_values("mae")["trial"].head(4)
+        self.assertEqual(set(first), set(trials[trials["rung"] == 1]["trial"]))
+
+        params_path = os.path.join(self.tmp.name, "best_params.json")
+        save_search(best, trials, os.path.join(self.tmp.name, "trials.csv"), params_path)
+        params = load_model_params(params_path)
+        self.assertEqual(params["random_state"], RF_PARAMS["random_state"])
+        self.assertEqual(params["n_estimators"], 12)
+        with open(params_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), best)
+
+    def test_folds_exclude_holdout(self):
+        """Los pliegues usan solo el período de entrenamiento: la prueba final no elige hiperparámetros"""
+        dataset = sample_dataset()
+        train_ds, test_ds = dataset.split_temporal(test_size=0.3)
+        best, trials = search(dataset, SPACE, n_candidates=2, min_resource=3, max_resource=6, eta=2,
+                              n_folds=2, cores=1)
+        trimmed_best, trimmed = search(train_ds, SPACE, n_candidates=2, min_resource=3, max_resource=6, eta=2,
+                                       n_folds=2, cores=1, holdout=0)
+        self.assertEqual(best, trimmed_best)
+        np.testing.assert_allclose(trials["mae"], trimmed["mae"])
+        # Cambiar los caudales del período de prueba no altera la búsqueda
+        changed = FeatureDataset(dataset.X.copy(), dataset.y.copy(), dataset.time, dataset.feature_names)
+        changed.y[len(train_ds):] *= 3
+        _, moved = search(changed, SPACE, n_candidates=2, min_resource=3, max_resource=6, eta=2, n_folds=2, cores=1)
+        np.testing.assert_allclose(trials["mae"], moved["mae"])
+
+    def test_fraction_resource_parallel(self):
+        dataset = sample_dataset()
+        serial_best, serial = search(dataset, SPACE, n_candidates=4, resource="fraction", eta=2,
+                                     min_resource=0.5, n_folds=2, cores=1)
+        best, trials = search(dataset, SPACE, n_candidates=4, resource="fraction", eta=2,
+                              min_resource=0.5, n_folds=2, cores=2)
+        self.assertEqual(best, serial_best)
+        np.testing.assert_allclose(trials["mae"], serial["mae"])
+        self.assertEqual(sorted(trials["fraction"].unique()), [0.5, 1.0])
+
+    def test_log_search_nested_runs(self):
+        import mlflow
+        dataset = sample_dataset(days=400)
+        best, trials = search(dataset, SPACE, n_candidates=2, min_resource=3, max_resource=6, eta=2,
+                              n_folds=2, cores=1)
+        mlflow.set_tracking_uri(f"sqlite:///{self.tmp.name}/mlflow.db")
+        try:
+            parent = log_search(best, trials, experiment="test_tuning")
+            client = mlflow.tracking.MlflowClient()
+            experiment = client.get_experiment_by_name("test_tuning")
+            children = client.search_runs([experiment.experiment_id],
+                                          filter_string=f"tags.mlflow.parentRunId = '{parent}'")
+            self.assertEqual(len(children), len(trials))
+            self.assertIn("mae", children[0].data.metrics)
+            self.assertIn("min_samples_leaf", children[0].data.params)
+        finally:
+            mlflow.set_tracking_uri(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# tests/test_validation.py
+# Tests de la validación incremental guiada por manifiesto
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data import raw_store, validation
+
+
+def make_series(start, end, seed=0):
+    times = pd.date_range(start, end, freq="D")
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"time": times, "caudal": rng.random(len(times)) * 100 + 1})
+
+
+class TestValidation(unittest.TestCase):
+    """Tests de manifiesto, revalidación selectiva y reglas"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        raw_store.write_series(make_series("2018-01-01", "2020-12-31"), 1, root=self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_run_skips_unchanged_partitions(self):
+        """La segunda validación no relee ninguna partición y reporta los mismos totales"""
+        first = validation.validate_series(1, root=self.root)
+        self.assertTrue(first["ok"])
+        self.assertEqual(first["partitions_checked"], ["year=2018", "year=2019", "year=2020"])
+        self.assertEqual(first["rows"], 1096)
+        self.assertEqual(first["issues"], [])
+
+        second = validation.validate_series(1, root=self.root)
+        self.assertEqual(second["partitions_checked"], [])
+        self.assertEqual(len(second["partitions_skipped"]), 3)
+        self.assertEqual(second["rows"], first["rows"])
+        self.assertAlmostEqual(second["mean"], first["mean"])
+
+    def test_new_year_only_checks_that_partition(self):
+        """Al anexar un año solo se valida la nueva partición"""
+        validation.validate_series(1, root=self.root)
+        raw_store.write_series(make_series("2021-01-01", "2021-06-30", seed=1), 1, root=self.root)
+        report = validation.validate_series(1, root=self.root)
+        self.assertEqual(report["partitions_checked"], ["year=2021"])
+        self.assertEqual(report["max_time"][:10], "2021-06-30")
+        self.assertEqual(report["rows"], 1096 + 181)
+
+    def test_detects_gaps_negatives_and_flatlines(self):
+        """Huecos (incluso entre particiones), negativos y sensor plano"""
+        df = make_series("2022-03-01", "2022-12-31", seed=2)
+        df = df[(df["time"] < "2022-05-01") | (df["time"] > "2022-05-10")].copy()
+        df.loc[df.index[:3], "caudal"] = -1.0
+        df.loc[df.index[-4:], "caudal"] = 5.0
+        raw_store.write_series(df, 1, root=self.root)
+        head = make_series("2023-01-01", "2023-01-10", seed=3)
+        head.loc[:3, "caudal"] = 5.0
+        raw_store.write_series(head, 1, root=self.root)
+
+        report = validation.validate_series(1, root=self.root, rules={"min_rows": 10})
+        messages = [i["message"] for i in report["issues"]]
+        self.assertFalse(report["ok"])
+        self.assertTrue(any("negativos" in m for m in messages))
+        self.assertTrue(any("2022-04-30" in m and "2022-05-11" in m for m in messages))
+        self.assertTrue(any("Hueco entre particiones" in m for m in messages))
+        self.assertTrue(any("Sensor plano 8" in m for m in messages))
+
+    def test_rewritten_partition_is_revalidated(self):
+        """Un cambio en una partición existente invalida solo su entrada del manifiesto"""
+        validation.validate_series(1, root=self.root)
+        patch = make_series("2019-06-01", "2019-06-05", seed=4)
+        patch["caudal"] = -3.0
+        raw_store.write_series(patch, 1, root=self.root)
+        report = validation.validate_series(1, root=self.root)
+        self.assertEqual(report["partitions_checked"], ["year=2019"])
+        self.assertFalse(report["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()